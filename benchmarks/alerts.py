@@ -0,0 +1,78 @@
+"""
+Alert rule evaluation at thousands of rules × people.
+
+Synthetic rules compare random metrics of df_tp and df_tasks with thresholds or with
+a multiple of another metric, over windows of 1 to 3 months. For each grid point it
+times loading the team's history (every month evaluated once), then one new month
+written for every person (its df_tp and df_tasks rows) through `AlertEngine.update`,
+which re-evaluates only that month's window, against re-evaluating each person's whole
+history after the write. Rows are read from the frames beforehand and events are not
+logged, so neither the frame lookup nor disk writes are measured.
+
+Usage:
+    python benchmarks/alerts.py [--rules 100 1000 5000] [--people 100 1000] [--months 60]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from produtiva.alerts import AlertEngine
+from produtiva.synthetic import generate_rules, generate_team
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Produtiva alert rule benchmark")
+    parser.add_argument("--rules", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--people", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--months", type=int, default=60)
+    args = parser.parse_args()
+
+    full_team = generate_team(max(args.people), args.months + 1)
+    print(
+        f"{'rules':>6} {'people':>7} {'load ms':>9} {'update ms':>10} "
+        f"{'us/write':>9} {'rescan ms':>10} {'events':>7}"
+    )
+    for n_rules in args.rules:
+        rules = generate_rules(n_rules)
+        for n_people in args.people:
+            team = list(full_team.items())[:n_people]
+            history = [
+                (person, data["df_tp"].iloc[:-1], data["df_tasks"].iloc[:-1])
+                for person, data in team
+            ]
+            engine = AlertEngine(rules)
+            start = time.perf_counter()
+            for person, df_tp, df_tasks in history:
+                engine.load_frames(df_tp, df_tasks, person=person)
+            load = time.perf_counter() - start
+
+            writes = [
+                (str(df["Mês/Ano"].iloc[-1]), df.iloc[-1].to_dict(), person)
+                for person, data in team
+                for df in (data["df_tp"], data["df_tasks"])
+            ]
+            events = 0
+            start = time.perf_counter()
+            for month, values, person in writes:
+                events += len(engine.update(month, values, person=person))
+            update = time.perf_counter() - start
+
+            rescan_engine = AlertEngine(rules)
+            start = time.perf_counter()
+            for person, data in team:
+                rescan_engine.load_frames(data["df_tp"], data["df_tasks"], person=person)
+            rescan = time.perf_counter() - start
+
+            print(
+                f"{n_rules:>6} {n_people:>7} {1000 * load:>9.1f} {1000 * update:>10.1f} "
+                f"{1e6 * update / len(writes):>9.1f} {1000 * rescan:>10.1f} "
+                f"{events:>7}"
+            )
+
+
+if __name__ == "__main__":
+    main()
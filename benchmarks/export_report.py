@@ -0,0 +1,65 @@
+"""
+Memory and time of the streaming Excel export.
+
+Reports of growing size are written from stacked synthetic teams, tracing the peak
+memory allocated while writing (the frames themselves are built beforehand, so they
+are not counted). Then one workbook per person is written serially and in parallel.
+
+Usage:
+    python benchmarks/export_report.py [--months 120] [--sizes 1 10 50] [--team 8]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import openpyxl.chart  # noqa: F401  (imported before tracing, so it is not counted)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from produtiva.export import export_team, write_report
+from produtiva.synthetic import generate_team, stack_team
+
+DATASETS = ("df_tp", "df_tasks", "df_tamanho")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Produtiva Excel export benchmark")
+    parser.add_argument("--months", type=int, default=120)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--team", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    team = generate_team(max(*args.sizes, args.team), args.months)
+    mib = 2**20
+    with tempfile.TemporaryDirectory() as out_dir:
+        print(f"{'rows':>9} {'seconds':>8} {'peak MiB':>9} {'file MiB':>9}")
+        for size in args.sizes:
+            people = dict(list(team.items())[:size])
+            frames = {dataset: stack_team(people, dataset) for dataset in DATASETS}
+            path = os.path.join(out_dir, f"report_{size}.xlsx")
+            tracemalloc.start()
+            start = time.perf_counter()
+            write_report(path, frames)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(
+                f"{len(frames['df_tp']):>9} {elapsed:>8.2f} {peak / mib:>9.2f} "
+                f"{os.path.getsize(path) / mib:>9.2f}"
+            )
+
+        people = dict(list(team.items())[: args.team])
+        for label, workers in (("serial", 1), ("parallel", args.workers)):
+            start = time.perf_counter()
+            paths = export_team(people, os.path.join(out_dir, label), workers)
+            elapsed = time.perf_counter() - start
+            print(f"{label:<9} {len(paths)} workbooks in {elapsed:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Import-time benchmark based on `python -X importtime`.
+
+Each target module is imported in a fresh interpreter several times; the reported value
+is the median cumulative import time of the module itself, together with the heavy UI
+dependencies that ended up being imported.
+
+Usage:
+    python benchmarks/import_time.py [--runs N] [module ...]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_TARGETS = [
+    "produtiva",
+    "produtiva.frames",
+    "produtiva.months",
+    "produtiva.cube",
+    "module_functions",
+    "helpers",
+]
+HEAVY_MODULES = ("plotly", "streamlit", "workalendar")
+
+
+def import_profile(module: str) -> tuple[float, list]:
+    """
+    Imports a module in a fresh interpreter and parses the `-X importtime` report.
+
+    Parameters:
+    module (str): Dotted name of the module to import.
+
+    Returns:
+    tuple[float, list]: The cumulative import time in milliseconds and the heavy
+    top-level packages that were imported along the way.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative_us = 0
+    heavy = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        name = name.strip()
+        if not cumulative.strip().isdigit():
+            continue
+        if name == module:
+            cumulative_us = int(cumulative)
+        if name.split(".")[0] in HEAVY_MODULES:
+            heavy.add(name.split(".")[0])
+    return cumulative_us / 1000, sorted(heavy)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=DEFAULT_TARGETS)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'module':<20} {'median ms':>10}  heavy imports")
+    for module in args.modules:
+        timings = []
+        heavy = []
+        for _ in range(args.runs):
+            elapsed_ms, heavy = import_profile(module)
+            timings.append(elapsed_ms)
+        print(
+            f"{module:<20} {statistics.median(timings):>10.1f}  {', '.join(heavy) or '-'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
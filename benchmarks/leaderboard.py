@@ -0,0 +1,73 @@
+"""
+Leaderboard latency as the number of people grows.
+
+For synthetic teams it times the period roll-up of the metric cube (done once per
+data version) and the leaderboard table built from it, which stays flat as people
+are added, next to the bare full sort of the latest period. It then times `top_k`
+alone on larger arrays of scores, where partial selection with `np.argpartition`
+keeps the ranking close to linear while the full sort pays O(p log p).
+
+Usage:
+    python benchmarks/leaderboard.py [--people 100 500 1000] [--months 60] [--k 10]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from produtiva.cube import MetricCube
+from produtiva.leaderboard import leaderboard, period_scores, top_k
+from produtiva.synthetic import generate_team
+
+METRIC = "TP Ajustado (Dias Úteis Reais)"
+SCORE_SIZES = (10_000, 100_000, 1_000_000)
+
+
+def best_of(fn, repeat: int = 5) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Produtiva leaderboard benchmark")
+    parser.add_argument("--people", type=int, nargs="+", default=[100, 500, 1000])
+    parser.add_argument("--months", type=int, default=60)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    full_team = generate_team(max(args.people), args.months)
+    print(f"{'people':>8} {'roll-up ms':>11} {'table ms':>9} {'sort ms':>8}")
+    for n_people in args.people:
+        cube = MetricCube()
+        for person, data in list(full_team.items())[:n_people]:
+            cube.load_frames(data["df_tp"], person=person)
+        rollup = best_of(lambda: period_scores(cube, METRIC, "quarter"))
+        scores = period_scores(cube, METRIC, "quarter")
+        ranked = best_of(lambda: leaderboard(scores, args.k))
+        latest = scores["scores"][-1]
+        full_sort = best_of(lambda: np.argsort(-latest, kind="stable")[: args.k])
+        print(
+            f"{n_people:>8} {1000 * rollup:>11.3f} {1000 * ranked:>9.3f} "
+            f"{1000 * full_sort:>8.3f}"
+        )
+
+    rng = np.random.default_rng(0)
+    print(f"\n{'scores':>8} {'top-k ms':>9} {'sort ms':>8}")
+    for size in SCORE_SIZES:
+        values = rng.random(size)
+        selected = best_of(lambda: top_k(values, args.k))
+        full_sort = best_of(lambda: np.argsort(-values, kind="stable")[: args.k])
+        print(f"{size:>8} {1000 * selected:>9.3f} {1000 * full_sort:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Load test for the local metrics API (produtiva.server).
+
+Opens many keep-alive connections and issues a mix of dataset, metrics and
+conditional (If-None-Match) requests, then reports throughput, latency percentiles
+and status counts.
+
+Usage:
+    python -m produtiva.server --port 8765 &
+    python benchmarks/load_test.py --port 8765 [--connections 200] [--requests 50]
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from collections import Counter
+
+PATHS = [
+    "/tp",
+    "/tasks",
+    "/tamanho",
+    "/metrics",
+    "/metrics?start=06/24&end=12/24",
+    "/tp?start=10/24",
+]
+
+
+async def request(reader, writer, host, path, etag=None) -> tuple:
+    """
+    Sends one GET on an open connection and reads the full response.
+
+    Returns:
+    tuple: (status, etag) of the response.
+    """
+    head = f"GET {path} HTTP/1.1\r\nHost: {host}\r\n"
+    if etag:
+        head += f"If-None-Match: {etag}\r\n"
+    writer.write((head + "\r\n").encode("latin-1"))
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    await reader.readexactly(int(headers.get("content-length", 0)))
+    return status, headers.get("etag")
+
+
+async def client(host, port, n_requests, conditional_share, latencies, statuses):
+    reader, writer = await asyncio.open_connection(host, port)
+    etags = {}
+    try:
+        for _ in range(n_requests):
+            path = random.choice(PATHS)
+            etag = etags.get(path) if random.random() < conditional_share else None
+            started = time.perf_counter()
+            status, etags[path] = await request(reader, writer, host, path, etag)
+            latencies.append(time.perf_counter() - started)
+            statuses[status] += 1
+    finally:
+        writer.close()
+
+
+async def run(args) -> None:
+    latencies = []
+    statuses = Counter()
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(
+            client(
+                args.host,
+                args.port,
+                args.requests,
+                args.conditional,
+                latencies,
+                statuses,
+            )
+            for _ in range(args.connections)
+        )
+    )
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"connections      {args.connections}")
+    print(f"requests         {len(latencies)}")
+    print(f"elapsed          {elapsed:.2f} s")
+    print(f"throughput       {len(latencies) / elapsed:.0f} req/s")
+    print(f"latency p50      {quantiles[49] * 1000:.2f} ms")
+    print(f"latency p99      {quantiles[98] * 1000:.2f} ms")
+    print(f"latency max      {latencies[-1] * 1000:.2f} ms")
+    print(f"statuses         {dict(sorted(statuses.items()))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Produtiva API load test")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--connections", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument(
+        "--conditional",
+        type=float,
+        default=0.5,
+        help="share of requests that revalidate with If-None-Match",
+    )
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Memory of the dataset frames before and after enforcing the compact schema.
+
+A synthetic team is stacked into one long frame per dataset, as a multi-person
+deployment would hold them, and each frame is measured with pandas' deep memory usage
+with its original types and with the schema types of `produtiva.schema`.
+
+Usage:
+    python benchmarks/memory_report.py [--people 1000] [--months 120]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from produtiva.schema import memory_report
+from produtiva.synthetic import generate_team, stack_team
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Produtiva frame memory report")
+    parser.add_argument("--people", type=int, default=1000)
+    parser.add_argument("--months", type=int, default=120)
+    args = parser.parse_args()
+
+    team = generate_team(args.people, args.months)
+    frames = {
+        dataset: stack_team(team, dataset)
+        for dataset in ("df_tp", "df_tasks", "df_tamanho")
+    }
+
+    mib = 2**20
+    print(f"{args.people} people x {args.months} months")
+    print(f"{'dataset':<12} {'rows':>9} {'before MiB':>11} {'after MiB':>10} {'ratio':>6}")
+    rows = memory_report(frames)
+    for row in rows:
+        print(
+            f"{row['dataset']:<12} {row['rows']:>9} {row['before_bytes'] / mib:>11.2f} "
+            f"{row['after_bytes'] / mib:>10.2f} {row['ratio']:>6.2f}"
+        )
+    before = sum(row["before_bytes"] for row in rows)
+    after = sum(row["after_bytes"] for row in rows)
+    print(f"{'total':<12} {'':>9} {before / mib:>11.2f} {after / mib:>10.2f} {before / after:>6.2f}")
+
+
+if __name__ == "__main__":
+    main()
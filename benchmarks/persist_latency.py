@@ -0,0 +1,110 @@
+"""
+Render latency of the charts page with inline and write-behind persistence.
+
+The page is rerun headlessly through Streamlit's AppTest with a synthetic history in
+a temporary 'bin' directory. Every rerun persists the datasets, so its latency
+includes the inline writes or only the hand-off to the background persister. An
+optional per-file delay emulates a slow (e.g. network) volume.
+
+Usage:
+    python benchmarks/persist_latency.py [--runs 30] [--months 60] [--write-delay 0.05]
+"""
+
+import os
+import sys
+import tempfile
+
+os.environ.setdefault("PRODUTIVA_BIN_DIR", tempfile.mkdtemp(prefix="produtiva-bench-"))
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+import argparse
+import logging
+import shutil
+import statistics
+import time
+
+from streamlit.testing.v1 import AppTest
+
+import helpers
+from produtiva.paths import BIN_DIR
+from produtiva.persistence import PERSISTER
+from produtiva.storage import save_to_binary
+from produtiva.synthetic import generate_team
+
+PAGE = os.path.join(PROJECT_DIR, "pages", "2_Visualização_Gráfica.py")
+
+
+def slow_writer(delay: float):
+    """
+    Wraps `save_to_binary` with a fixed delay per file.
+    """
+
+    def write(filename, data, durable=False):
+        time.sleep(delay)
+        save_to_binary(filename, data, durable=durable)
+
+    return write
+
+
+def seed_bin(n_months: int) -> None:
+    data = next(iter(generate_team(1, n_months).values()))
+    for key, value in data.items():
+        save_to_binary(f"{key}.pkl", value)
+
+
+def render_latencies(mode: str, runs: int) -> list:
+    """
+    Reruns the page `runs` times in one session and returns each rerun's seconds.
+    """
+    helpers.PERSIST_MODE = mode
+    at = AppTest.from_file(PAGE, default_timeout=120).run()
+    latencies = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        at.run()
+        latencies.append(time.perf_counter() - started)
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+    PERSISTER.flush()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Persistence render latency")
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--months", type=int, default=60)
+    parser.add_argument(
+        "--write-delay",
+        type=float,
+        default=0.05,
+        help="seconds added to each file write, to emulate a slow volume",
+    )
+    args = parser.parse_args()
+
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith("streamlit"):
+            logging.getLogger(name).setLevel(logging.ERROR)
+
+    writer = slow_writer(args.write_delay)
+    helpers.save_to_binary = writer
+    PERSISTER.writer = writer
+    try:
+        seed_bin(args.months)
+        print(f"{args.months} months, {args.runs} reruns, {args.write_delay * 1000:.0f} ms/write")
+        for mode in ("inline", "background"):
+            latencies = sorted(render_latencies(mode, args.runs))
+            quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+            print(
+                f"{mode:<11} p50={quantiles[49] * 1000:>8.1f} ms "
+                f"p99={quantiles[98] * 1000:>8.1f} ms "
+                f"max={latencies[-1] * 1000:>8.1f} ms"
+            )
+        print(f"background writes={PERSISTER.written} coalesced={PERSISTER.coalesced}")
+    finally:
+        if BIN_DIR.startswith(tempfile.gettempdir()):
+            shutil.rmtree(BIN_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Time of the Monte Carlo yearly projection.
+
+Projects the latest year of every person of a synthetic team with growing numbers of
+scenarios and reports the time per person. A scenario-by-scenario Python loop over a
+small sample shows what the single array operation replaces.
+
+Usage:
+    python benchmarks/projection.py [--people 20] [--months 120] [--scenarios 10000 100000 1000000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from produtiva.projection import historical_pace, simulate_year
+from produtiva.synthetic import generate_team
+
+LOOP_SCENARIOS = 10_000
+
+
+def loop_probability(paces, remaining_days, achieved, target, scenarios, rng) -> float:
+    hits = 0
+    for _ in range(scenarios):
+        total = achieved
+        for days in remaining_days:
+            total += paces[rng.integers(len(paces))] * days
+        hits += total >= target
+    return hits / scenarios
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Produtiva projection benchmark")
+    parser.add_argument("--people", type=int, default=20)
+    parser.add_argument("--months", type=int, default=120)
+    parser.add_argument(
+        "--scenarios", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    args = parser.parse_args()
+
+    team = generate_team(args.people, args.months)
+    frames = [person["df_tp"].iloc[:-6] for person in team.values()]
+    simulate_year(frames[0], scenarios=10)  # loads the holiday calendar
+
+    print(f"{'scenarios':>10} {'ms/person':>10} {'max ms':>8} {'P(meta)':>8}")
+    for scenarios in args.scenarios:
+        times, probabilities = [], []
+        for df_tp in frames:
+            start = time.perf_counter()
+            result = simulate_year(df_tp, scenarios=scenarios, seed=0)
+            times.append(time.perf_counter() - start)
+            probabilities.append(result["probability"])
+        print(
+            f"{scenarios:>10} {1000 * np.mean(times):>10.2f} "
+            f"{1000 * max(times):>8.2f} {np.mean(probabilities):>8.3f}"
+        )
+
+    df_tp = frames[0]
+    result = simulate_year(df_tp, scenarios=LOOP_SCENARIOS, seed=0)
+    start = time.perf_counter()
+    probability = loop_probability(
+        historical_pace(df_tp),
+        result["remaining_days"],
+        result["achieved"],
+        result["target"],
+        LOOP_SCENARIOS,
+        np.random.default_rng(0),
+    )
+    elapsed = time.perf_counter() - start
+    print(
+        f"python loop: {LOOP_SCENARIOS} scenarios in {1000 * elapsed:.2f} ms "
+        f"(P(meta) {probability:.3f} vs. {result['probability']:.3f})"
+    )
+
+
+if __name__ == "__main__":
+    main()
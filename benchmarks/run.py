@@ -0,0 +1,314 @@
+"""
+Benchmark suite for Produtiva's hot paths on synthetic datasets.
+
+Every hot path is timed over a grid of team sizes (people) and history lengths
+(months). Peak traced memory is recorded in a separate pass, so tracing does not
+inflate timings. Results are written as JSON, one record per benchmark and grid
+point, and two result files can be compared to spot regressions.
+
+Usage:
+    python benchmarks/run.py [--quick] [--only NAME ...] [--output FILE]
+    python benchmarks/run.py --compare BASE.json NEW.json
+"""
+
+import os
+import sys
+import tempfile
+
+os.environ.setdefault("PRODUTIVA_BIN_DIR", tempfile.mkdtemp(prefix="produtiva-bench-"))
+os.environ.setdefault("PRODUTIVA_PERSIST_MODE", "inline")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import datetime
+import json
+import logging
+import platform
+import shutil
+import statistics
+import subprocess
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from helpers import init_session_states, persist_data
+from module_functions import (
+    add_or_update_month_df_tp,
+    create_fig_all,
+    create_fig_produtividade_geral,
+    create_fig_tamanho_task,
+    create_fig_tasks,
+    create_fig_tp,
+    create_df_produtividade_geral,
+    get_layout_config,
+)
+from produtiva.months import last_month_in_df, next_month
+from produtiva.paths import BIN_DIR
+from produtiva.synthetic import generate_team, stack_team
+
+FULL_GRID = {"people": [1, 10, 100, 1000], "months": [12, 120, 1200]}
+QUICK_GRID = {"people": [1, 10, 100], "months": [12, 120]}
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+MIN_TOTAL_SECONDS = 0.2
+MAX_REPEATS = 7
+
+BENCHMARKS = {}
+
+
+def benchmark(name: str, scope: str):
+    """
+    Registers a benchmark as a `setup(team) -> run` factory.
+
+    Parameters:
+    name (str): Name of the hot path.
+    scope (str): "team" benchmarks run over every person at every grid point;
+        "person" benchmarks only depend on the history length and run once per months.
+    """
+
+    def register(factory):
+        BENCHMARKS[name] = (scope, factory)
+        return factory
+
+    return register
+
+
+@benchmark("add_or_update_month_df_tp[update]", "team")
+def bench_upsert_update(team):
+    states = [
+        (data["df_tp"].copy(), data["df_tasks"], dict(data["work_days_dict"]))
+        for data in team.values()
+    ]
+
+    def run():
+        for df_tp, df_tasks, work_days in states:
+            month = df_tp["Mês/Ano"].iat[-1]
+            add_or_update_month_df_tp(df_tp, df_tasks, work_days, month, 20, 15, 21)
+
+    return run
+
+
+@benchmark("add_or_update_month_df_tp[append]", "team")
+def bench_upsert_append(team):
+    states = [
+        (data["df_tp"], data["df_tasks"], dict(data["work_days_dict"]))
+        for data in team.values()
+    ]
+
+    def run():
+        for df_tp, df_tasks, work_days in states:
+            month = next_month(df_tp["Mês/Ano"].iat[-1])
+            add_or_update_month_df_tp(df_tp, df_tasks, work_days, month, 20, 15, 21)
+
+    return run
+
+
+@benchmark("last_month_in_df", "team")
+def bench_last_month(team):
+    frames = [data["df_tp"] for data in team.values()]
+
+    def run():
+        for df_tp in frames:
+            last_month_in_df(df_tp)
+
+    return run
+
+
+@benchmark("create_fig_tamanho_task", "person")
+def bench_fig_tamanho(team):
+    df_tamanho = next(iter(team.values()))["df_tamanho"]
+    return lambda: create_fig_tamanho_task(df_tamanho)
+
+
+@benchmark("create_fig_all", "person")
+def bench_fig_all(team):
+    data = next(iter(team.values()))
+    layout_config = get_layout_config()
+    df_tp = data["df_tp"].copy()
+    figures = (
+        create_fig_tp(df_tp, layout_config),
+        create_fig_tasks(data["df_tasks"], layout_config),
+        create_fig_produtividade_geral(
+            create_df_produtividade_geral(df_tp, data["df_tasks"]), layout_config
+        ),
+        create_fig_tamanho_task(data["df_tamanho"]),
+    )
+    return lambda: create_fig_all(*figures)
+
+
+@benchmark("persist_data", "team")
+def bench_persist(team):
+    _fill_session_state(team)
+    return persist_data
+
+
+@benchmark("init_session_states", "team")
+def bench_init_session_states(team):
+    _fill_session_state(team)
+    persist_data()
+
+    def run():
+        for key in list(st.session_state.keys()):
+            del st.session_state[key]
+        init_session_states()
+
+    return run
+
+
+def _fill_session_state(team):
+    st.session_state.df_tp = stack_team(team, "df_tp")
+    st.session_state.df_tasks = stack_team(team, "df_tasks")
+    st.session_state.df_tamanho = stack_team(team, "df_tamanho")
+    st.session_state.work_days_dict = next(iter(team.values()))["work_days_dict"]
+
+
+def measure(factory, team) -> dict:
+    """
+    Times a benchmark and records its peak traced memory.
+
+    Parameters:
+    factory (callable): The registered `setup(team) -> run` factory.
+    team (dict): Synthetic team datasets.
+
+    Returns:
+    dict: Repeat count, min/median wall seconds and peak traced bytes.
+    """
+    timings = []
+    while len(timings) < MAX_REPEATS and sum(timings) < MIN_TOTAL_SECONDS:
+        run = factory(team)
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+
+    run = factory(team)
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "repeats": len(timings),
+        "min_s": min(timings),
+        "median_s": statistics.median(timings),
+        "peak_bytes": peak,
+    }
+
+
+def run_suite(grid: dict, only=None) -> list:
+    """
+    Runs every selected benchmark over the grid.
+
+    Parameters:
+    grid (dict): Lists of "people" and "months" sizes.
+    only (list, optional): Benchmark names to run; all when omitted.
+
+    Returns:
+    list: One result record per benchmark and grid point.
+    """
+    results = []
+    for n_months in grid["months"]:
+        for n_people in grid["people"]:
+            team = generate_team(n_people, n_months)
+            for name, (scope, factory) in BENCHMARKS.items():
+                if only and name not in only:
+                    continue
+                if scope == "person" and n_people != grid["people"][0]:
+                    continue
+                record = {
+                    "name": name,
+                    "scope": scope,
+                    "people": n_people if scope == "team" else 1,
+                    "months": n_months,
+                    **measure(factory, team),
+                }
+                results.append(record)
+                print(
+                    f"{name:<36} people={record['people']:>5} months={n_months:>5} "
+                    f"min={record['min_s'] * 1000:>10.2f} ms "
+                    f"peak={record['peak_bytes'] / 2**20:>8.2f} MiB"
+                )
+    return results
+
+
+def environment() -> dict:
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    return {
+        "revision": revision,
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+    }
+
+
+def compare(base_path: str, new_path: str, threshold: float = 1.2) -> None:
+    """
+    Prints the time and memory ratio of every benchmark present in both files.
+
+    Parameters:
+    base_path (str): Result file of the reference version.
+    new_path (str): Result file of the version under test.
+    threshold (float): Time ratio above which a record is flagged as a regression.
+    """
+
+    def index(path):
+        with open(path, encoding="utf-8") as f:
+            return {
+                (r["name"], r["people"], r["months"]): r for r in json.load(f)["results"]
+            }
+
+    base, new = index(base_path), index(new_path)
+    for key in sorted(base.keys() & new.keys()):
+        time_ratio = new[key]["min_s"] / base[key]["min_s"]
+        mem_ratio = new[key]["peak_bytes"] / max(base[key]["peak_bytes"], 1)
+        flag = "REGRESSION" if time_ratio > threshold else ""
+        print(
+            f"{key[0]:<36} people={key[1]:>5} months={key[2]:>5} "
+            f"time x{time_ratio:>6.2f} mem x{mem_ratio:>6.2f} {flag}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Produtiva benchmark suite")
+    parser.add_argument("--quick", action="store_true", help="use a smaller grid")
+    parser.add_argument("--only", nargs="*", help="benchmark names to run")
+    parser.add_argument("--output", help="result file (default: results/<rev>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"))
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith("streamlit"):
+            logging.getLogger(name).setLevel(logging.ERROR)
+    env = environment()
+    try:
+        results = run_suite(QUICK_GRID if args.quick else FULL_GRID, args.only)
+    finally:
+        if BIN_DIR.startswith(tempfile.gettempdir()):
+            shutil.rmtree(BIN_DIR, ignore_errors=True)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{env['revision'] or 'local'}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"environment": env, "results": results}, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
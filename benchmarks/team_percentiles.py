@@ -0,0 +1,95 @@
+"""
+Team percentiles from merged KLL sketches against exact computation.
+
+A synthetic team is loaded into per-person sketches. Then, for each team size, it
+times exact percentiles over everyone (stacking the people's frames and computing
+np.percentile per month, as a render would without sketches) against reading them from
+the team sketches, after one upsert per person for a new month. It also reports the
+worst rank error of the sketched percentiles next to the sketch's bound.
+
+Usage:
+    python benchmarks/team_percentiles.py [--people 100 500 1000] [--months 60] [--k 200]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from produtiva.sketches import TEAM_QUANTILES, TeamSketches
+from produtiva.synthetic import generate_team, stack_team
+
+METRIC = "TP Ajustado (Dias Úteis Reais)"
+
+
+def exact_percentiles(team: dict) -> np.ndarray:
+    df = stack_team(team, "df_tp")
+    values = df[METRIC].to_numpy(np.float64).reshape(len(team), -1)
+    return np.percentile(values, [q * 100 for q in TEAM_QUANTILES], axis=0).T
+
+
+def worst_rank_error(sketched: np.ndarray, team: dict) -> float:
+    df = stack_team(team, "df_tp")
+    values = np.sort(df[METRIC].to_numpy(np.float64).reshape(len(team), -1), axis=0)
+    worst = 0.0
+    for month in range(values.shape[1]):
+        column = values[:, month]
+        for q, estimate in zip(TEAM_QUANTILES, sketched[month]):
+            low = np.searchsorted(column, estimate, side="left") / len(column)
+            high = np.searchsorted(column, estimate, side="right") / len(column)
+            worst = max(worst, max(low - q, q - high, 0.0))
+    return worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Produtiva team percentile benchmark")
+    parser.add_argument("--people", type=int, nargs="+", default=[100, 500, 1000])
+    parser.add_argument("--months", type=int, default=60)
+    parser.add_argument("--k", type=int, default=200)
+    args = parser.parse_args()
+
+    full_team = generate_team(max(args.people), args.months + 1)
+    print(
+        f"{'people':>7} {'exact ms':>9} {'upsert ms':>10} {'sketch ms':>10} "
+        f"{'rank err':>9} {'bound':>7}"
+    )
+    for n_people in args.people:
+        team = dict(list(full_team.items())[:n_people])
+        history = {
+            person: {name: df.iloc[:-1] for name, df in frames.items() if name != "work_days_dict"}
+            for person, frames in team.items()
+        }
+        sketches = TeamSketches(k=args.k, seed=0)
+        for person, frames in history.items():
+            sketches.load_frame(frames["df_tp"], person=person)
+        sketches.percentiles(METRIC)  # builds the team sketches once
+
+        start = time.perf_counter()
+        exact_percentiles(team)
+        exact = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for person, frames in team.items():
+            month = str(frames["df_tp"]["Mês/Ano"].iloc[-1])
+            sketches.update_from_frame(frames["df_tp"], month, person=person)
+        upsert = time.perf_counter() - start
+
+        start = time.perf_counter()
+        sketched = sketches.percentiles(METRIC)
+        read = time.perf_counter() - start
+
+        error = worst_rank_error(
+            sketched[[f"p{q * 100:g}" for q in TEAM_QUANTILES]].to_numpy(), team
+        )
+        print(
+            f"{n_people:>7} {1000 * exact:>9.2f} {1000 * upsert:>10.2f} "
+            f"{1000 * read:>10.2f} {error:>9.4f} {sketched.attrs['rank_error']:>7.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
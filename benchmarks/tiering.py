@@ -0,0 +1,113 @@
+"""
+Load time, session memory and range queries with and without hot/cold tiering.
+
+For one synthetic person with a long history, the datasets are written to a temporary
+'bin' directory and loaded with tiering disabled (every month in the session frames)
+and enabled (only the hot window; older years archived to `bin/cold/` on the first
+load). It reports the steady-state `load_datasets` time, the deep memory of the three
+session frames and the size of the hot snapshots on disk, then times a range query
+over the oldest two years (first read, decoding the segments, and cached) and
+compares the segment sizes of both codecs.
+
+Usage:
+    python benchmarks/tiering.py [--months 120 600 1200] [--hot-months 12] [--runs 5]
+"""
+
+import os
+import sys
+import tempfile
+
+os.environ.setdefault("PRODUTIVA_BIN_DIR", tempfile.mkdtemp(prefix="produtiva-bench-"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import shutil
+import time
+
+from produtiva import tiering
+from produtiva.paths import BIN_DIR
+from produtiva.schema import SCHEMAS
+from produtiva.storage import DATASET_FILES, load_datasets, save_to_binary
+from produtiva.synthetic import generate_team
+
+
+def seed_bin(data: dict) -> None:
+    shutil.rmtree(BIN_DIR, ignore_errors=True)
+    for name in SCHEMAS:
+        save_to_binary(DATASET_FILES[name], data[name], durable=True)
+
+
+def tree_size(path: str, skip: str = None) -> int:
+    total = 0
+    for root, dirs, files in os.walk(path):
+        if skip in dirs:
+            dirs.remove(skip)
+        total += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+    return total
+
+
+def best_load(runs: int) -> tuple:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        frames = load_datasets(SCHEMAS, archive_cold=True)
+        times.append(time.perf_counter() - start)
+    memory = sum(int(frames[name].memory_usage(deep=True).sum()) for name in SCHEMAS)
+    return min(times), memory, frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Produtiva hot/cold tiering benchmark")
+    parser.add_argument("--months", type=int, nargs="+", default=[120, 600, 1200])
+    parser.add_argument("--hot-months", type=int, default=tiering.HOT_MONTHS or 12)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(
+        f"{'months':>7} {'mode':>7} {'rows':>6} {'load ms':>8} {'memory KB':>10} "
+        f"{'hot KB':>7} {'cold KB':>8}"
+    )
+    queries = []
+    for n_months in args.months:
+        data = next(iter(generate_team(1, n_months).values()))
+        seed_bin(data)
+        for mode, hot_months in (("full", 0), ("tiered", args.hot_months)):
+            tiering.HOT_MONTHS = hot_months
+            load_datasets(SCHEMAS, archive_cold=True)  # archives on the first tiered load
+            load, memory, frames = best_load(args.runs)
+            print(
+                f"{n_months:>7} {mode:>7} {len(frames['df_tp']):>6} {1000 * load:>8.1f} "
+                f"{memory / 1024:>10.1f} {tree_size(BIN_DIR, tiering.COLD_DIR) / 1024:>7.1f} "
+                f"{tree_size(os.path.join(BIN_DIR, tiering.COLD_DIR)) / 1024:>8.1f}"
+            )
+
+        months = tiering.cold_months("df_tp")
+        if len(months) >= 24:
+            tiering._read_segment.cache_clear()
+            start = time.perf_counter()
+            rows = len(tiering.select_range("df_tp", frames["df_tp"], months[0], months[23]))
+            first = time.perf_counter() - start
+            start = time.perf_counter()
+            tiering.select_range("df_tp", frames["df_tp"], months[0], months[23])
+            cached = time.perf_counter() - start
+            queries.append((n_months, rows, first, cached))
+
+        sizes = {}
+        for codec in tiering.CODECS:
+            seed_bin(data)
+            frames = {name: data[name].copy() for name in SCHEMAS}
+            tiering.archive(frames, args.hot_months, codec)
+            sizes[codec] = tree_size(os.path.join(BIN_DIR, tiering.COLD_DIR))
+        print(
+            f"{'':>7} segments: "
+            + ", ".join(f"{codec} {size / 1024:.1f} KB" for codec, size in sizes.items())
+        )
+
+    print(f"\n{'months':>7} {'rows':>5} {'first read ms':>14} {'cached ms':>10}")
+    for n_months, rows, first, cached in queries:
+        print(f"{n_months:>7} {rows:>5} {1000 * first:>14.2f} {1000 * cached:>10.2f}")
+    shutil.rmtree(BIN_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,188 +1,708 @@
-import datetime
-import streamlit as st
-from module_functions import create_df_tp
 import os
-import pickle
-
-DEFAULT_WORK_DAYS = {
-    "04/24": 22,
-    "05/24": 22,
-    "06/24": 20,
-    "07/24": 23,
-    "08/24": 22,
-    "09/24": 21,
-    "10/24": 23,
-    "11/24": 20,
-    "12/24": 15,
-    "01/25": 20,
+from collections import deque
+from contextlib import contextmanager
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from produtiva.alerts import AlertEngine
+from produtiva.analytics import TREND_METRICS, compute_trends
+from produtiva.anomalies import SCANNED_METRICS, AnomalyScanner
+from produtiva.cube import MetricCube
+from produtiva.frames import (
+    backfill_months,
+    create_df_tamanho_task,
+    create_df_tasks,
+    DEFAULT_PERSON,
+)
+from produtiva.leaderboard import DEFAULT_TOP, leaderboard, period_scores
+from produtiva.memory import ARTIFACTS
+from produtiva.months import (
+    parse_month_year,
+    format_month_year,
+    next_month,
+    last_month_in_df,
+    month_ordinal,
+)
+from produtiva import changefeed, history, profiling, tiering
+from produtiva.persistence import PERSIST_MODE, PERSISTER
+from produtiva.profiling import timed
+from produtiva.projection import simulate_year
+from produtiva.yoy import compute_yoy
+from produtiva.schema import enforce_schema
+from produtiva.storage import dataset_path, load_datasets, save_to_binary
+
+PROFILE_HISTORY = 20
+SCHEMA_KEYS = ("df_tp", "df_tasks", "df_tamanho")
+DEFAULT_FRAMES = {
+    "df_tp": lambda df_tp: df_tp,
+    "df_tasks": create_df_tasks,
+    "df_tamanho": create_df_tamanho_task,
 }
 
 
-def save_to_binary(filename: str, data: object) -> None:
+@timed()
+def init_session_states() -> None:
+    """
+    Initialize session state variables in Streamlit with default values or load from binary files.
+
+    Saves still waiting in the write-behind persister are flushed first, so a new
+    session always loads the latest data. The datasets are loaded (and migrated,
+    archived to the cold tier and checked) by `load_datasets`, whose integrity
+    problems are kept in `st.session_state.integrity_issues`, and the history of each
+    dataset is seeded with the loaded frames.
+
+    Returns:
+    None
+
+    Complexity:
+    Time: O(n), where n is the size of the data being loaded.
+    Space: O(1), constant space usage aside from loaded data.
+    """
+    missing = [
+        key for key in (*SCHEMA_KEYS, "work_days_dict") if key not in st.session_state
+    ]
+    if "need_rerun" not in st.session_state:
+        st.session_state.need_rerun = False
+    loaded = False
+    if missing:
+        PERSISTER.flush()
+        datasets = load_datasets(missing, archive_cold=True)
+        st.session_state.integrity_issues = datasets.pop("issues")
+        for key in missing:
+            if key in SCHEMA_KEYS:
+                history.get_history(key, baseline=datasets[key])
+                loaded = True
+            st.session_state[key] = datasets[key]
+
+    if loaded or "feed_cursor" not in st.session_state:
+        cursor, records = changefeed.open_cursor(since=loaded_data_time())
+        st.session_state.feed_cursor = cursor
+        apply_changes(records)
+
+
+def loaded_data_time() -> float:
+    """
+    Returns the time of the oldest persisted dataset, or 0 when one is missing.
+
+    Change records newer than this may not be in the loaded files yet and are
+    replayed on top of them.
     """
-    Saves data to a binary file in the 'bin' directory.
+    times = []
+    for key in SCHEMA_KEYS:
+        try:
+            times.append(os.stat(dataset_path(f"{key}.pkl")).st_mtime)
+        except FileNotFoundError:
+            return 0.0
+    return min(times)
+
+
+def change_origin() -> str:
+    return f"{changefeed.PROCESS_ID}:{session_id()}"
+
+
+def record_changes(changes) -> None:
+    """
+    Records the current rows of edited months in the history and the change feed.
+
+    All the rows are committed as one group, one commit per dataset, so an undo
+    reverts them together.
 
     Parameters:
-    filename (str): The name of the file to save the data.
-    data (object): The data to be saved.
+    changes (iterable): (dataset, month) pairs, the month in 'MM/YY' format.
 
     Returns:
     None
 
     Complexity:
-    Time: O(n), where n is the size of the data.
-    Space: O(1), constant space usage aside from the file storage.
+    Time: O(r * n), to find the r rows in the session frames.
+    Space: O(r * c), for the records.
+    """
+    months = {}
+    for dataset, month_year in changes:
+        months.setdefault(dataset, []).append(month_year)
+    origin = change_origin()
+    group = history.new_group()
+    for dataset, dataset_months in months.items():
+        df = st.session_state[dataset]
+        rows = {}
+        for month_year in dataset_months:
+            values = changefeed.row_values(df, month_year)
+            if values is not None:
+                rows[month_year] = values
+        if not rows:
+            continue
+        history.get_history(dataset, baseline=df)
+        history.commit_rows(dataset, rows, origin=origin, group=group)
+        for month_year, values in rows.items():
+            changefeed.publish(dataset, month_year, values, origin=origin)
+
+
+def record_change(dataset: str, month_year: str) -> None:
+    """
+    Records the current row of an edited month; see `record_changes`.
     """
-    os.makedirs("bin", exist_ok=True)
-    filepath = os.path.join("bin", filename)
-    with open(filepath, "wb") as file:
-        pickle.dump(data, file)
+    record_changes([(dataset, month_year)])
 
 
-def load_from_binary(filename: str, default_data: object) -> object:
+def backfill(start: str, end: str, values: dict = None) -> list:
     """
-    Loads data from a binary file in the 'bin' directory, returning default data if the file does not exist or cannot be read.
+    Adds every missing month of a range to the session's datasets at once.
+
+    The frames are extended by `backfill_months`, skipping the archived months, and
+    the metric cube and alert engine are dropped so they are rebuilt from them. The added rows, and every df_tp row
+    whose revision columns changed, are recorded in the history as one group and
+    published to the change feed. Persisting is left to the caller, so the whole
+    block is saved once.
 
     Parameters:
-    filename (str): The name of the file to load the data from.
-    default_data (object): The default data to return if loading fails.
+    start (str): First month of the range in 'MM/YY' format.
+    end (str): Last month of the range in 'MM/YY' format.
+    values (dict, optional): Values of the new rows by column.
 
     Returns:
-    object: The loaded data or the default data.
+    list: The months that were added to any dataset.
 
     Complexity:
-    Time: O(n), where n is the size of the data.
-    Space: O(1), constant space usage aside from the loaded data.
+    Time: O((n + m) log(n + m) + m * n), for n stored and m added months.
+    Space: O(n + m), for the extended frames.
+    """
+    df_tp, df_tasks, df_tamanho, added = backfill_months(
+        st.session_state.df_tp,
+        st.session_state.df_tasks,
+        st.session_state.df_tamanho,
+        st.session_state.work_days_dict,
+        start,
+        end,
+        values,
+        skip=tiering.cold_months("df_tp"),
+    )
+    months = sorted(set().union(*added.values()), key=month_ordinal)
+    if not months:
+        return months
+    st.session_state.df_tp = df_tp
+    st.session_state.df_tasks = df_tasks
+    st.session_state.df_tamanho = df_tamanho
+    ARTIFACTS.evict(session_id(), "metric_cube")
+    ARTIFACTS.evict(session_id(), "alert_engine")
+    record_changes(
+        (dataset, month_year)
+        for dataset in SCHEMA_KEYS
+        for month_year in (months if dataset == "df_tp" else added[dataset])
+    )
+    return months
+
+
+def undo_last_change():
     """
-    filepath = os.path.join("bin", filename)
-    if os.path.exists(filepath):
-        with open(filepath, "rb") as file:
-            try:
-                data = pickle.load(file)
-                return data if data is not None else default_data
-            except (EOFError, pickle.UnpicklingError):
-                return default_data
-    return default_data
+    Reverts this session's latest edit with the rest of its group, in the session and
+    for everyone else.
 
+    The restored rows are written to the session frames and published to the change
+    feed; the metric cube is rebuilt when the edit had created rows. Restoring task
+    rows recomputes the revision columns of df_tp, which are committed with the undo.
+
+    Returns:
+    list or None: (dataset, month) of the reverted rows, or None if there is none.
 
-def parse_month_year(str_mm_yy: str) -> tuple[int, int]:
+    Complexity:
+    Time: O(h + r * n), for h commits and r restored rows.
+    Space: O(r * c), for the restored rows.
+    """
+    origin = change_origin()
+    undone = history.undo(SCHEMA_KEYS, origin=origin)
+    if undone is None:
+        return None
+
+    group, rows = undone
+    apply_changes(
+        [
+            {"origin": origin, "dataset": dataset, "month": month_year, "values": values}
+            for dataset, month_year, values in rows
+        ],
+        own=True,
+    )
+    for dataset, month_year, values in rows:
+        changefeed.publish(dataset, month_year, values, origin=origin)
+
+    restored_tp = {month: values for dataset, month, values in rows if dataset == "df_tp"}
+    revised = {}
+    for dataset, month_year, _ in rows:
+        values = changefeed.row_values(st.session_state.df_tp, month_year)
+        if dataset == "df_tasks" and values is not None:
+            if restored_tp.get(month_year) != values:
+                revised[month_year] = values
+    if revised:
+        history.commit_rows("df_tp", revised, origin=origin, group=group, kind="undo")
+        for month_year, values in revised.items():
+            changefeed.publish("df_tp", month_year, values, origin=origin)
+    return [(dataset, month_year) for dataset, month_year, _ in rows]
+
+
+def apply_changes(records: list, own: bool = False) -> int:
     """
-    Converts a date string in 'MM/YY' format to a tuple of integers (year, month).
+    Applies change records of other sessions to this session's frames, cube and alerts.
+
+    Records of archived months are ignored, since those months are read-only.
 
     Parameters:
-    str_mm_yy (str): A string representing month and year in 'MM/YY' format.
+    records (list): Records returned by the change feed.
+    own (bool): Also apply records published by this session.
 
     Returns:
-    tuple[int, int]: A tuple containing the year (YYYY) and month (MM).
+    int: The number of records applied.
 
     Complexity:
-    Time: O(1), constant time operations.
+    Time: O(r * n), for r records over frames of n rows.
+    Space: O(1), aside from appended rows.
+    """
+    origin = change_origin()
+    cold = set(tiering.cold_months("df_tp")) if records else set()
+    applied = 0
+    for record in records:
+        dataset = record["dataset"]
+        if (record["origin"] == origin and not own) or dataset not in SCHEMA_KEYS:
+            continue
+        if record["month"] in cold:
+            # Archived months are read-only; see `produtiva.tiering`.
+            continue
+        df = st.session_state.get(dataset)
+        if df is None or df.empty:
+            df = DEFAULT_FRAMES[dataset](st.session_state.df_tp)
+        df = changefeed.apply_record(df, record)
+        st.session_state[dataset] = df
+        if dataset == "df_tasks":
+            refresh_revisao_row(record["month"])
+        values = record["values"]
+        if values is None:
+            ARTIFACTS.evict(session_id(), "metric_cube")
+            ARTIFACTS.evict(session_id(), "alert_engine")
+        else:
+            if dataset == "df_tp" and values.get("Dias Úteis") is not None:
+                st.session_state.work_days_dict[record["month"]] = values["Dias Úteis"]
+            get_metric_cube().update_from_frame(
+                df, record["month"], person=DEFAULT_PERSON
+            )
+            # Other sessions' edits are logged by the session that made them.
+            get_alert_engine().update_from_frame(
+                df, record["month"], person=DEFAULT_PERSON, log=own
+            )
+        applied += 1
+    return applied
+
+
+def refresh_revisao_row(month_year: str) -> None:
+    """
+    Recomputes the "+ Revisão Task" columns of a df_tp row after its tasks changed.
+
+    Parameters:
+    month_year (str): The month in 'MM/YY' format.
+
+    Returns:
+    None
+
+    Complexity:
+    Time: O(n), to find the rows.
     Space: O(1), constant space usage.
     """
-    mm, yy = str_mm_yy.split("/")
-    return (2000 + int(yy), int(mm))
+    df_tp = st.session_state.df_tp
+    df_tasks = st.session_state.df_tasks
+    rows = df_tp.index[df_tp["Mês/Ano"] == month_year]
+    if rows.empty:
+        return
+    revisadas = df_tasks.loc[
+        df_tasks["Mês/Ano"] == month_year, "TP Tasks Revisadas"
+    ].sum()
+    st.session_state.df_tp = changefeed.apply_record(
+        df_tp,
+        {
+            "dataset": "df_tp",
+            "month": month_year,
+            "values": {
+                "TP Adaptado (22 Dias Úteis) + Revisão Task": (
+                    df_tp.at[rows[0], "TP Adaptado (22 Dias Úteis)"] + revisadas
+                ),
+                "TP Ajustado (Dias Úteis Reais) + Revisão Task": (
+                    df_tp.at[rows[0], "TP Ajustado (Dias Úteis Reais)"] + revisadas
+                ),
+            },
+        },
+    )
+
+
+@timed()
+def sync_changes() -> int:
+    """
+    Brings the session's frames up to date with edits made by other sessions.
+
+    Polling an unchanged feed costs a single stat call. When the feed was rotated,
+    the session drops its frames and derived artifacts and reloads the datasets.
+
+    Returns:
+    int: The number of records applied, or -1 after a full reload.
+
+    Complexity:
+    Time: O(1) when nothing changed; O(r * n) for r new records otherwise.
+    Space: O(r), for the new records.
+    """
+    if "feed_cursor" not in st.session_state:
+        init_session_states()
+        return 0
+    cursor, records, reset = changefeed.poll(st.session_state.feed_cursor)
+    st.session_state.feed_cursor = cursor
+    if reset:
+        for key in (*SCHEMA_KEYS, "work_days_dict", "feed_cursor"):
+            st.session_state.pop(key, None)
+        ARTIFACTS.evict(session_id())
+        init_session_states()
+        return -1
+    return apply_changes(records)
+
+
+def session_id() -> str:
+    """
+    Returns the id of the Streamlit session running the current script.
 
+    Returns:
+    str: The session id, or "local" when running outside a Streamlit server.
+    """
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else "local"
 
-def format_month_year(year: int, month: int) -> str:
+
+def get_artifact(key: str, builder):
     """
-    Converts a year and month tuple to a date string in 'MM/YY' format.
+    Returns a derived artifact of the current session from the process-wide store.
+
+    Artifacts may be evicted when the memory budget is exceeded or the session goes
+    idle, in which case `builder` rebuilds them on the next access.
 
     Parameters:
-    year (int): The year in YYYY format.
-    month (int): The month as an integer (1-12).
+    key (str): The artifact name.
+    builder (callable): Zero-argument function that rebuilds the artifact.
 
     Returns:
-    str: A string representing the month and year in 'MM/YY' format.
+    object: The artifact.
 
     Complexity:
-    Time: O(1), constant time operations.
-    Space: O(1), constant space usage.
+    Time: O(1) when stored, the builder's cost otherwise.
+    Space: O(1), aside from the artifact itself.
+    """
+    return ARTIFACTS.get(session_id(), key, builder)
+
+
+def get_metric_cube() -> MetricCube:
+    """
+    Returns the session's metric cube, building it from the session frames when missing.
+
+    The cube is kept up to date afterwards by passing it to the `add_or_update_month_df_*`
+    functions, so it is only rebuilt after an eviction.
+
+    Returns:
+    MetricCube: The month × metric × person cube for the session data.
+
+    Complexity:
+    Time: O(n * k) when rebuilt, O(1) afterwards.
+    Space: O(n * k), for the dense cube arrays.
+    """
+    return get_artifact(
+        "metric_cube",
+        lambda: MetricCube.from_frames(
+            st.session_state.df_tp,
+            st.session_state.df_tasks,
+            st.session_state.df_tamanho,
+            person=DEFAULT_PERSON,
+        ),
+    )
+
+
+def get_alert_engine() -> AlertEngine:
     """
-    return f"{month:02d}/{str(year)[-2:]}"
+    Returns the session's alert engine, evaluating the session frames when missing.
 
+    The history is evaluated once without logging; afterwards the engine is passed to
+    the `add_or_update_month_df_*` functions, which re-evaluate only the written
+    month's window and log the alerts it starts or stops.
 
-def next_month(str_mm_yy: str) -> str:
+    Returns:
+    AlertEngine: The engine with the rules of `produtiva/data/alert_rules.json`.
+
+    Complexity:
+    Time: O(n * R) when rebuilt, O(1) afterwards.
+    Space: O(n * R), for the conditions of n months and R rules.
     """
-    Given a date string in 'MM/YY' format, returns the next month in the same format.
+
+    def build():
+        engine = AlertEngine(log=True)
+        engine.load_frames(
+            st.session_state.df_tp,
+            st.session_state.df_tasks,
+            st.session_state.df_tamanho,
+            person=DEFAULT_PERSON,
+        )
+        return engine
+
+    return get_artifact("alert_engine", build)
+
+
+@timed()
+def get_trends(**params) -> dict:
+    """
+    Returns the trend statistics of the session's metric cube, cached per data version.
+
+    The result is kept as a session artifact with the cube's write count and the
+    parameters it was computed with, so reruns reuse it until an edit reaches the cube.
 
     Parameters:
-    str_mm_yy (str): A string representing month and year in 'MM/YY' format.
+    **params: Keyword arguments of `produtiva.analytics.compute_trends`.
 
     Returns:
-    str: The next month/year in 'MM/YY' format.
+    dict: The output of `compute_trends` for TREND_METRICS, with the cube's `persons`.
 
     Complexity:
-    Time: O(1), constant time operations.
-    Space: O(1), constant space usage.
+    Time: O(1) when cached, O(n * k * p) otherwise.
+    Space: O(n * k * p), for the statistics.
+    """
+    cube = get_metric_cube()
+    cached = get_artifact("trends", dict)
+    key = (id(cube), cube.version, tuple(sorted(params.items())))
+    if cached.get("key") != key:
+        cached.clear()
+        cached.update(
+            compute_trends(cube.block(TREND_METRICS), cube.months, **params),
+            persons=list(cube.persons),
+            key=key,
+        )
+    return cached
+
+
+@timed()
+def get_anomalies():
     """
-    year, month = parse_month_year(str_mm_yy)
-    month += 1
-    if month > 12:
-        month = 1
-        year += 1
-    return format_month_year(year, month)
+    Returns the anomalies of the session's metric cube, re-scanned when the data changes.
 
+    The scanner is kept as a session artifact, so after an edit only the new months
+    are scored (see `produtiva.anomalies.AnomalyScanner`).
 
-def last_month_in_df(df_tp):
+    Returns:
+    pd.DataFrame: The output of `AnomalyScanner.to_frame`.
+
+    Complexity:
+    Time: O(1) when unchanged, O(n * c) to detect the new months and O(r * c) to
+    score them otherwise.
+    Space: O(n * c), for the scanner's arrays.
+    """
+    cube = get_metric_cube()
+    state = get_artifact("anomalies", lambda: {"scanner": AnomalyScanner()})
+    key = (id(cube), cube.version)
+    if state.get("key") != key:
+        scanner = state["scanner"]
+        scanner.scan(cube.block(SCANNED_METRICS), cube.months, cube.persons)
+        state.update(table=scanner.to_frame(), key=key)
+    return state["table"]
+
+
+@timed()
+def get_yoy() -> dict:
     """
-    Returns the most recent month/year present in df_tp, assuming it's sorted in ascending order.
-    If empty, returns the current month/year in MM/YY format.
+    Returns the year-over-year pivot of the session's metric cube, cached per data version.
+
+    The tables and figures of every metric are slices of the same pivot. When older
+    years were archived to the cold tier, the pivot is computed from a cube of the
+    full history instead, rebuilt only when the data or the segments change.
+
+    Returns:
+    dict: The output of `produtiva.yoy.compute_yoy` for DEFAULT_PERSON.
+
+    Complexity:
+    Time: O(1) when cached, O(y * 12 * k) otherwise, plus O(n * k) to build the
+    full-history cube when there are cold years.
+    Space: O(y * 12 * k), for the pivot and deltas.
+    """
+    cube = get_metric_cube()
+    cached = get_artifact("yoy", dict)
+    cold = tiering.cold_version()
+    key = (id(cube), cube.version, cold)
+    if cached.get("key") != key:
+        if cold:
+            frames = tiering.full_frames(
+                {name: st.session_state[name] for name in SCHEMA_KEYS}
+            )
+            cube = MetricCube.from_frames(
+                *(frames[name] for name in SCHEMA_KEYS), person=DEFAULT_PERSON
+            )
+        cached.clear()
+        cached.update(compute_yoy(cube, DEFAULT_PERSON), key=key)
+    return cached
+
+
+def get_range_frames(start: str, end: str) -> tuple:
+    """
+    Returns the three session datasets restricted to [start, end], cold years included.
+
+    Cold segments are only read when `start` precedes the first hot month (see
+    `produtiva.tiering.select_range`); they are decoded once per file version.
 
     Parameters:
-    df_tp (DataFrame): A pandas DataFrame containing a column "Mês/Ano".
+    start (str): First month of the range in 'MM/YY' format.
+    end (str): Last month of the range in 'MM/YY' format.
 
     Returns:
-    str: The most recent month/year in MM/YY format.
+    tuple: (df_tp, df_tasks, df_tamanho) inside the range.
 
     Complexity:
-    Time: O(n log n) due to sorting.
-    Space: O(n), storing unique values.
+    Time: O(log n + k), for k rows in the range, plus the first read of the touched
+    segments.
+    Space: O(k), for the selected rows.
     """
-    if df_tp.empty:
-        return datetime.datetime.now().strftime("%m/%y")
+    return tuple(
+        tiering.select_range(name, st.session_state[name], start, end)
+        for name in SCHEMA_KEYS
+    )
 
-    df_tp_sorted = sorted(df_tp["Mês/Ano"].unique(), key=lambda x: parse_month_year(x))
-    return df_tp_sorted[-1]
 
+@timed()
+def get_leaderboard(
+    metric: str, period: str = "quarter", k: int = DEFAULT_TOP, by: str = "value"
+):
+    """
+    Returns a top-k ranking of the people in the session's metric cube, cached per data version.
 
-def init_session_states() -> None:
+    The period roll-up of each (metric, period) and each ranking computed from it are
+    kept until an edit reaches the cube, so reruns and other rankings of the same
+    roll-up do not scan the cube again.
+
+    Parameters:
+    metric (str): One of `produtiva.leaderboard.LEADERBOARD_METRICS`.
+    period (str): "month", "quarter" or "year".
+    k (int): Number of people to list.
+    by (str): "value" or "improvement" against the previous period.
+
+    Returns:
+    pd.DataFrame: The output of `produtiva.leaderboard.leaderboard` for the latest period.
+
+    Complexity:
+    Time: O(1) when cached, O(p + k log k) for a new ranking and O(n * p) for a new
+    roll-up.
+    Space: O(n * p) per cached roll-up.
     """
-    Initialize session state variables in Streamlit with default values or load from binary files.
+    cube = get_metric_cube()
+    cached = get_artifact("leaderboard", dict)
+    key = (id(cube), cube.version)
+    if cached.get("key") != key:
+        cached.clear()
+        cached["key"] = key
+    if (metric, period) not in cached:
+        cached[metric, period] = period_scores(cube, metric, period)
+    if (metric, period, k, by) not in cached:
+        cached[metric, period, k, by] = leaderboard(cached[metric, period], k, by)
+    return cached[metric, period, k, by]
+
+
+@timed()
+def get_projection(year: int = None) -> dict:
+    """
+    Returns the Monte Carlo projection of a year for the session's df_tp, cached per data version.
+
+    The scenarios use a fixed seed, so the numbers shown only change when the data does.
+
+    Parameters:
+    year (int, optional): Year to project; the year of the latest month when omitted.
+
+    Returns:
+    dict: The output of `produtiva.projection.simulate_year`.
+
+    Complexity:
+    Time: O(1) when cached, O(s * r) otherwise, for s scenarios and r remaining months.
+    Space: O(s * r) while simulating.
+    """
+    cube = get_metric_cube()
+    cached = get_artifact("projection", dict)
+    key = (id(cube), cube.version, year)
+    if cached.get("key") != key:
+        cached.clear()
+        cached.update(simulate_year(st.session_state.df_tp, year, seed=0), key=key)
+    return cached
+
+
+@timed()
+def record_memory_usage() -> None:
+    """
+    Measures the current session's state and artifacts and enforces the memory budget.
 
     Returns:
     None
 
     Complexity:
-    Time: O(n), where n is the size of the data being loaded.
-    Space: O(1), constant space usage aside from loaded data.
+    Time: O(n), where n is the size of the session state and artifacts.
+    Space: O(k), for the per-key sizes.
     """
-    default_values = {
-        "df_tp": lambda: load_from_binary("df_tp.pkl", create_df_tp()),
-        "df_tasks": lambda: load_from_binary("df_tasks.pkl", None),
-        "df_tamanho": lambda: load_from_binary("df_tamanho.pkl", None),
-        "need_rerun": lambda: False,
-        "work_days_dict": lambda: load_from_binary(
-            "work_days_dict.pkl", DEFAULT_WORK_DAYS
-        ),
+    ARTIFACTS.record_state(session_id(), st.session_state)
+    ARTIFACTS.refresh(session_id())
+
+
+@timed()
+def persist_data(wait: bool = False) -> list:
+    """
+    Save session state data to binary files in the 'bin' directory.
+
+    With PRODUTIVA_PERSIST_MODE=background (the default), the datasets are handed to
+    the write-behind persister and written off the script thread; otherwise they are
+    written inline.
+
+    Parameters:
+    wait (bool): Whether to block until the datasets are durably on disk.
+
+    Returns:
+    list: The WriteTicket of each dataset, or an empty list when written inline.
+
+    Complexity:
+    Time: O(n), where n is the total size of all data being saved; only the snapshot
+    copies run on the script thread in background mode.
+    Space: O(n), for the snapshots waiting to be written.
+    """
+    datasets = {
+        "df_tp.pkl": enforce_schema(st.session_state.df_tp, "df_tp"),
+        "df_tasks.pkl": enforce_schema(st.session_state.df_tasks, "df_tasks"),
+        "df_tamanho.pkl": enforce_schema(st.session_state.df_tamanho, "df_tamanho"),
+        "work_days_dict.pkl": st.session_state.work_days_dict,
     }
+    if PERSIST_MODE == "inline":
+        for filename, data in datasets.items():
+            save_to_binary(filename, data)
+        return []
 
-    for key, value_loader in default_values.items():
-        if key not in st.session_state:
-            st.session_state[key] = value_loader()
+    tickets = [PERSISTER.submit(filename, data) for filename, data in datasets.items()]
+    if wait:
+        for ticket in tickets:
+            ticket.wait()
+    return tickets
 
 
-def persist_data() -> None:
+@contextmanager
+def profiled_rerun(page: str):
     """
-    Save session state data to binary files in the 'bin' directory.
+    Profiles the current rerun of a page when PRODUTIVA_PROFILE=1.
+
+    The last PROFILE_HISTORY reruns are kept in the session state for the sidebar panel,
+    and every rerun is appended to the PRODUTIVA_PROFILE_JSONL file when it is set.
+
+    Parameters:
+    page (str): Name of the page being rendered.
 
     Returns:
     None
 
     Complexity:
-    Time: O(n), where n is the total size of all data being saved.
-    Space: O(1), constant space usage aside from the file storage.
+    Time: O(s), where s is the number of stages recorded.
+    Space: O(PROFILE_HISTORY * s), for the kept reruns.
     """
-    save_to_binary("df_tp.pkl", st.session_state.df_tp)
-    save_to_binary("df_tasks.pkl", st.session_state.df_tasks)
-    save_to_binary("df_tamanho.pkl", st.session_state.df_tamanho)
-    save_to_binary("work_days_dict.pkl", st.session_state.work_days_dict)
+    if not profiling.PROFILING_ENABLED:
+        yield
+        return
+
+    if "profiling_history" not in st.session_state:
+        st.session_state.profiling_history = deque(maxlen=PROFILE_HISTORY)
+    with profiling.rerun(
+        page, history=st.session_state.profiling_history, sink=profiling.JSONL_SINK
+    ):
+        yield
@@ -1,71 +1,18 @@
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import plotly.subplots as sp
-import json
-import os
-
-
-def load_json_config(file_name):
-    """
-    Load configuration data from a JSON file located in the 'data' directory.
-
-    Parameters:
-    file_name (str): The name of the JSON file to load.
-
-    Returns:
-    dict: A dictionary containing the loaded data.
-    """
-    data_path = os.path.join("data", file_name)
-    with open(data_path, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-
-DATA_TP_CREATE = load_json_config("tp_create.json")
-DATA_TASKS_BASE = load_json_config("tasks_base.json")
-DATA_TAMANHO_TASK_BASE = load_json_config("tamanho_task_base.json")
-WORK_DAYS_POA_CREATE = {
-    "04/24": 22,
-    "05/24": 22,
-    "06/24": 20,
-    "07/24": 23,
-    "08/24": 22,
-    "09/24": 21,
-    "10/24": 23,
-    "11/24": 20,
-    "12/24": 15,
-    "01/25": 20,
-}
-
-
-def create_df_tp():
-    """
-    Creates a DataFrame containing task productivity data for specific months.
-
-    This function initializes a DataFrame with predefined values for monthly productivity,
-    calculates adjusted productivity based on actual working days, and returns the finalized DataFrame.
-
-    Returns:
-    pd.DataFrame: A DataFrame containing the columns 'Mês/Ano', 'TP Adaptado (22 Dias Úteis)',
-    'TP Ideal (22 Dias Úteis)', 'Dias Úteis', 'TP Ajustado (Dias Úteis Reais)',
-    and 'TP Ideal Ajustado (Dias Úteis Reais)'.
-
-    Complexity:
-    Time: O(n), where n is the number of months.
-    Space: O(n), for storing the productivity data.
-    """
-    df_tp = pd.DataFrame(DATA_TP_CREATE)
-    df_tp["Dias Úteis"] = df_tp["Mês/Ano"].map(WORK_DAYS_POA_CREATE)
-
-    df_tp["TP Ajustado (Dias Úteis Reais)"] = df_tp["TP Adaptado (22 Dias Úteis)"] * (
-        22 / df_tp["Dias Úteis"]
-    )
-    df_tp["TP Ideal Ajustado (Dias Úteis Reais)"] = df_tp[
-        "TP Ideal (22 Dias Úteis)"
-    ] * (df_tp["Dias Úteis"] / 22)
-
-    return df_tp
+from produtiva.profiling import stage, timed
+from produtiva.analytics import TREND_METRICS
+from produtiva.sizing import DIVERGENT, SIZE_TP
+from produtiva.yoy import MONTH_NAMES
+from produtiva.frames import (
+    WORK_DAYS_POA_CREATE,
+    DEFAULT_PERSON,
+    create_df_tp,
+    create_df_tasks,
+    create_df_produtividade_geral,
+    create_df_tamanho_task,
+    add_or_update_month_df_tp,
+    add_or_update_month_df_tasks,
+    add_or_update_month_df_tamanho_task,
+)
 
 
 def get_layout_config():
@@ -111,18 +58,24 @@ def get_layout_config():
     )
 
 
-def create_fig_tp(df_tp, layout_config):
+@timed()
+def create_fig_tp(df_tp, layout_config, df_size_tp=None, period_column="Mês/Ano"):
     """
     Generates a line chart to visualize task productivity trends.
 
     This function processes the input productivity DataFrame by transforming it into a long format,
-    allowing visualization of different productivity metrics over time.
+    allowing visualization of different productivity metrics over time. When the size-derived TP is
+    given, it is drawn as an extra dashed series, with the months whose entered TP diverges from it
+    marked.
 
     Parameters:
     df_tp (pd.DataFrame): DataFrame containing productivity data with columns 'Mês/Ano',
         'TP Adaptado (22 Dias Úteis)', 'TP Ajustado (Dias Úteis Reais)',
         'TP Ideal (22 Dias Úteis)', 'TP Ideal Ajustado (Dias Úteis Reais)'.
     layout_config (dict): Dictionary containing layout configurations for the chart.
+    df_size_tp (pd.DataFrame, optional): Output of `produtiva.sizing.size_weighted_tp`.
+    period_column (str): Column of the x axis; weekly and quarterly frames from
+        `produtiva.weeks.resample` use "Semana" and "Trimestre".
 
     Returns:
     plotly.graph_objs._figure.Figure: A Plotly figure object representing the task productivity trends.
@@ -131,17 +84,20 @@ def create_fig_tp(df_tp, layout_config):
     Time: O(n), where n is the number of rows in df_tp.
     Space: O(n), since a melted version of the DataFrame is created.
     """
-    df_tp_melted = df_tp.melt(
-        id_vars=["Mês/Ano"],
-        value_vars=[
-            "TP Adaptado (22 Dias Úteis)",
-            "TP Ajustado (Dias Úteis Reais)",
-            "TP Ideal (22 Dias Úteis)",
-            "TP Ideal Ajustado (Dias Úteis Reais)",
-        ],
-        var_name="Tipo de TP",
-        value_name="Valor",
-    )
+    import plotly.express as px
+
+    with stage("melt_tp"):
+        df_tp_melted = df_tp.melt(
+            id_vars=[period_column],
+            value_vars=[
+                "TP Adaptado (22 Dias Úteis)",
+                "TP Ajustado (Dias Úteis Reais)",
+                "TP Ideal (22 Dias Úteis)",
+                "TP Ideal Ajustado (Dias Úteis Reais)",
+            ],
+            var_name="Tipo de TP",
+            value_name="Valor",
+        )
 
     color_map = {
         "TP Adaptado (22 Dias Úteis)": "#2F4F4F",
@@ -152,7 +108,7 @@ def create_fig_tp(df_tp, layout_config):
 
     fig = px.line(
         df_tp_melted,
-        x="Mês/Ano",
+        x=period_column,
         y="Valor",
         color="Tipo de TP",
         markers=True,
@@ -161,43 +117,34 @@ def create_fig_tp(df_tp, layout_config):
         color_discrete_map=color_map,
     )
     fig.update_traces(line=dict(width=4))
+    if df_size_tp is not None:
+        import plotly.graph_objects as go
+
+        fig.add_trace(
+            go.Scatter(
+                x=df_size_tp["Mês/Ano"],
+                y=df_size_tp[SIZE_TP],
+                name=SIZE_TP,
+                mode="lines+markers",
+                line=dict(width=4, dash="dash", color="#FF8C00", shape="spline"),
+            )
+        )
+        divergent = df_size_tp[df_size_tp[DIVERGENT]]
+        fig.add_trace(
+            go.Scatter(
+                x=divergent["Mês/Ano"],
+                y=divergent["TP Adaptado (22 Dias Úteis)"],
+                name="Divergência TP x Tamanho",
+                mode="markers",
+                marker=dict(symbol="x", size=16, color="#DC143C"),
+            )
+        )
     fig.update_layout(**layout_config, title_text="Produtividade Tasks", title_x=0.36)
 
     return fig
 
 
-def create_df_tasks(df_tp):
-    """
-    Generates a tasks DataFrame by merging base data with existing months in df_tp.
-
-    This function returns a DataFrame containing the months from df_tp and merges it with predefined task data.
-    If there are new months in df_tp, they will be included with default values of 0.
-
-    Parameters:
-    df_tp (pd.DataFrame): DataFrame containing months to be merged with the task base data.
-
-    Returns:
-    pd.DataFrame: A DataFrame containing task productivity per month/year.
-
-    Complexity:
-    Time: O(n), where n is the number of months.
-    Space: O(n), for storing the task data.
-    """
-    df_tasks_base = pd.DataFrame(DATA_TASKS_BASE)
-
-    df_tasks_merged = pd.merge(
-        df_tp[["Mês/Ano"]], df_tasks_base, on="Mês/Ano", how="left"
-    )
-    df_tasks_merged["TP Tasks Revisadas"] = df_tasks_merged[
-        "TP Tasks Revisadas"
-    ].fillna(0)
-    df_tasks_merged["TP Adaptado Tasks Revisadas"] = df_tasks_merged[
-        "TP Adaptado Tasks Revisadas"
-    ].fillna(0)
-
-    return df_tasks_merged
-
-
+@timed()
 def create_fig_tasks(df_tasks, layout_config):
     """
     Generates a line chart for reviewed task productivity.
@@ -216,12 +163,15 @@ def create_fig_tasks(df_tasks, layout_config):
     Time: O(n), where n is the number of rows in df_tasks.
     Space: O(n), since a melted version of the DataFrame is created.
     """
-    df_tasks_melted = df_tasks.melt(
-        id_vars=["Mês/Ano"],
-        value_vars=["TP Tasks Revisadas", "TP Adaptado Tasks Revisadas"],
-        var_name="Tipo de TP",
-        value_name="Valor",
-    )
+    import plotly.express as px
+
+    with stage("melt_tasks"):
+        df_tasks_melted = df_tasks.melt(
+            id_vars=["Mês/Ano"],
+            value_vars=["TP Tasks Revisadas", "TP Adaptado Tasks Revisadas"],
+            var_name="Tipo de TP",
+            value_name="Valor",
+        )
 
     color_map = {
         "TP Tasks Revisadas": "#006400",
@@ -246,47 +196,7 @@ def create_fig_tasks(df_tasks, layout_config):
     return fig
 
 
-def create_df_produtividade_geral(df_tp, df_tasks):
-    """
-    Generates a productivity DataFrame by merging task data with productivity data.
-
-    This function calculates adjusted productivity values by combining the existing productivity data
-    with reviewed task data. The resulting DataFrame is transformed into a long format for visualization purposes.
-
-    Parameters:
-    df_tp (pd.DataFrame): DataFrame containing productivity data with columns related to task productivity.
-    df_tasks (pd.DataFrame): DataFrame containing reviewed task data.
-
-    Returns:
-    pd.DataFrame: A melted DataFrame containing productivity values per month/year and task type.
-
-    Complexity:
-    Time: O(n), where n is the number of rows in df_tp.
-    Space: O(n), since a new DataFrame is created.
-    """
-    df_tp["TP Adaptado (22 Dias Úteis) + Revisão Task"] = (
-        df_tp["TP Adaptado (22 Dias Úteis)"] + df_tasks["TP Tasks Revisadas"]
-    )
-    df_tp["TP Ajustado (Dias Úteis Reais) + Revisão Task"] = (
-        df_tp["TP Ajustado (Dias Úteis Reais)"] + df_tasks["TP Tasks Revisadas"]
-    )
-
-    df_produtividade_geral = df_tp.melt(
-        id_vars=["Mês/Ano"],
-        value_vars=[
-            "TP Adaptado (22 Dias Úteis)",
-            "TP Ajustado (Dias Úteis Reais)",
-            "TP Ideal (22 Dias Úteis)",
-            "TP Ideal Ajustado (Dias Úteis Reais)",
-            "TP Adaptado (22 Dias Úteis) + Revisão Task",
-            "TP Ajustado (Dias Úteis Reais) + Revisão Task",
-        ],
-        var_name="Tipo de TP",
-        value_name="Valor",
-    )
-    return df_produtividade_geral
-
-
+@timed()
 def create_fig_produtividade_geral(df_produtividade_geral, layout_config):
     """
     Generates a line chart for general productivity tasks.
@@ -305,6 +215,8 @@ def create_fig_produtividade_geral(df_produtividade_geral, layout_config):
     Time: O(n), where n is the number of rows in df_produtividade_geral.
     Space: O(1), constant space aside from the figure object.
     """
+    import plotly.express as px
+
     color_map = {
         "TP Adaptado (22 Dias Úteis)": "#2F4F4F",
         "TP Ajustado (Dias Úteis Reais)": "#8B0000",
@@ -332,36 +244,62 @@ def create_fig_produtividade_geral(df_produtividade_geral, layout_config):
     return fig
 
 
-def create_df_tamanho_task(df_tp):
+def create_stacked_task_bars(row, bar_width):
     """
-    Generates a DataFrame containing task size information for specific months.
+    Generates the stacked P/M/G bars ("TP Normal") of a single month.
 
-    This function merges a base dataset with the provided df_tp DataFrame, ensuring that
-    all months in df_tp are present and filling missing values with zero.
+    These bars are the per-month fragments of the task size chart, so they can be cached
+    and reused by every month window that contains the same month values.
 
     Parameters:
-    df_tp (pd.DataFrame): DataFrame containing months to be merged with the task size base data.
+    row (pd.Series): A row of the task size DataFrame.
+    bar_width (float): Width of each bar.
 
     Returns:
-    pd.DataFrame: A DataFrame containing task size details per month/year.
+    tuple[go.Bar, go.Bar, go.Bar]: The stacked bars for tasks P, M and G.
 
     Complexity:
-    Time: O(n), where n is the number of months.
-    Space: O(n), for storing the task size data.
+    Time: O(1), constant number of traces.
+    Space: O(1), constant number of traces.
     """
-    df_tamanho_task_base = pd.DataFrame(DATA_TAMANHO_TASK_BASE)
+    import plotly.graph_objects as go
 
-    df_tamanho_task_merged = pd.merge(
-        df_tp[["Mês/Ano"]], df_tamanho_task_base, on="Mês/Ano", how="left"
+    return (
+        go.Bar(
+            x=[row["Mês/Ano"]],
+            y=[row["Task P"]],
+            name="TP Normal (P)",
+            marker_color="#FFD700",
+            offsetgroup="group4",
+            base=0,
+            width=bar_width,
+            showlegend=False,
+        ),
+        go.Bar(
+            x=[row["Mês/Ano"]],
+            y=[row["Task M"]],
+            name="TP Normal (M)",
+            marker_color="#2F4F4F",
+            offsetgroup="group4",
+            base=row["Task P"],
+            width=bar_width,
+            showlegend=False,
+        ),
+        go.Bar(
+            x=[row["Mês/Ano"]],
+            y=[row["Task G"]],
+            name="TP Normal (G)",
+            marker_color="#8B0000",
+            offsetgroup="group4",
+            base=row["Task P"] + row["Task M"],
+            width=bar_width,
+            showlegend=False,
+        ),
     )
-    df_tamanho_task_merged["Task P"] = df_tamanho_task_merged["Task P"].fillna(0)
-    df_tamanho_task_merged["Task M"] = df_tamanho_task_merged["Task M"].fillna(0)
-    df_tamanho_task_merged["Task G"] = df_tamanho_task_merged["Task G"].fillna(0)
-
-    return df_tamanho_task_merged
 
 
-def create_fig_tamanho_task(df_tamanho_task):
+@timed()
+def create_fig_tamanho_task(df_tamanho_task, fragment_cache=None):
     """
     Generates a grouped bar chart representing task size productivity over months.
 
@@ -370,6 +308,9 @@ def create_fig_tamanho_task(df_tamanho_task):
 
     Parameters:
     df_tamanho_task (pd.DataFrame): DataFrame containing task size data per month/year.
+    fragment_cache (dict, optional): Cache of per-month stacked bars keyed by month and values,
+        shared across calls so overlapping month windows reuse already built traces. Pass a
+        bounded `produtiva.memory.LRUCache` so edited months do not accumulate.
 
     Returns:
     plotly.graph_objs._figure.Figure: A Plotly figure object representing the task size distribution.
@@ -377,7 +318,12 @@ def create_fig_tamanho_task(df_tamanho_task):
     Complexity:
     Time: O(n * k), where n is the number of months and k is the number of task types (P, M, G).
     Space: O(n), for storing the figure data.
+
+    The month separators are set in a single layout update, since adding shapes one
+    by one re-validates every existing shape and is quadratic in the number of months.
     """
+    import plotly.graph_objects as go
+
     bar_width = 0.20
     fig_tamanho_task = go.Figure()
 
@@ -413,57 +359,31 @@ def create_fig_tamanho_task(df_tamanho_task):
     )
 
     for index, row in df_tamanho_task.iterrows():
-        fig_tamanho_task.add_trace(
-            go.Bar(
-                x=[row["Mês/Ano"]],
-                y=[row["Task P"]],
-                name="TP Normal (P)",
-                marker_color="#FFD700",
-                offsetgroup="group4",
-                base=0,
-                width=bar_width,
-                showlegend=False,
-            )
-        )
-        fig_tamanho_task.add_trace(
-            go.Bar(
-                x=[row["Mês/Ano"]],
-                y=[row["Task M"]],
-                name="TP Normal (M)",
-                marker_color="#2F4F4F",
-                offsetgroup="group4",
-                base=row["Task P"],
-                width=bar_width,
-                showlegend=False,
-            )
-        )
-        fig_tamanho_task.add_trace(
-            go.Bar(
-                x=[row["Mês/Ano"]],
-                y=[row["Task G"]],
-                name="TP Normal (G)",
-                marker_color="#8B0000",
-                offsetgroup="group4",
-                base=row["Task P"] + row["Task M"],
-                width=bar_width,
-                showlegend=False,
+        key = (row["Mês/Ano"], row["Task P"], row["Task M"], row["Task G"])
+        stacked_bars = fragment_cache.get(key) if fragment_cache is not None else None
+        if stacked_bars is None:
+            stacked_bars = create_stacked_task_bars(row, bar_width)
+            if fragment_cache is not None:
+                fragment_cache[key] = stacked_bars
+        fig_tamanho_task.add_traces(stacked_bars)
+
+    max_total = max(
+        df_tamanho_task["Task P"] + df_tamanho_task["Task M"] + df_tamanho_task["Task G"],
+        default=0,
+    )
+    fig_tamanho_task.update_layout(
+        shapes=[
+            dict(
+                type="line",
+                x0=i + 0.5,
+                x1=i + 0.5,
+                y0=0,
+                y1=max_total,
+                line=dict(color="black", width=2, dash="dot"),
             )
-        )
-
-    for i in range(len(df_tamanho_task["Mês/Ano"]) - 1):
-        midpoint = i + 0.5
-        fig_tamanho_task.add_shape(
-            type="line",
-            x0=midpoint,
-            x1=midpoint,
-            y0=0,
-            y1=max(
-                df_tamanho_task["Task P"]
-                + df_tamanho_task["Task M"]
-                + df_tamanho_task["Task G"]
-            ),
-            line=dict(color="black", width=2, dash="dot"),
-        )
+            for i in range(len(df_tamanho_task["Mês/Ano"]) - 1)
+        ]
+    )
 
     fig_tamanho_task.update_layout(
         barmode="group",
@@ -503,6 +423,7 @@ def create_fig_tamanho_task(df_tamanho_task):
     return fig_tamanho_task
 
 
+@timed()
 def create_fig_all(fig_tp, fig_tasks, fig_produtividade_geral, fig_tamanho_task):
     """
     Combines multiple productivity charts into a single subplot layout.
@@ -523,6 +444,8 @@ def create_fig_all(fig_tp, fig_tasks, fig_produtividade_geral, fig_tamanho_task)
     Time: O(n), where n is the number of traces in the figures.
     Space: O(1), constant space for storing the figure references.
     """
+    import plotly.subplots as sp
+
     subplot_titles = [
         "Produtividade Tasks",
         "Produtividade Tasks Revisadas",
@@ -560,149 +483,294 @@ def create_fig_all(fig_tp, fig_tasks, fig_produtividade_geral, fig_tamanho_task)
     fig_all.update_layout(
         height=1000,
         width=1500,
-        title="Produtividade: Pedro Henrique Casarotto Rigon",
+        title=f"Produtividade: {DEFAULT_PERSON}",
         showlegend=True,
     )
     return fig_all
 
 
-def add_or_update_month_df_tp(
-    df_tp, df_tasks, work_days_dict, month_year, tp_adaptado_22, tp_ideal_22, dias_uteis
-):
+def add_trend_overlays(fig, trends, metrics, person=DEFAULT_PERSON, months=None):
     """
-    Adds or updates a month entry in the df_tp DataFrame.
-
-    This function updates productivity values for a given month, including adjustments
-    based on working days and reviewed tasks.
+    Adds rolling mean ± standard deviation bands, EWMA and forecast traces to a figure.
 
     Parameters:
-    df_tp (pd.DataFrame): DataFrame containing productivity data per month/year.
-    df_tasks (pd.DataFrame): DataFrame containing reviewed tasks data.
-    work_days_dict (dict): Dictionary storing working days for each month.
-    month_year (str): The month/year identifier in the format 'MM/YY'.
-    tp_adaptado_22 (int): Adapted TP for 22 business days.
-    tp_ideal_22 (int): Ideal TP for 22 business days.
-    dias_uteis (int): Actual number of business days for the given month.
+    fig (plotly.graph_objs.Figure): A figure with one trace per metric, as `create_fig_tp`.
+    trends (dict): Output of `helpers.get_trends` (or `compute_trends` plus "persons").
+    metrics (iterable): Metrics of TREND_METRICS to overlay; their trace colors are
+        reused and the forecast continues from their last point.
+    person (str): Person whose series are drawn.
+    months (iterable, optional): Months shown in the figure; all months when omitted.
+        The forecast is only drawn when the last stored month is shown.
 
     Returns:
-    pd.DataFrame: Updated df_tp DataFrame with new or modified month data.
+    plotly.graph_objs.Figure: The same figure, with the overlay traces.
 
     Complexity:
-    Time: O(n), where n is the number of rows in df_tp.
-    Space: O(1), modifying the existing DataFrame.
+    Time: O(n * m), for n months and m metrics.
+    Space: O(n * m), for the traces.
     """
-    work_days_dict[month_year] = dias_uteis
+    import plotly.graph_objects as go
+
+    if person not in trends["persons"] or not trends["months"]:
+        return fig
+    slot = trends["persons"].index(person)
+    shown = set(trends["months"] if months is None else months)
+    keep = [i for i, m in enumerate(trends["months"]) if m in shown]
+    x = [trends["months"][i] for i in keep]
+    colors = {trace.name: trace.line.color for trace in fig.data}
+    last_points = {
+        trace.name: (trace.x[-1], trace.y[-1])
+        for trace in fig.data
+        if trace.y is not None and len(trace.y)
+    }
 
-    if month_year in df_tp["Mês/Ano"].values:
-        idx = df_tp.index[df_tp["Mês/Ano"] == month_year][0]
-        df_tp.at[idx, "TP Adaptado (22 Dias Úteis)"] = tp_adaptado_22
-        df_tp.at[idx, "TP Ideal (22 Dias Úteis)"] = tp_ideal_22
-    else:
-        task_row = df_tasks.loc[
-            df_tasks["Mês/Ano"] == month_year, "TP Tasks Revisadas"
-        ].sum()
-        new_data = {
-            "Mês/Ano": month_year,
-            "TP Adaptado (22 Dias Úteis)": tp_adaptado_22,
-            "TP Ideal (22 Dias Úteis)": tp_ideal_22,
-            "Dias Úteis": dias_uteis,
-            "TP Ajustado (Dias Úteis Reais)": tp_adaptado_22 * (22 / dias_uteis),
-            "TP Ideal Ajustado (Dias Úteis Reais)": tp_ideal_22 * (dias_uteis / 22),
-            "TP Adaptado (22 Dias Úteis) + Revisão Task": tp_adaptado_22 + task_row,
-            "TP Ajustado (Dias Úteis Reais) + Revisão Task": (
-                tp_adaptado_22 * (22 / dias_uteis)
+    for metric in metrics:
+        i = TREND_METRICS.index(metric)
+        color = colors.get(metric) or "#555555"
+        mean = trends["rolling_mean"][keep, i, slot]
+        std = trends["rolling_std"][keep, i, slot]
+        fig.add_trace(
+            go.Scatter(
+                x=x,
+                y=mean + std,
+                mode="lines",
+                line=dict(width=0, color=color),
+                legendgroup=f"band {metric}",
+                name=f"Média Móvel + DP · {metric}",
+                showlegend=False,
+                hoverinfo="skip",
             )
-            + task_row,
-        }
-        df_tp = pd.concat([df_tp, pd.DataFrame([new_data])], ignore_index=True)
+        )
+        fig.add_trace(
+            go.Scatter(
+                x=x,
+                y=mean - std,
+                mode="lines",
+                line=dict(width=0, color=color),
+                fill="tonexty",
+                opacity=0.2,
+                legendgroup=f"band {metric}",
+                name=f"Média Móvel ± DP · {metric}",
+            )
+        )
+        fig.add_trace(
+            go.Scatter(
+                x=x,
+                y=mean,
+                mode="lines",
+                line=dict(width=2, dash="dot", color=color),
+                legendgroup=f"band {metric}",
+                name=f"Média Móvel · {metric}",
+            )
+        )
+        fig.add_trace(
+            go.Scatter(
+                x=x,
+                y=trends["ewma"][keep, i, slot],
+                mode="lines",
+                line=dict(width=2, dash="dashdot", color=color),
+                name=f"MME · {metric}",
+            )
+        )
+        if trends["months"][-1] in shown and metric in last_points:
+            last_x, last_y = last_points[metric]
+            fig.add_trace(
+                go.Scatter(
+                    x=[last_x, *trends["forecast_months"]],
+                    y=[last_y, *trends["forecast"][:, i, slot]],
+                    mode="lines+markers",
+                    line=dict(width=3, dash="dash", color=color),
+                    marker=dict(symbol="diamond-open", size=10),
+                    name=f"Previsão · {metric}",
+                )
+            )
+    return fig
 
-    df_tp["Dias Úteis"] = df_tp["Mês/Ano"].map(work_days_dict)
-    df_tp["TP Ajustado (Dias Úteis Reais)"] = df_tp["TP Adaptado (22 Dias Úteis)"] * (
-        22 / df_tp["Dias Úteis"]
-    )
-    df_tp["TP Ideal Ajustado (Dias Úteis Reais)"] = df_tp[
-        "TP Ideal (22 Dias Úteis)"
-    ] * (df_tp["Dias Úteis"] / 22)
-    df_tp["TP Adaptado (22 Dias Úteis) + Revisão Task"] = (
-        df_tp["TP Adaptado (22 Dias Úteis)"] + df_tasks["TP Tasks Revisadas"]
-    )
-    df_tp["TP Ajustado (Dias Úteis Reais) + Revisão Task"] = (
-        df_tp["TP Ajustado (Dias Úteis Reais)"] + df_tasks["TP Tasks Revisadas"]
-    )
-    return df_tp
+
+ANOMALY_LABELS = {
+    "outlier": "Fora do padrão",
+    "drop": "Queda brusca",
+    "impossible": "Valor impossível",
+}
+ANOMALY_MARKERS = {
+    "outlier": ("circle-open", "#FF8C00"),
+    "drop": ("triangle-down", "#B22222"),
+    "impossible": ("x", "#800080"),
+}
 
 
-def add_or_update_month_df_tasks(
-    df_tasks, month_year, tp_tasks_revisadas, tp_adaptado_tasks_revisadas
-):
+def add_anomaly_markers(fig, anomalies, person=DEFAULT_PERSON):
     """
-    Adds or updates a month's data in the df_tasks DataFrame.
+    Marks the anomalous months of a figure's series.
+
+    Parameters:
+    fig (plotly.graph_objs.Figure): A figure with one trace per metric, as `create_fig_tp`.
+    anomalies (pd.DataFrame): Output of `helpers.get_anomalies`.
+    person (str): Person whose anomalies are drawn.
+
+    Returns:
+    plotly.graph_objs.Figure: The same figure, with one marker trace per anomaly type.
 
-    This function updates productivity values for a given month or adds a new row if the month does not exist.
+    Complexity:
+    Time: O(a + t * n), for a anomalies and t traces of n months.
+    Space: O(a), for the markers.
+    """
+    import plotly.graph_objects as go
+
+    shown = {
+        trace.name: set(trace.x) for trace in fig.data if trace.x is not None
+    }
+    rows = anomalies[
+        (anomalies["Pessoa"] == person)
+        & anomalies["Métrica"].isin(list(shown))
+    ]
+    visible = [
+        month in shown[metric] for month, metric in zip(rows["Mês/Ano"], rows["Métrica"])
+    ]
+    rows = rows.loc[visible]
+    for check, group in rows.groupby("Anomalia"):
+        symbol, color = ANOMALY_MARKERS[check]
+        fig.add_trace(
+            go.Scatter(
+                x=group["Mês/Ano"],
+                y=group["Valor"],
+                mode="markers",
+                marker=dict(symbol=symbol, size=16, color=color, line=dict(width=3)),
+                name=f"Anomalia ({ANOMALY_LABELS[check]})",
+                customdata=group[["Métrica", "Esperado"]],
+                hovertemplate="%{customdata[0]}: %{y:.2f} (esperado %{customdata[1]:.2f})",
+            )
+        )
+    return fig
+
+
+@timed()
+def create_fig_yoy(yoy, metric, layout_config):
+    """
+    Generates a line chart with one line per year over the calendar months.
 
     Parameters:
-    df_tasks (pd.DataFrame): DataFrame containing task review data per month/year.
-    month_year (str): The month/year identifier in the format 'MM/YY'.
-    tp_tasks_revisadas (int): Number of reviewed tasks.
-    tp_adaptado_tasks_revisadas (int): Number of adjusted reviewed tasks.
+    yoy (dict): Output of `helpers.get_yoy` (see `produtiva.yoy.compute_yoy`).
+    metric (str): One of the result's metrics.
+    layout_config (dict): Dictionary containing layout configurations for the chart.
 
     Returns:
-    pd.DataFrame: Updated df_tasks DataFrame with new or modified month data.
+    plotly.graph_objs._figure.Figure: The yearly lines, the latest year highlighted.
 
     Complexity:
-    Time: O(n), where n is the number of rows in df_tasks.
-    Space: O(1), modifying the existing DataFrame.
+    Time: O(y * 12), for y years.
+    Space: O(y * 12), for the traces.
     """
-    if month_year in df_tasks["Mês/Ano"].values:
-        idx = df_tasks.index[df_tasks["Mês/Ano"] == month_year][0]
-        df_tasks.at[idx, "TP Tasks Revisadas"] = tp_tasks_revisadas
-        df_tasks.at[idx, "TP Adaptado Tasks Revisadas"] = tp_adaptado_tasks_revisadas
-    else:
-        new_data = {
-            "Mês/Ano": month_year,
-            "TP Tasks Revisadas": tp_tasks_revisadas,
-            "TP Adaptado Tasks Revisadas": tp_adaptado_tasks_revisadas,
-        }
-        df_tasks = pd.concat([df_tasks, pd.DataFrame([new_data])], ignore_index=True)
-    return df_tasks
+    import plotly.graph_objects as go
+
+    column = yoy["metrics"].index(metric)
+    fig = go.Figure()
+    for i, year in enumerate(yoy["years"]):
+        latest = i == len(yoy["years"]) - 1
+        fig.add_trace(
+            go.Scatter(
+                x=MONTH_NAMES,
+                y=yoy["pivot"][i, :, column],
+                name=str(year),
+                mode="lines+markers",
+                line=dict(width=5 if latest else 3, shape="spline"),
+                opacity=1.0 if latest else 0.6,
+            )
+        )
+    fig.update_layout(**layout_config)
+    fig.update_layout(title_text=f"{metric} — Ano a Ano", xaxis_title="Mês")
+    return fig
+
+
+@timed()
+def create_fig_yoy_delta(yoy, metric, layout_config):
+    """
+    Generates a grouped bar chart of each month's change against the previous year.
+
+    Parameters:
+    yoy (dict): Output of `helpers.get_yoy` (see `produtiva.yoy.compute_yoy`).
+    metric (str): One of the result's metrics.
+    layout_config (dict): Dictionary containing layout configurations for the chart.
 
+    Returns:
+    plotly.graph_objs._figure.Figure: One bar group per calendar month, one bar per
+    year after the first, with the percentage change on hover.
 
-def add_or_update_month_df_tamanho_task(df_tamanho, month_year, task_p, task_m, task_g):
+    Complexity:
+    Time: O(y * 12), for y years.
+    Space: O(y * 12), for the traces.
     """
-    Adds or updates a month's data in the df_tamanho DataFrame.
+    import plotly.graph_objects as go
+
+    column = yoy["metrics"].index(metric)
+    fig = go.Figure()
+    for i, year in enumerate(yoy["years"][1:], start=1):
+        fig.add_trace(
+            go.Bar(
+                x=MONTH_NAMES,
+                y=yoy["delta"][i, :, column],
+                name=f"{year} vs {year - 1}",
+                customdata=yoy["delta_pct"][i, :, column],
+                hovertemplate="%{y:+.2f} (%{customdata:+.0%})",
+            )
+        )
+    fig.update_layout(**layout_config)
+    fig.update_layout(
+        title_text=f"Variação Ano a Ano — {metric}",
+        xaxis_title="Mês",
+        yaxis_title="Variação",
+        barmode="group",
+    )
+    return fig
 
-    This function updates the task size values (P, M, G) for a given month/year.
-    If the month does not exist, a new row is added.
+
+@timed()
+def create_fig_leaderboard(board, metric, layout_config, by="value"):
+    """
+    Generates a horizontal bar chart of a leaderboard, best person at the top.
 
     Parameters:
-    df_tamanho (pd.DataFrame or None): DataFrame containing task size data per month/year.
-    month_year (str): The month/year identifier in the format 'MM/YY'.
-    task_p (int): Number of small tasks (P).
-    task_m (int): Number of medium tasks (M).
-    task_g (int): Number of large tasks (G).
+    board (pd.DataFrame): Output of `helpers.get_leaderboard`.
+    metric (str): The ranked metric, for the title.
+    layout_config (dict): Dictionary containing layout configurations for the chart.
+    by (str): "value" plots the period's values; "improvement" their change.
 
     Returns:
-    pd.DataFrame: Updated df_tamanho DataFrame with new or modified month data.
+    plotly.graph_objs._figure.Figure: One bar per listed person.
 
     Complexity:
-    Time: O(n), where n is the number of rows in df_tamanho.
-    Space: O(1), modifying the existing DataFrame.
+    Time: O(k), for k listed people.
+    Space: O(k), for the trace.
     """
-    if df_tamanho is None:
-        df_tamanho = pd.DataFrame(columns=["Mês/Ano", "Task P", "Task M", "Task G"])
-
-    if month_year in df_tamanho["Mês/Ano"].values:
-        idx = df_tamanho.index[df_tamanho["Mês/Ano"] == month_year][0]
-        df_tamanho.at[idx, "Task P"] = task_p
-        df_tamanho.at[idx, "Task M"] = task_m
-        df_tamanho.at[idx, "Task G"] = task_g
+    import plotly.graph_objects as go
+
+    column = "Variação" if by == "improvement" else "Valor"
+    fig = go.Figure(
+        go.Bar(
+            x=board[column],
+            y=board["Pessoa"],
+            orientation="h",
+            marker_color=[
+                "#d62728" if value < 0 else "#1f77b4" for value in board[column]
+            ],
+            customdata=board[["Valor", "Anterior"]],
+            hovertemplate="%{y}: %{customdata[0]:.2f} (anterior %{customdata[1]:.2f})",
+            name=metric,
+        )
+    )
+    period = board.attrs.get("period", "")
+    if by == "improvement":
+        title = f"Maior Evolução — {metric} ({period} vs {board.attrs.get('previous')})"
     else:
-        new_row = {
-            "Mês/Ano": month_year,
-            "Task P": task_p,
-            "Task M": task_m,
-            "Task G": task_g,
-        }
-        df_tamanho = pd.concat([df_tamanho, pd.DataFrame([new_row])], ignore_index=True)
-
-    return df_tamanho
+        title = f"Ranking — {metric} ({period})"
+    fig.update_layout(**layout_config)
+    fig.update_layout(
+        title_text=title,
+        xaxis_title="Variação" if by == "improvement" else "Produtividade",
+        yaxis_title="Pessoa",
+        yaxis_autorange="reversed",
+        hovermode="closest",
+        showlegend=False,
+        height=max(400, 60 * len(board)),
+    )
+    return fig
@@ -1,15 +1,21 @@
 import streamlit as st
 import datetime
-import calendar
-import time
 import pandas as pd
-from workalendar.america import Brazil
-from utils import load_custom_styles_and_info
+from produtiva.business_days import calculate_business_days
+from produtiva import tiering
+from produtiva.history import get_history
+from produtiva.schema import enforce_schema
+from utils import (
+    load_custom_styles_and_info,
+    render_integrity_warnings,
+    render_memory_panel,
+    render_profiling_panel,
+)
 from module_functions import (
     add_or_update_month_df_tp,
     create_df_tasks,
-    create_df_tamanho_task,
     add_or_update_month_df_tamanho_task,
+    DEFAULT_PERSON,
 )
 from helpers import (
     parse_month_year,
@@ -18,33 +24,23 @@ from helpers import (
     init_session_states,
     last_month_in_df,
     persist_data,
+    get_alert_engine,
+    get_metric_cube,
+    profiled_rerun,
+    record_change,
+    record_changes,
+    record_memory_usage,
+    sync_changes,
+    undo_last_change,
+    backfill,
 )
 
-
-def calculate_business_days(year: int, month: int) -> int:
-    """
-    Calculate the number of business days in a given month and year for Porto Alegre, Brazil.
-
-    This function considers national holidays and can be extended to include municipal holidays.
-
-    Parameters:
-    year (int): The year for which business days need to be calculated.
-    month (int): The month (1-12) for which business days need to be calculated.
-
-    Returns:
-    int: The number of business days within the given month.
-
-    Complexity:
-    Time: O(n), where n is the number of days in the given month.
-    Space: O(1), constant space usage.
-    """
-    calendar_brazil = Brazil()
-
-    first_day = datetime.date(year, month, 1)
-    last_day = datetime.date(year, month, calendar.monthrange(year, month)[1])
-
-    business_days = calendar_brazil.get_working_days_delta(first_day, last_day)
-    return business_days
+HISTORY_DATASETS = {
+    "TP (df_tp)": "df_tp",
+    "Tasks Revisadas (df_tasks)": "df_tasks",
+    "Tamanho das Tasks (df_tamanho)": "df_tamanho",
+}
+COMMIT_KINDS = {"baseline": "Base", "edit": "Edição", "undo": "Desfazer"}
 
 
 def add_new_month_form_df_tp():
@@ -130,7 +126,11 @@ def add_new_month_form_df_tp():
             tp_adapt_22,
             tp_ideal_22,
             business_days,
+            cube=get_metric_cube(),
+            alerts=get_alert_engine(),
         )
+        st.session_state.df_tp = recalculate_tp_row(chosen_mm_yy)
+        record_change("df_tp", chosen_mm_yy)
         st.success(
             f"Mês '{chosen_mm_yy}' adicionado com sucesso! Agora o último mês é {chosen_mm_yy}."
         )
@@ -252,9 +252,12 @@ def update_existing_month_form_df_tp(callback=None):
             new_tp_adapt_22,
             new_tp_ideal_22,
             new_dias_uteis,
+            cube=get_metric_cube(),
+            alerts=get_alert_engine(),
         )
         st.success(f"Mês '{mes_selecionado}' foi atualizado com sucesso!")
         st.session_state.df_tp = recalculate_tp_row(mes_selecionado)
+        record_change("df_tp", mes_selecionado)
         st.markdown("#### Visualizar df_tp (após atualização)")
         st.dataframe(st.session_state.df_tp)
         if callback:
@@ -333,9 +336,12 @@ def add_df_rev_form(callback=None):
             month_year=chosen_mm_yy,
             rev_task=rev_task,
             rev_task_adapt=rev_task_adapt,
+            cube=get_metric_cube(),
+            alerts=get_alert_engine(),
         )
         st.success(f"Mês '{chosen_mm_yy}' adicionado/atualizado em df_tamanho_task.")
         st.session_state.df_tp = recalculate_tp_row(chosen_mm_yy)
+        record_changes([("df_tasks", chosen_mm_yy), ("df_tp", chosen_mm_yy)])
         st.markdown("### df_tasks Atual")
         st.dataframe(st.session_state.df_tasks)
         if callback:
@@ -347,7 +353,12 @@ def add_df_rev_form(callback=None):
 
 
 def add_or_update_month_df_task(
-    df_tasks: pd.DataFrame, month_year: str, rev_task: int, rev_task_adapt: int
+    df_tasks: pd.DataFrame,
+    month_year: str,
+    rev_task: int,
+    rev_task_adapt: int,
+    cube=None,
+    alerts=None,
 ) -> pd.DataFrame:
     """
     Adds or updates a specific month entry in the df_tasks DataFrame.
@@ -359,6 +370,8 @@ def add_or_update_month_df_task(
     month_year (str): The month/year in 'MM/YY' format to add or update.
     rev_task (int): The value to be set for "TP Tasks Revisadas".
     rev_task_adapt (int): The value to be set for "TP Adaptado Tasks Revisadas".
+    cube (MetricCube, optional): Cube updated incrementally with the written month.
+    alerts (AlertEngine, optional): Alert rules re-evaluated for the written month.
 
     Returns:
     pd.DataFrame: The updated DataFrame with the new or modified month entry.
@@ -381,6 +394,11 @@ def add_or_update_month_df_task(
             }
         )
         df_tasks = pd.concat([df_tasks, new_row], ignore_index=True)
+    df_tasks = enforce_schema(df_tasks, "df_tasks")
+    if cube is not None:
+        cube.update_from_frame(df_tasks, month_year, person=DEFAULT_PERSON)
+    if alerts is not None:
+        alerts.update_from_frame(df_tasks, month_year, person=DEFAULT_PERSON)
     return df_tasks
 
 
@@ -443,10 +461,17 @@ def add_df_tamanho_form(callback=None):
 
     if st.button("Adicionar 🆕", key="button3"):
         st.session_state.df_tamanho = add_or_update_month_df_tamanho_task(
-            st.session_state.df_tamanho, chosen_mm_yy, new_p, new_m, new_g
+            st.session_state.df_tamanho,
+            chosen_mm_yy,
+            new_p,
+            new_m,
+            new_g,
+            cube=get_metric_cube(),
+            alerts=get_alert_engine(),
         )
         st.success(f"Mês '{chosen_mm_yy}' atualizado em df_tamanho_task.")
         st.session_state.df_tp = recalculate_tp_row(chosen_mm_yy)
+        record_change("df_tamanho", chosen_mm_yy)
         st.markdown("### df_tamanho_task Atual")
         st.dataframe(st.session_state.df_tamanho)
         if callback:
@@ -457,51 +482,231 @@ def add_df_tamanho_form(callback=None):
     return False
 
 
-def main():
-    st.set_page_config(
-        page_title="Adicionar/Atualizar Dados", page_icon="📝", layout="wide"
+def backfill_form(callback=None):
+    """
+    Displays a form that fills every missing month of a range in one submit.
+
+    All datasets receive the months of the range that are not registered yet, with
+    the entered values, computed business days and derived TP columns, and the
+    result is persisted once.
+
+    Parameters:
+    callback (callable, optional): Called after the months are added.
+
+    Returns:
+    bool: True if any month was added, False otherwise.
+
+    Complexity:
+    Time: O((n + m) log(n + m)), for n stored and m added months.
+    Space: O(n + m), for the extended frames.
+    """
+    st.subheader("Preencher Meses Faltantes")
+    st.markdown(
+        """
+        Adiciona de uma só vez todos os meses do intervalo que ainda não foram cadastrados,
+        em todos os conjuntos de dados. Os dias úteis e os valores derivados são calculados
+        automaticamente; meses já cadastrados não são alterados.
+        """
     )
-    st.title("Adicionar ou Atualizar Dados de Produtividade 📝")
 
-    init_session_states()
+    # Task frames may trail df_tp, so the range starts after the least advanced one.
+    year, month = min(
+        parse_month_year(next_month(last_month_in_df(st.session_state[dataset])))
+        for dataset in ("df_tp", "df_tasks", "df_tamanho")
+    )
+    first_date = datetime.date(year, month, 1)
+    # Archived months are read-only, so the range starts after the newest one.
+    cold = tiering.cold_months("df_tp")
+    min_date = None
+    if cold:
+        cold_year, cold_month = parse_month_year(next_month(cold[-1]))
+        min_date = datetime.date(cold_year, cold_month, 1)
+        first_date = max(first_date, min_date)
+    today = datetime.date.today()
+    c1, c2 = st.columns(2)
+    with c1:
+        start_date = st.date_input(
+            "Primeiro Mês (Ignorar Dia)",
+            value=first_date,
+            min_value=min_date,
+            key="backfill_start",
+        )
+    with c2:
+        end_date = st.date_input(
+            "Último Mês (Ignorar Dia)",
+            value=max(today, first_date),
+            min_value=min_date,
+            key="backfill_end",
+        )
+
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        tp_adapt_22 = st.number_input(
+            "TP Adaptado (22 Dias Úteis)", min_value=0, value=0, key="backfill_tp"
+        )
+        tp_ideal_22 = st.number_input(
+            "TP Ideal (22 Dias Úteis)", min_value=0, value=15, key="backfill_ideal"
+        )
+    with c2:
+        tasks_revisadas = st.number_input(
+            "TP Tasks Revisadas", min_value=0, value=0, key="backfill_rev"
+        )
+        adaptado_revisadas = st.number_input(
+            "TP Adaptado Tasks Revisadas", min_value=0, value=0, key="backfill_rev_ad"
+        )
+    with c3:
+        task_p = st.number_input("Task P", min_value=0, value=0, key="backfill_p")
+        task_m = st.number_input("Task M", min_value=0, value=0, key="backfill_m")
+        task_g = st.number_input("Task G", min_value=0, value=0, key="backfill_g")
+
+    if st.button("Preencher ⏩", key="backfill_button"):
+        if end_date < start_date:
+            st.error("O último mês deve ser posterior ao primeiro.")
+            return False
+        months = backfill(
+            format_month_year(start_date.year, start_date.month),
+            format_month_year(end_date.year, end_date.month),
+            {
+                "TP Adaptado (22 Dias Úteis)": tp_adapt_22,
+                "TP Ideal (22 Dias Úteis)": tp_ideal_22,
+                "TP Tasks Revisadas": tasks_revisadas,
+                "TP Adaptado Tasks Revisadas": adaptado_revisadas,
+                "Task P": task_p,
+                "Task M": task_m,
+                "Task G": task_g,
+            },
+        )
+        if not months:
+            st.info("Todos os meses do intervalo já estão cadastrados.")
+            return False
+        st.success(f"{len(months)} meses adicionados: {', '.join(months)}.")
+        if callback:
+            callback()
+        return True
+    return False
+
 
-    if st.session_state.df_tasks is None or st.session_state.df_tasks.empty:
-        st.session_state.df_tasks = create_df_tasks(st.session_state.df_tp)
+def history_form(callback=None):
+    """
+    Shows a dataset as it was at any past version and undoes the latest edit.
 
-    if st.session_state.df_tamanho is None or st.session_state.df_tamanho.empty:
-        st.session_state.df_tamanho = create_df_tamanho_task(st.session_state.df_tp)
+    Parameters:
+    callback (callable, optional): Called after an edit is undone.
+
+    Returns:
+    bool: True if an edit was undone, False otherwise.
+
+    Complexity:
+    Time: O(m * c * log e) to rebuild the selected version, for m months and c columns.
+    Space: O(m * c), for the rebuilt frame.
+    """
+    st.subheader("Histórico de Alterações")
+    st.markdown(
+        """
+        Cada alteração salva gera uma nova versão dos dados. Selecione um conjunto de dados
+        e uma versão para ver os valores como estavam naquele momento, ou desfaça a última
+        alteração.
+        """
+    )
+
+    label = st.selectbox(
+        "Conjunto de dados", list(HISTORY_DATASETS), key="history_dataset"
+    )
+    dataset_history = get_history(HISTORY_DATASETS[label])
+    commits = dataset_history.commits
+    if commits:
+
+        def describe(number):
+            commit = commits[number]
+            moment = datetime.datetime.fromtimestamp(commit["ts"])
+            months = ", ".join(commit["months"]) if commit["kind"] != "baseline" else ""
+            return (
+                f"#{number} · {moment:%d/%m/%Y %H:%M:%S} · "
+                f"{COMMIT_KINDS.get(commit['kind'], commit['kind'])} {months}"
+            ).strip()
+
+        versions = list(range(len(commits)))
+        number = st.select_slider(
+            "Versão",
+            options=versions,
+            value=versions[-1],
+            format_func=describe,
+            key="history_version",
+        )
+        st.dataframe(dataset_history.as_of(number))
+    else:
+        st.info("Ainda não há histórico para este conjunto de dados.")
+
+    if st.button("↩️ Desfazer Última Alteração", key="undo_button"):
+        undone = undo_last_change()
+        if undone is None:
+            st.warning("Não há alterações para desfazer.")
+            return False
+        st.success(
+            "Alteração desfeita: "
+            + ", ".join(f"'{month_year}' em {dataset}" for dataset, month_year in undone)
+            + "."
+        )
+        if callback:
+            callback()
+        return True
+    return False
 
-    load_custom_styles_and_info()
 
-    tab1, tab2, tab3, tab4 = st.tabs(
-        [
-            "🆕 Adicionar Dados Tasks 📋",
-            "🆕 Adicionar Dados Tamanho Tasks 📏",
-            "🆕 Adicionar Dados Tasks Revisadas 📑",
-            "🔄 Atualizar Dados Tasks 📋",
-        ]
+def main():
+    st.set_page_config(
+        page_title="Adicionar/Atualizar Dados", page_icon="📝", layout="wide"
     )
+    st.title("Adicionar ou Atualizar Dados de Produtividade 📝")
 
-    def rerun_callback():
-        st.session_state.need_rerun = True
+    with profiled_rerun("Alterar Dados"):
+        init_session_states()
+        sync_changes()
+        load_custom_styles_and_info()
+        render_integrity_warnings()
+
+        tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(
+            [
+                "🆕 Adicionar Dados Tasks 📋",
+                "🆕 Adicionar Dados Tamanho Tasks 📏",
+                "🆕 Adicionar Dados Tasks Revisadas 📑",
+                "🔄 Atualizar Dados Tasks 📋",
+                "⏩ Preencher Meses",
+                "🕘 Histórico",
+            ]
+        )
 
-    with tab1:
-        add_new_month_form_df_tp()
-        persist_data()
+        def rerun_callback():
+            st.session_state.need_rerun = True
 
-    with tab2:
-        if add_df_tamanho_form(callback=rerun_callback):
+        with tab1:
+            add_new_month_form_df_tp()
             persist_data()
 
-    with tab3:
-        if add_df_rev_form(callback=rerun_callback):
-            persist_data()
+        with tab2:
+            if add_df_tamanho_form(callback=rerun_callback):
+                persist_data()
 
-    with tab4:
-        if update_existing_month_form_df_tp(callback=rerun_callback):
-            persist_data()
+        with tab3:
+            if add_df_rev_form(callback=rerun_callback):
+                persist_data()
+
+        with tab4:
+            if update_existing_month_form_df_tp(callback=rerun_callback):
+                persist_data()
+
+        with tab5:
+            if backfill_form(callback=rerun_callback):
+                persist_data()
+
+        with tab6:
+            if history_form(callback=rerun_callback):
+                persist_data()
 
-    st.markdown("<br><br>", unsafe_allow_html=True)
+        st.markdown("<br><br>", unsafe_allow_html=True)
+        record_memory_usage()
+    render_profiling_panel()
+    render_memory_panel()
 
     if st.session_state.get("need_rerun", False):
         st.session_state.need_rerun = False
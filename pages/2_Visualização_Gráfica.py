@@ -1,7 +1,8 @@
+import io
+import pandas as pd
 import streamlit as st
+from produtiva.cube import CUBE_METRICS
 from module_functions import (
-    create_df_tasks,
-    create_df_tamanho_task,
     create_df_produtividade_geral,
     get_layout_config,
     create_fig_tp,
@@ -9,14 +10,64 @@ from module_functions import (
     create_fig_produtividade_geral,
     create_fig_tamanho_task,
     create_fig_all,
+    create_fig_yoy,
+    create_fig_yoy_delta,
+    create_fig_leaderboard,
+    add_anomaly_markers,
+    add_trend_overlays,
+    ANOMALY_LABELS,
+    DEFAULT_PERSON,
+)
+from helpers import (
+    init_session_states,
+    persist_data,
+    get_artifact,
+    get_alert_engine,
+    get_anomalies,
+    get_leaderboard,
+    get_metric_cube,
+    get_projection,
+    get_range_frames,
+    get_trends,
+    get_yoy,
+    profiled_rerun,
+    record_memory_usage,
+    sync_changes,
+)
+from produtiva import changefeed, tiering
+from produtiva.alerts import FIRED, read_log
+from produtiva.analytics import (
+    EWMA_ALPHA,
+    FORECAST_MONTHS,
+    ROLLING_WINDOW,
+)
+from produtiva.export import write_report
+from produtiva.leaderboard import DEFAULT_TOP, LEADERBOARD_METRICS
+from produtiva.memory import LRUCache
+from produtiva.sizing import (
+    DIVERGENT,
+    RECONCILE_TOLERANCE,
+    size_weighted_tp,
+    size_weights,
+)
+from produtiva.profiling import stage
+from produtiva.weeks import GRANULARITIES, resample
+from produtiva.yoy import YOY_METRICS, yoy_frame
+from produtiva.window import month_index
+from utils import (
+    load_chart_tabs_styles,
+    render_integrity_warnings,
+    render_memory_panel,
+    render_profiling_panel,
 )
-from helpers import init_session_states, persist_data
-from utils import load_chart_tabs_styles
 
 
 def prepare_dataframes():
     """
-    Prepare and return the necessary dataframes from session state.
+    Return the necessary dataframes from session state.
+
+    The task frames are always present: `init_session_states` builds the missing ones
+    when loading, and the loaded datasets have passed the integrity checks.
 
     Returns:
     tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
@@ -26,20 +77,171 @@ def prepare_dataframes():
     Time: O(n)
     Space: O(1)
     """
-    df_tp = st.session_state.df_tp
+    return (
+        st.session_state.df_tp,
+        st.session_state.df_tasks,
+        st.session_state.df_tamanho,
+    )
+
+
+def select_month_window(df_tp):
+    """
+    Display a month-range selector in the sidebar and return the chosen window.
+
+    The archived months are listed before the hot ones, but the window starts at the
+    first hot month, so the cold segments are only read when the user reaches them.
+
+    Parameters:
+    df_tp (pd.DataFrame): Productivity data whose months define the available range.
+
+    Returns:
+    tuple[str, str]: The first and last month of the window in 'MM/YY' format.
+
+    Complexity:
+    Time: O(n) to list the options, O(1) index lookup after the first run.
+    Space: O(n), for the option labels.
+    """
+    hot = month_index(df_tp).months
+    months = tiering.cold_months("df_tp") + hot
+    if len(months) < 2:
+        return months[0], months[-1]
+
+    start, end = st.sidebar.select_slider(
+        "Intervalo de Meses",
+        options=months,
+        value=(hot[0] if len(hot) > 1 else months[0], months[-1]),
+        key="month_window",
+    )
+    return start, end
+
+
+def select_granularity():
+    """
+    Display the period selector of the TP chart in the sidebar.
 
-    df_tasks = st.session_state.df_tasks
-    if df_tasks is None or df_tasks.empty:
-        df_tasks = create_df_tasks(df_tp)
+    Returns:
+    str: "month" or "quarter", as accepted by `produtiva.weeks.resample`.
 
-    df_tamanho = st.session_state.df_tamanho
-    if df_tamanho is None or df_tamanho.empty:
-        df_tamanho = create_df_tamanho_task(df_tp)
+    Complexity:
+    Time: O(1)
+    Space: O(1)
+    """
+    options = {"Mensal": "month", "Trimestral": "quarter"}
+    label = st.sidebar.radio(
+        "Granularidade do TP", options, horizontal=True, key="granularity"
+    )
+    return options[label]
 
-    st.session_state.df_tasks = df_tasks
-    st.session_state.df_tamanho = df_tamanho
 
-    return df_tp, df_tasks, df_tamanho
+def select_trend_options():
+    """
+    Display the trend and forecast controls in the sidebar.
+
+    Returns:
+    dict or None: Keyword arguments of `helpers.get_trends`, or None when the
+    overlays are turned off.
+
+    Complexity:
+    Time: O(1)
+    Space: O(1)
+    """
+    if not st.sidebar.checkbox("📈 Tendências e Previsão", key="show_trends"):
+        return None
+    methods = {"Holt (tendência)": "holt", "Regressão linear": "linear"}
+    window = st.sidebar.slider(
+        "Janela da média móvel (meses)", 2, 12, ROLLING_WINDOW, key="trend_window"
+    )
+    alpha = st.sidebar.slider(
+        "Suavização da MME (α)", 0.05, 1.0, EWMA_ALPHA, 0.05, key="trend_alpha"
+    )
+    horizon = st.sidebar.slider(
+        "Meses previstos", 1, 12, FORECAST_MONTHS, key="trend_horizon"
+    )
+    method = st.sidebar.selectbox("Método de previsão", methods, key="trend_method")
+    return {
+        "window": window,
+        "alpha": alpha,
+        "horizon": horizon,
+        "method": methods[method],
+    }
+
+
+def render_yoy(yoy, layout_config):
+    """
+    Display the year-over-year lines, deltas and tables of a selected metric.
+
+    Parameters:
+    yoy (dict): Output of `helpers.get_yoy`.
+    layout_config (dict): Chart layout configuration
+
+    Returns:
+    None
+
+    Complexity:
+    Time: O(y * 12), for y years; the pivot itself is cached.
+    Space: O(y * 12), for the figures and tables.
+    """
+    st.markdown("## 📆 Comparação Ano a Ano")
+    metric = st.selectbox("Métrica", YOY_METRICS, key="yoy_metric")
+    col_lines, col_delta = st.columns(2)
+    with col_lines:
+        st.plotly_chart(
+            create_fig_yoy(yoy, metric, layout_config), use_container_width=True
+        )
+    with col_delta:
+        st.plotly_chart(
+            create_fig_yoy_delta(yoy, metric, layout_config), use_container_width=True
+        )
+    with st.expander("Tabelas Ano a Ano"):
+        st.markdown(f"### {metric}")
+        st.dataframe(yoy_frame(yoy, metric).style.format("{:.2f}", na_rep="—"))
+        st.markdown("### Variação em relação ao ano anterior")
+        st.dataframe(
+            yoy_frame(yoy, metric, "delta").style.format("{:+.2f}", na_rep="—")
+        )
+
+
+def render_leaderboard(layout_config):
+    """
+    Display the top people of the latest period, by value or by improvement.
+
+    Parameters:
+    layout_config (dict): Chart layout configuration
+
+    Returns:
+    None
+
+    Complexity:
+    Time: O(k) when the ranking is cached (see `helpers.get_leaderboard`).
+    Space: O(k), for the figure and table.
+    """
+    st.markdown("## 🏆 Ranking")
+    periods = {"Trimestre": "quarter", "Mês": "month", "Ano": "year"}
+    criteria = {"Maior valor": "value", "Maior evolução": "improvement"}
+    col_metric, col_period, col_by, col_k = st.columns(4)
+    metric = col_metric.selectbox(
+        "Métrica", LEADERBOARD_METRICS, key="leaderboard_metric"
+    )
+    period = periods[col_period.selectbox("Período", periods, key="leaderboard_period")]
+    by = criteria[col_by.selectbox("Critério", criteria, key="leaderboard_by")]
+    k = col_k.number_input(
+        "Top", min_value=1, max_value=100, value=DEFAULT_TOP, key="leaderboard_k"
+    )
+    board = get_leaderboard(metric, period, int(k), by)
+    if board.empty:
+        st.info("Sem dados para o período.")
+        return
+    st.plotly_chart(
+        create_fig_leaderboard(board, metric, layout_config, by),
+        use_container_width=True,
+    )
+    st.dataframe(
+        board.style.format(
+            {"Valor": "{:.2f}", "Anterior": "{:.2f}", "Variação": "{:+.2f}"},
+            na_rep="—",
+        ),
+        hide_index=True,
+    )
 
 
 def display_dataframes(df_tp, df_tasks, df_tamanho):
@@ -170,10 +372,28 @@ def display_dataframes(df_tp, df_tasks, df_tamanho):
         float_cols = df.select_dtypes(include=["float"]).columns
         return df.style.format({col: "{:.2f}" for col in float_cols})
 
-    df_tp = format_floats(df_tp)
-    df_tasks = format_floats(df_tasks)
-    df_tamanho = format_floats(df_tamanho)
+    with stage("styler_render"):
+        render_styled_tables(
+            format_floats(df_tp), format_floats(df_tasks), format_floats(df_tamanho)
+        )
+
 
+def render_styled_tables(df_tp, df_tasks, df_tamanho):
+    """
+    Render the styled dataframes as static tables inside an expander.
+
+    Parameters:
+    df_tp (pandas.io.formats.style.Styler): Styled productivity data
+    df_tasks (pandas.io.formats.style.Styler): Styled tasks data
+    df_tamanho (pandas.io.formats.style.Styler): Styled size data
+
+    Returns:
+    None
+
+    Complexity:
+    Time: O(n), rendering every cell once.
+    Space: O(n), for the rendered tables.
+    """
     st.markdown("## DataFrames Resultantes")
     with st.expander("DataFrames Resultantes"):
         st.markdown("### 📊 **Dataframe Tasks Realizadas/Mês-Ano**")
@@ -195,7 +415,201 @@ def display_dataframes(df_tp, df_tasks, df_tamanho):
             st.markdown("</div>", unsafe_allow_html=True)
 
 
-def render_charts(df_tp, df_tasks, df_tamanho, layout_config):
+def display_rollups(cube):
+    """
+    Display quarter and year totals answered directly from the metric cube.
+
+    Parameters:
+    cube (MetricCube): The session's month × metric × person cube.
+
+    Returns:
+    None
+
+    Complexity:
+    Time: O(q * k), where q is the number of quarters and k the number of metrics.
+    Space: O(q * k), for the displayed tables.
+    """
+    df_quarters = pd.DataFrame(
+        cube.quarter_totals(DEFAULT_PERSON), index=cube.quarters, columns=CUBE_METRICS
+    )
+    df_years = pd.DataFrame(
+        cube.year_totals(DEFAULT_PERSON), index=cube.years, columns=CUBE_METRICS
+    )
+
+    with st.expander("Totais por Trimestre e Ano"):
+        st.markdown("### 📅 **Totais por Trimestre**")
+        st.dataframe(df_quarters.style.format("{:.2f}"))
+        st.markdown("### 📆 **Totais por Ano**")
+        st.dataframe(df_years.style.format("{:.2f}"))
+
+
+def display_projection(projection):
+    """
+    Display the chance of meeting the yearly adjusted ideal and the pace it requires.
+
+    Parameters:
+    projection (dict): Output of `helpers.get_projection`.
+
+    Returns:
+    None
+
+    Complexity:
+    Time: O(r), where r is the number of remaining months.
+    Space: O(r), for the displayed table.
+    """
+    year = projection["year"]
+    with st.expander(f"🎯 Projeção da Meta Anual ({year})"):
+        cols = st.columns(4)
+        cols[0].metric("TP Realizado", f"{projection['achieved']:.0f}")
+        cols[1].metric("Meta (TP Ideal Ajustado)", f"{projection['target']:.1f}")
+        cols[2].metric("Chance de Atingir", f"{projection['probability']:.0%}")
+        if projection["remaining_months"]:
+            cols[3].metric(
+                "Ritmo Necessário (22 Dias Úteis)",
+                f"{projection['required_tp_22']:.1f}",
+                f"{projection['required_tp_22'] - projection['historical_pace'] * 22:+.1f}"
+                " vs. histórico",
+                delta_color="inverse",
+            )
+            p10, p50, p90 = projection["percentiles"].values()
+            st.markdown(
+                f"TP projetado no ano: {p50:.0f} (80% dos cenários entre {p10:.0f} e "
+                f"{p90:.0f}), reamostrando o TP por dia útil dos meses anteriores."
+            )
+            st.dataframe(
+                pd.DataFrame(
+                    {
+                        "Mês/Ano": projection["remaining_months"],
+                        "Dias Úteis": projection["remaining_days"],
+                        "TP Necessário": [
+                            projection["required_pace"] * days
+                            for days in projection["remaining_days"]
+                        ],
+                    }
+                ).style.format({"TP Necessário": "{:.1f}"}),
+                hide_index=True,
+            )
+
+
+def display_anomalies(anomalies):
+    """
+    Display the anomalous months found by the scanner, most recent first.
+
+    Parameters:
+    anomalies (pd.DataFrame): Output of `helpers.get_anomalies`.
+
+    Returns:
+    None
+
+    Complexity:
+    Time: O(a), for a anomalies.
+    Space: O(a), for the displayed table.
+    """
+    rows = anomalies[anomalies["Pessoa"] == DEFAULT_PERSON].drop(columns="Pessoa")
+    with st.expander(f"🚨 Anomalias ({len(rows)})"):
+        st.markdown(
+            "Meses fora do padrão (score Z robusto), com queda brusca em relação aos "
+            "meses anteriores ou com valores impossíveis, como dias úteis que não "
+            "batem com o calendário."
+        )
+        st.dataframe(
+            rows.assign(Anomalia=rows["Anomalia"].map(ANOMALY_LABELS)).style.format(
+                precision=2
+            ),
+            hide_index=True,
+        )
+
+
+def display_alerts(engine):
+    """
+    Display the alerts firing now and the latest entries of the alert log.
+
+    Parameters:
+    engine (AlertEngine): Output of `helpers.get_alert_engine`.
+
+    Returns:
+    None
+
+    Complexity:
+    Time: O(a * R + f), for a months with alerts, R rules and a log of f bytes.
+    Space: O(a * R), for the displayed tables.
+    """
+    active = pd.DataFrame(engine.active(DEFAULT_PERSON))
+    with st.expander(f"🔔 Alertas ({len(active)})"):
+        st.markdown(
+            "Regras definidas em `produtiva/data/alert_rules.json`, avaliadas a cada "
+            "alteração apenas nos meses afetados."
+        )
+        if active.empty:
+            st.info("Nenhum alerta ativo.")
+        else:
+            st.dataframe(
+                active.drop(columns="Pessoa").style.format(precision=2),
+                hide_index=True,
+            )
+        log = pd.DataFrame(read_log(limit=20))
+        if not log.empty:
+            st.markdown("#### Histórico de Alertas")
+            st.dataframe(
+                pd.DataFrame(
+                    {
+                        "Quando": pd.to_datetime(log["ts"], unit="s").dt.strftime(
+                            "%d/%m/%Y %H:%M"
+                        ),
+                        "Situação": log["status"].map(
+                            lambda status: "Disparado" if status == FIRED else "Resolvido"
+                        ),
+                        "Pessoa": log["person"],
+                        "Mês/Ano": log["month"],
+                        "Regra": log["rule"],
+                        "Valor": log["value"],
+                        "Referência": log["reference"],
+                    }
+                ).style.format(precision=2),
+                hide_index=True,
+            )
+
+
+def render_export_button(df_tp, df_tasks, df_tamanho):
+    """
+    Display a button that downloads the datasets and charts as an Excel report.
+
+    The workbook is only generated when the button is clicked, off the script thread,
+    and holds the full history: the archived years are read back at that point.
+
+    Parameters:
+    df_tp (pd.DataFrame): Productivity data.
+    df_tasks (pd.DataFrame): Tasks data.
+    df_tamanho (pd.DataFrame): Size data.
+
+    Returns:
+    None
+
+    Complexity:
+    Time: O(1) per rerun; O(n) when the report is generated.
+    Space: O(1) per rerun; the size of the workbook when it is generated.
+    """
+    frames = {"df_tp": df_tp, "df_tasks": df_tasks, "df_tamanho": df_tamanho}
+    st.sidebar.download_button(
+        "📥 Exportar Relatório (XLSX)",
+        data=lambda: write_report(
+            io.BytesIO(), tiering.full_frames(frames), DEFAULT_PERSON
+        ).getvalue(),
+        file_name="produtividade.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        on_click="ignore",
+    )
+
+
+def render_charts(
+    df_tp,
+    df_tasks,
+    df_tamanho,
+    layout_config,
+    trends=None,
+    anomalies=None,
+    granularity="month",
+):
     """
     Generate and display charts in tabs.
 
@@ -204,6 +618,12 @@ def render_charts(df_tp, df_tasks, df_tamanho, layout_config):
     df_tasks (pd.DataFrame): Tasks data
     df_tamanho (pd.DataFrame): Size data
     layout_config (dict): Chart layout configuration
+    trends (dict, optional): Output of `helpers.get_trends`, overlaid on the TP and
+        reviewed task charts.
+    anomalies (pd.DataFrame, optional): Output of `helpers.get_anomalies`, marked on
+        the TP, reviewed task and task size charts.
+    granularity (str): "month", or "quarter" to sum the TP chart by quarter; the
+        monthly overlays (size TP, trends, anomalies) are only drawn per month.
 
     Returns:
     None
@@ -213,13 +633,41 @@ def render_charts(df_tp, df_tasks, df_tamanho, layout_config):
     Space: O(1)
     """
     load_chart_tabs_styles()
-    fig_tp = create_fig_tp(df_tp, layout_config)
+    df_size_tp = size_weighted_tp(df_tp, df_tamanho)
+    if granularity == "month":
+        fig_tp = create_fig_tp(df_tp, layout_config, df_size_tp=df_size_tp)
+    else:
+        fig_tp = create_fig_tp(
+            resample(df_tp, granularity),
+            layout_config,
+            period_column=GRANULARITIES[granularity],
+        )
     fig_tasks = create_fig_tasks(df_tasks, layout_config)
+    if trends is not None and granularity == "month":
+        shown = df_tp["Mês/Ano"].astype(str).tolist()
+        add_trend_overlays(
+            fig_tp,
+            trends,
+            ["TP Adaptado (22 Dias Úteis)", "TP Ajustado (Dias Úteis Reais)"],
+            months=shown,
+        )
+        add_trend_overlays(
+            fig_tasks,
+            trends,
+            ["TP Tasks Revisadas", "TP Adaptado Tasks Revisadas"],
+            months=shown,
+        )
     df_prod_geral = create_df_produtividade_geral(df_tp, df_tasks)
     fig_produtividade_geral = create_fig_produtividade_geral(
         df_prod_geral, layout_config
     )
-    fig_tamanho_task = create_fig_tamanho_task(df_tamanho)
+    fig_tamanho_task = create_fig_tamanho_task(
+        df_tamanho, fragment_cache=get_artifact("figure_fragments", LRUCache)
+    )
+    if anomalies is not None:
+        for fig in (fig_tp, fig_tasks, fig_tamanho_task):
+            if fig is not fig_tp or granularity == "month":
+                add_anomaly_markers(fig, anomalies)
     fig_all = create_fig_all(
         fig_tp, fig_tasks, fig_produtividade_geral, fig_tamanho_task
     )
@@ -236,19 +684,103 @@ def render_charts(df_tp, df_tasks, df_tamanho, layout_config):
     for tab, fig in zip(st.tabs(tab_names), figures):
         with tab:
             st.plotly_chart(fig, use_container_width=True)
+    display_reconciliation(df_size_tp)
+
+
+def display_reconciliation(df_size_tp):
+    """
+    Display the months whose entered TP diverges from the TP derived from task sizes.
+
+    Parameters:
+    df_size_tp (pd.DataFrame): Output of `produtiva.sizing.size_weighted_tp`.
+
+    Returns:
+    None
+
+    Complexity:
+    Time: O(n), to select the flagged months.
+    Space: O(n), for the displayed table.
+    """
+    divergent = df_size_tp[df_size_tp[DIVERGENT]]
+    weights = size_weights()
+    with st.expander(f"Reconciliação TP x Tamanho ({len(divergent)} divergências)"):
+        st.markdown(
+            "TP por tamanho = "
+            + " + ".join(f"{w} × {column}" for column, w in weights.items())
+            + f". Meses com diferença acima de {RECONCILE_TOLERANCE:.0%} são sinalizados."
+        )
+        st.dataframe(
+            df_size_tp.style.format(precision=2).apply(
+                lambda row: [
+                    "background-color: #ffd6d6" if row[DIVERGENT] else ""
+                ]
+                * len(row),
+                axis=1,
+            ),
+            hide_index=True,
+        )
+
+
+@st.fragment(run_every=changefeed.POLL_SECONDS)
+def watch_changes():
+    """
+    Reruns the page when another session published an edit to the change feed.
+
+    Idle sessions pay a single stat call per poll interval; the edited rows are then
+    applied by `sync_changes` during the rerun.
+
+    Returns:
+    None
+
+    Complexity:
+    Time: O(1) per poll.
+    Space: O(1), constant space usage.
+    """
+    if changefeed.has_changes(st.session_state.feed_cursor):
+        st.rerun(scope="app")
 
 
 def main():
     st.set_page_config(page_title="Visualização Gráfica", page_icon="📊", layout="wide")
     st.title("Visualização Gráfica 📊")
 
-    init_session_states()
-    layout_config = get_layout_config()
-
-    df_tp, df_tasks, df_tamanho = prepare_dataframes()
-    render_charts(df_tp, df_tasks, df_tamanho, layout_config)
-    display_dataframes(df_tp, df_tasks, df_tamanho)
-    persist_data()
+    with profiled_rerun("Visualização Gráfica"):
+        init_session_states()
+        sync_changes()
+        render_integrity_warnings()
+        layout_config = get_layout_config()
+
+        df_tp, df_tasks, df_tamanho = prepare_dataframes()
+        render_export_button(df_tp, df_tasks, df_tamanho)
+        start, end = select_month_window(df_tp)
+        granularity = select_granularity()
+        trend_options = select_trend_options()
+        trends = get_trends(**trend_options) if trend_options is not None else None
+        df_tp, df_tasks, df_tamanho = get_range_frames(start, end)
+        anomalies = get_anomalies()
+        render_charts(
+            df_tp,
+            df_tasks,
+            df_tamanho,
+            layout_config,
+            trends,
+            anomalies,
+            granularity,
+        )
+        if st.sidebar.checkbox("📆 Comparação Ano a Ano", key="show_yoy"):
+            render_yoy(get_yoy(), layout_config)
+        if st.sidebar.checkbox("🏆 Ranking", key="show_leaderboard"):
+            render_leaderboard(layout_config)
+        display_dataframes(df_tp, df_tasks, df_tamanho)
+        display_rollups(get_metric_cube())
+        display_projection(get_projection())
+        display_anomalies(anomalies)
+        display_alerts(get_alert_engine())
+        persist_data()
+        record_memory_usage()
+    watch_changes()
+    render_profiling_panel()
+    render_memory_panel()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,45 @@
+"""
+Headless core of Produtiva: month handling, dataset frames, derived TP and storage.
+
+Nothing in this package imports Streamlit or Plotly, so metrics can be computed from
+scripts, services and benchmarks without paying for the UI stack. The names below are
+re-exported lazily, so importing a light submodule such as `produtiva.months` does not
+import pandas either.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "DEFAULT_PERSON": "produtiva.frames",
+    "WORK_DAYS_POA_CREATE": "produtiva.frames",
+    "add_or_update_month_df_tamanho_task": "produtiva.frames",
+    "add_or_update_month_df_tasks": "produtiva.frames",
+    "add_or_update_month_df_tp": "produtiva.frames",
+    "backfill_months": "produtiva.frames",
+    "create_df_produtividade_geral": "produtiva.frames",
+    "create_df_tamanho_task": "produtiva.frames",
+    "create_df_tasks": "produtiva.frames",
+    "create_df_tp": "produtiva.frames",
+    "format_month_year": "produtiva.months",
+    "last_month_in_df": "produtiva.months",
+    "month_ordinal": "produtiva.months",
+    "next_month": "produtiva.months",
+    "ordinal_to_month": "produtiva.months",
+    "parse_month_year": "produtiva.months",
+    "enforce_schema": "produtiva.schema",
+    "DEFAULT_WORK_DAYS": "produtiva.storage",
+    "load_from_binary": "produtiva.storage",
+    "save_to_binary": "produtiva.storage",
+    "create_df_weeks": "produtiva.weeks",
+    "set_week_tp": "produtiva.weeks",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module 'produtiva' has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,320 @@
+"""
+Threshold alerts over the monthly metrics, evaluated incrementally on every write.
+
+Rules are declarative (see `data/alert_rules.json`): a rule compares a metric with
+`factor` times a reference metric plus `value` (or with `value` alone when there is
+no reference), and fires for a month when the comparison held in each of the
+`months` consecutive months ending there. For example, "TP Ajustado below TP Ideal
+Ajustado for two months in a row", or "reviewed tasks above half of TP Adaptado".
+
+`AlertEngine` compiles the rules into arrays, so a month's conditions are evaluated
+for every rule at once. A write to month m can only change the conditions of m, so
+only the months m to m + W - 1 (W, the longest rule window) are re-evaluated, from
+the conditions of m - W + 1 onwards, however long the history is. Alerts that start
+or stop firing because of a write are appended to `bin/alerts.jsonl`.
+"""
+
+import json
+import os
+import time
+
+import numpy as np
+
+from produtiva.months import month_ordinal, ordinal_to_month
+from produtiva.paths import BIN_DIR, load_json_config
+from produtiva.schema import MONTH_COLUMN, PERSON_COLUMN
+
+RULES_FILE = "alert_rules.json"
+LOG_FILE = "alerts.jsonl"
+OPERATORS = ("<", "<=", ">", ">=")
+FIRED = "fired"
+RESOLVED = "resolved"
+
+
+def log_path() -> str:
+    return os.path.join(BIN_DIR, LOG_FILE)
+
+
+def load_rules(file_name: str = RULES_FILE) -> list:
+    """
+    Returns the rules of a JSON file in the package 'data' directory.
+
+    Parameters:
+    file_name (str): Name of the rules file.
+
+    Returns:
+    list: One dict per rule with "name", "description", "metric", "op", and optionally
+    "reference", "factor" (default 1), "value" (default 0) and "months" (default 1).
+    """
+    return [dict(rule) for rule in load_json_config(file_name)]
+
+
+def append_log(events: list) -> None:
+    """
+    Appends alert events to the log, one JSON line each, with a single write.
+
+    Parameters:
+    events (list): Events returned by `AlertEngine.update`.
+
+    Returns:
+    None
+
+    Complexity:
+    Time: O(e), for e events.
+    Space: O(e), for the encoded lines.
+    """
+    if not events:
+        return
+    data = "".join(json.dumps(event, ensure_ascii=False) + "\n" for event in events)
+    os.makedirs(BIN_DIR, exist_ok=True)
+    fd = os.open(log_path(), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, data.encode())
+    finally:
+        os.close(fd)
+
+
+def read_log(limit: int = 100) -> list:
+    """
+    Returns the latest events of the alert log, most recent first.
+
+    Parameters:
+    limit (int): Maximum number of events.
+
+    Returns:
+    list: Event dicts; empty when nothing was logged yet.
+
+    Complexity:
+    Time: O(f), for a log of f bytes.
+    Space: O(f), for the read lines.
+    """
+    try:
+        with open(log_path(), encoding="utf-8") as f:
+            lines = f.readlines()
+    except FileNotFoundError:
+        return []
+    return [json.loads(line) for line in reversed(lines[-limit:]) if line.strip()]
+
+
+class AlertEngine:
+    """
+    Incremental evaluator of declarative alert rules per person and month.
+
+    For each person, the engine keeps the latest value of every metric used by the
+    rules, the condition of every rule and whether each rule is firing, per month
+    ordinal. `update_from_frame` has the signature of `MetricCube.update_from_frame`,
+    so the engine follows the same upserts as the cube.
+    """
+
+    def __init__(self, rules=None, log: bool = False):
+        self.rules = load_rules() if rules is None else [dict(r) for r in rules]
+        for rule in self.rules:
+            if rule["op"] not in OPERATORS:
+                raise ValueError(f"unknown operator {rule['op']!r} in {rule['name']}")
+        self.log = log
+        self.metrics = sorted(
+            {r["metric"] for r in self.rules}
+            | {r["reference"] for r in self.rules if r.get("reference")}
+        )
+        index = {metric: i for i, metric in enumerate(self.metrics)}
+        self._lhs = np.array([index[r["metric"]] for r in self.rules], dtype=np.intp)
+        self._rhs = np.array(
+            [index.get(r.get("reference"), -1) for r in self.rules], dtype=np.intp
+        )
+        self._factor = np.array([float(r.get("factor", 1)) for r in self.rules])
+        self._value = np.array([float(r.get("value", 0)) for r in self.rules])
+        self._op = np.array([OPERATORS.index(r["op"]) for r in self.rules])
+        self._months = np.array([int(r.get("months", 1)) for r in self.rules])
+        self.window = int(self._months.max(initial=1))
+        self._values = {}
+        self._conditions = {}
+        self._firing = {}
+
+    def _sides(self, rows: np.ndarray) -> tuple:
+        lhs = rows[:, self._lhs]
+        reference = np.where(self._rhs >= 0, rows[:, np.maximum(self._rhs, 0)], 0.0)
+        return lhs, self._factor * reference + self._value
+
+    def _evaluate(self, rows: np.ndarray) -> np.ndarray:
+        lhs, rhs = self._sides(rows)
+        with np.errstate(invalid="ignore"):
+            # NaN (a missing metric) compares False, so it never fires a rule.
+            results = np.stack([lhs < rhs, lhs <= rhs, lhs > rhs, lhs >= rhs])
+        return np.take_along_axis(results, self._op[None, None, :], axis=0)[0]
+
+    def _firing_block(self, conditions: np.ndarray, first: int) -> np.ndarray:
+        # Rule r fires at row t when rows t - months[r] + 1 .. t all hold.
+        sums = np.vstack(
+            [np.zeros((1, len(self.rules)), np.int64), np.cumsum(conditions, axis=0)]
+        )
+        ends = np.arange(first, len(conditions))[:, None] + 1
+        starts = ends - self._months[None, :]
+        held = sums[ends, np.arange(len(self.rules))] - sums[
+            np.maximum(starts, 0), np.arange(len(self.rules))
+        ]
+        return (held == self._months) & (starts >= 0)
+
+    def _event(self, status, person, ordinal, rule, lhs, rhs) -> dict:
+        return {
+            "ts": time.time(),
+            "status": status,
+            "person": person,
+            "month": ordinal_to_month(ordinal),
+            "rule": self.rules[rule]["name"],
+            "description": self.rules[rule].get("description", ""),
+            "value": float(lhs[rule]),
+            "reference": float(rhs[rule]),
+        }
+
+    def update(self, month_year: str, values: dict, person=None, log=None) -> list:
+        """
+        Writes one month's metric values and re-evaluates the months they affect.
+
+        Parameters:
+        month_year (str): The month/year identifier in the format 'MM/YY'.
+        values (dict): Mapping of metric name to value; metrics no rule uses are ignored.
+        person (str, optional): The person the values belong to.
+        log (bool, optional): Append the events to the alert log; the engine's `log`
+            setting when omitted.
+
+        Returns:
+        list: Events of the alerts that started ("fired") or stopped ("resolved")
+        firing because of this write.
+
+        Complexity:
+        Time: O(W * R), for R rules and the longest rule window W.
+        Space: O(W * R), for the re-evaluated block.
+        """
+        used = [m for m in self.metrics if m in values]
+        if not used:
+            return []
+        ordinal = month_ordinal(month_year)
+        stored = self._values.setdefault(person, {})
+        conditions = self._conditions.setdefault(person, {})
+        firing = self._firing.setdefault(person, {})
+        row = stored.get(ordinal)
+        row = np.full(len(self.metrics), np.nan) if row is None else row.copy()
+        for metric in used:
+            row[self.metrics.index(metric)] = float(values[metric])
+        stored[ordinal] = row
+        condition = self._evaluate(row[None, :])[0]
+        if ordinal in conditions and (conditions[ordinal] == condition).all():
+            return []
+        conditions[ordinal] = condition
+
+        # Conditions of m - W + 1 .. m + W - 1 decide the firing of m .. m + W - 1.
+        first = ordinal - self.window + 1
+        ordinals = range(first, ordinal + self.window)
+        missing = np.zeros(len(self.rules), dtype=bool)
+        block = np.array([conditions.get(o, missing) for o in ordinals])
+        now = self._firing_block(block, self.window - 1)
+
+        events = []
+        for offset, rules in enumerate(now):
+            affected = ordinal + offset
+            changed = np.flatnonzero(rules != firing.get(affected, missing))
+            if len(changed):
+                lhs, rhs = self._sides(stored[affected][None, :])
+            for rule in changed:
+                status = FIRED if rules[rule] else RESOLVED
+                events.append(
+                    self._event(status, person, affected, rule, lhs[0], rhs[0])
+                )
+            if rules.any():
+                firing[affected] = rules
+            else:
+                firing.pop(affected, None)
+        if self.log if log is None else log:
+            append_log(events)
+        return events
+
+    def update_from_frame(self, df, month_year: str, person=None, log=None) -> list:
+        """
+        Writes the row of `month_year` found in a dataset frame; see `update`.
+
+        Complexity:
+        Time: O(n) to locate the row, plus `update`.
+        Space: O(W * R), see `update`.
+        """
+        rows = df.loc[df[MONTH_COLUMN] == month_year]
+        if rows.empty:
+            return []
+        return self.update(month_year, rows.iloc[-1].to_dict(), person=person, log=log)
+
+    def load_frames(self, *frames, person=None) -> None:
+        """
+        Loads a person's history and evaluates every month at once, without logging.
+
+        Parameters:
+        *frames (pd.DataFrame or None): Dataset frames, e.g. df_tp and df_tasks.
+        person (str, optional): The person the frames belong to.
+
+        Returns:
+        None
+
+        Complexity:
+        Time: O(n * (R + c)), for n months, R rules and c metrics.
+        Space: O(n * R), for the conditions.
+        """
+        stored = self._values.setdefault(person, {})
+        for df in frames:
+            if df is None or df.empty:
+                continue
+            used = [m for m in self.metrics if m in df.columns]
+            if not used:
+                continue
+            cols = [self.metrics.index(m) for m in used]
+            block = df[used].to_numpy(dtype=np.float64)
+            for month_year, values in zip(df[MONTH_COLUMN].astype(str), block):
+                ordinal = month_ordinal(month_year)
+                row = stored.get(ordinal)
+                if row is None:
+                    row = stored[ordinal] = np.full(len(self.metrics), np.nan)
+                row[cols] = values
+        if not stored:
+            return
+        first, last = min(stored), max(stored)
+        ordinals = np.arange(first, last + 1)
+        missing = np.full(len(self.metrics), np.nan)
+        conditions = self._evaluate(np.array([stored.get(o, missing) for o in ordinals]))
+        conditions[[o not in stored for o in ordinals]] = False
+        firing = self._firing_block(conditions, 0)
+        self._conditions[person] = {
+            int(o): conditions[i] for i, o in enumerate(ordinals) if o in stored
+        }
+        self._firing[person] = {
+            int(o): firing[i] for i, o in enumerate(ordinals) if firing[i].any()
+        }
+
+    def active(self, person=None) -> list:
+        """
+        Returns the alerts firing now, most recent months first.
+
+        Parameters:
+        person (str, optional): Only this person's alerts; everyone's when omitted.
+
+        Returns:
+        list: Dicts with PERSON_COLUMN, MONTH_COLUMN, "Regra", "Descrição", "Valor"
+        and "Referência".
+
+        Complexity:
+        Time: O(a * R), for a months with alerts.
+        Space: O(f), for f firing alerts.
+        """
+        people = self._firing if person is None else {person: self._firing.get(person, {})}
+        rows = []
+        for who, firing in people.items():
+            for ordinal in sorted(firing, reverse=True):
+                lhs, rhs = self._sides(self._values[who][ordinal][None, :])
+                for rule in np.flatnonzero(firing[ordinal]):
+                    rows.append(
+                        {
+                            PERSON_COLUMN: who,
+                            MONTH_COLUMN: ordinal_to_month(ordinal),
+                            "Regra": self.rules[rule]["name"],
+                            "Descrição": self.rules[rule].get("description", ""),
+                            "Valor": float(lhs[0, rule]),
+                            "Referência": float(rhs[0, rule]),
+                        }
+                    )
+        return rows
@@ -0,0 +1,239 @@
+"""
+Rolling statistics and trend forecasts of the monthly series.
+
+Every function takes a (months, metrics, people) array, such as `MetricCube.block`,
+and computes its statistic for all metrics and people at once: rolling windows use
+cumulative sums along the month axis, and the recursive smoothers (EWMA, Holt) step
+through the months with whole (metrics, people) slices. Missing months (NaN) are
+skipped rather than propagated.
+"""
+
+import numpy as np
+
+from produtiva.months import month_ordinal, ordinal_to_month
+
+TREND_METRICS = (
+    "TP Adaptado (22 Dias Úteis)",
+    "TP Ajustado (Dias Úteis Reais)",
+    "TP Tasks Revisadas",
+    "TP Adaptado Tasks Revisadas",
+)
+ROLLING_WINDOW = 3
+EWMA_ALPHA = 0.4
+HOLT_ALPHA = 0.5
+HOLT_BETA = 0.3
+FORECAST_MONTHS = 3
+FORECAST_METHODS = ("holt", "linear")
+
+
+def _window_sums(values: np.ndarray, window: int) -> tuple:
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+    zeros = np.zeros((1, *values.shape[1:]))
+    sums = np.concatenate([zeros, np.cumsum(filled, axis=0)])
+    squares = np.concatenate([zeros, np.cumsum(filled**2, axis=0)])
+    counts = np.concatenate([zeros, np.cumsum(valid, axis=0)])
+    lagged = np.maximum(np.arange(1, len(values) + 1) - window, 0)
+    end = np.arange(1, len(values) + 1)
+    return (
+        sums[end] - sums[lagged],
+        squares[end] - squares[lagged],
+        counts[end] - counts[lagged],
+    )
+
+
+def rolling_mean(values: np.ndarray, window: int = ROLLING_WINDOW) -> np.ndarray:
+    """
+    Returns the mean of each month's trailing window.
+
+    Parameters:
+    values (np.ndarray): Array of shape (months, ...).
+    window (int): Number of months in the window, including the current one.
+
+    Returns:
+    np.ndarray: Array of the same shape; NaN until the window holds `window` values.
+
+    Complexity:
+    Time: O(n * c), for n months and c series.
+    Space: O(n * c), for the cumulative sums.
+    """
+    sums, _, counts = _window_sums(values, window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts >= window, sums / counts, np.nan)
+
+
+def rolling_std(values: np.ndarray, window: int = ROLLING_WINDOW) -> np.ndarray:
+    """
+    Returns the sample standard deviation of each month's trailing window.
+
+    Parameters:
+    values (np.ndarray): Array of shape (months, ...).
+    window (int): Number of months in the window, at least 2.
+
+    Returns:
+    np.ndarray: Array of the same shape; NaN until the window holds `window` values.
+
+    Complexity:
+    Time: O(n * c), for n months and c series.
+    Space: O(n * c), for the cumulative sums.
+    """
+    sums, squares, counts = _window_sums(values, window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        variance = (squares - sums**2 / counts) / (counts - 1)
+    std = np.sqrt(np.maximum(variance, 0.0))
+    return np.where(counts >= max(window, 2), std, np.nan)
+
+
+def ewma(values: np.ndarray, alpha: float = EWMA_ALPHA) -> np.ndarray:
+    """
+    Returns the exponentially weighted moving average, s = alpha * x + (1 - alpha) * s.
+
+    Missing months keep the previous average.
+
+    Parameters:
+    values (np.ndarray): Array of shape (months, ...).
+    alpha (float): Smoothing factor in (0, 1]; larger values follow the data closer.
+
+    Returns:
+    np.ndarray: Array of the same shape; NaN before the first value of each series.
+
+    Complexity:
+    Time: O(n * c), for n months and c series.
+    Space: O(n * c), for the result.
+    """
+    result = np.full(values.shape, np.nan)
+    if not len(values):
+        return result
+    level = values[0].astype(float)
+    result[0] = level
+    for month in range(1, len(values)):
+        current = values[month]
+        level = np.where(
+            np.isnan(current),
+            level,
+            np.where(np.isnan(level), current, alpha * current + (1 - alpha) * level),
+        )
+        result[month] = level
+    return result
+
+
+def linear_forecast(values: np.ndarray, horizon: int = FORECAST_MONTHS) -> np.ndarray:
+    """
+    Extrapolates the least-squares line of each series for the next months.
+
+    Parameters:
+    values (np.ndarray): Array of shape (months, ...).
+    horizon (int): Number of months to forecast.
+
+    Returns:
+    np.ndarray: Array of shape (horizon, ...); NaN for series with fewer than 2 values.
+
+    Complexity:
+    Time: O(n * c), for n months and c series.
+    Space: O(n * c), for the centered values.
+    """
+    valid = ~np.isnan(values)
+    t = np.arange(len(values), dtype=float).reshape(-1, *[1] * (values.ndim - 1))
+    counts = valid.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t_mean = np.where(valid, t, 0.0).sum(axis=0) / counts
+        y_mean = np.where(valid, values, 0.0).sum(axis=0) / counts
+        dt = np.where(valid, t - t_mean, 0.0)
+        dy = np.where(valid, values - y_mean, 0.0)
+        slope = (dt * dy).sum(axis=0) / (dt**2).sum(axis=0)
+    slope = np.where(counts >= 2, slope, np.nan)
+    future = np.arange(len(values), len(values) + horizon, dtype=float)
+    future = future.reshape(-1, *[1] * (values.ndim - 1))
+    return y_mean + slope * (future - t_mean)
+
+
+def holt_forecast(
+    values: np.ndarray,
+    horizon: int = FORECAST_MONTHS,
+    alpha: float = HOLT_ALPHA,
+    beta: float = HOLT_BETA,
+) -> np.ndarray:
+    """
+    Forecasts the next months with Holt's linear trend (double exponential) smoothing.
+
+    The monthly series have no reliable seasonality over a few years of history, so
+    the seasonal component of Holt-Winters is left out.
+
+    Parameters:
+    values (np.ndarray): Array of shape (months, ...).
+    horizon (int): Number of months to forecast.
+    alpha (float): Smoothing factor of the level, in (0, 1].
+    beta (float): Smoothing factor of the trend, in (0, 1].
+
+    Returns:
+    np.ndarray: Array of shape (horizon, ...); NaN for series with fewer than 2 values.
+
+    Complexity:
+    Time: O(n * c), for n months and c series.
+    Space: O(c), for the level and trend of every series.
+    """
+    shape = values.shape[1:]
+    level = np.full(shape, np.nan)
+    trend = np.full(shape, np.nan)
+    for month in range(len(values)):
+        current = values[month]
+        seen = ~np.isnan(current)
+        first = seen & np.isnan(level)
+        second = seen & ~first & np.isnan(trend)
+        later = seen & ~first & ~second
+
+        new_level = alpha * current + (1 - alpha) * (level + trend)
+        new_trend = beta * (new_level - level) + (1 - beta) * trend
+        trend = np.where(second, current - level, np.where(later, new_trend, trend))
+        level = np.where(first | second, current, np.where(later, new_level, level))
+    steps = np.arange(1, horizon + 1, dtype=float).reshape(-1, *[1] * len(shape))
+    return level + steps * trend
+
+
+def compute_trends(
+    values: np.ndarray,
+    months: list,
+    window: int = ROLLING_WINDOW,
+    alpha: float = EWMA_ALPHA,
+    horizon: int = FORECAST_MONTHS,
+    method: str = "holt",
+) -> dict:
+    """
+    Computes every trend statistic of a (months, metrics, people) block in one pass.
+
+    Parameters:
+    values (np.ndarray): Array of shape (months, metrics, people).
+    months (list): 'MM/YY' labels of the month axis.
+    window (int): Months in the rolling windows.
+    alpha (float): Smoothing factor of the EWMA.
+    horizon (int): Number of months to forecast.
+    method (str): "holt" or "linear".
+
+    Returns:
+    dict: "months", "forecast_months" (the `horizon` months after the last one), and
+    the arrays "rolling_mean", "rolling_std", "ewma" (same shape as `values`) and
+    "forecast" (shape (horizon, metrics, people)).
+
+    Complexity:
+    Time: O(n * c), for n months and c metric-person series.
+    Space: O(n * c), for the results.
+    """
+    if method not in FORECAST_METHODS:
+        raise ValueError(f"method must be one of {FORECAST_METHODS}")
+    if method == "holt":
+        forecast = holt_forecast(values, horizon)
+    else:
+        forecast = linear_forecast(values, horizon)
+    last = month_ordinal(months[-1]) if months else None
+    return {
+        "months": list(months),
+        "forecast_months": (
+            [ordinal_to_month(last + step) for step in range(1, horizon + 1)]
+            if last is not None
+            else []
+        ),
+        "rolling_mean": rolling_mean(values, window),
+        "rolling_std": rolling_std(values, window),
+        "ewma": ewma(values, alpha),
+        "forecast": forecast,
+    }
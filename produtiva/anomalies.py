@@ -0,0 +1,244 @@
+"""
+Anomaly scanner over the metric cube.
+
+Every (month, metric, person) cell of the cube is scored at once with array
+operations, across all people and metrics:
+
+- outlier: robust z-score, 0.6745 * (x - median) / MAD over the metric's history, above
+  Z_THRESHOLD in absolute value (Iglewicz and Hoaglin). Series whose MAD is zero, such
+  as mostly-zero task counts, fall back to the mean absolute deviation.
+- drop: a TP metric below (1 - DROP_RATIO) times the mean of the previous
+  DROP_WINDOW months and at least DROP_Z robust deviations below its median, so the
+  usual swings of small counts are not flagged.
+- impossible: negative counts, or "Dias Úteis" more than WORK_DAYS_TOLERANCE days away
+  from the month's calendar business days (which also inflates "TP Ajustado").
+
+The scanner keeps the scored block. When a scan only finds new months appended to it,
+only those months are scored, against the baseline of the whole history; editing an
+earlier month re-scores everything.
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from produtiva.analytics import rolling_mean
+from produtiva.business_days import business_days_for_months
+from produtiva.months import parse_month_year
+from produtiva.schema import MONTH_COLUMN, PERSON_COLUMN
+
+SCANNED_METRICS = (
+    "TP Adaptado (22 Dias Úteis)",
+    "TP Ajustado (Dias Úteis Reais)",
+    "TP Tasks Revisadas",
+    "TP Adaptado Tasks Revisadas",
+    "Task P",
+    "Task M",
+    "Task G",
+    "Dias Úteis",
+)
+DROP_METRICS = SCANNED_METRICS[:4]
+COUNT_METRICS = (
+    "TP Adaptado (22 Dias Úteis)",
+    "TP Tasks Revisadas",
+    "TP Adaptado Tasks Revisadas",
+    "Task P",
+    "Task M",
+    "Task G",
+)
+Z_THRESHOLD = 3.5
+MIN_HISTORY = 6
+DROP_RATIO = 0.5
+DROP_WINDOW = 3
+DROP_Z = 2.0
+WORK_DAYS_TOLERANCE = 3
+# Checks by increasing priority; a cell flagged by several shows the last one.
+CHECKS = ("outlier", "drop", "impossible")
+
+_DAYS = SCANNED_METRICS.index("Dias Úteis")
+_Z_METRICS = np.array([m != "Dias Úteis" for m in SCANNED_METRICS])
+_DROP_METRICS = np.array([m in DROP_METRICS for m in SCANNED_METRICS])
+_COUNT_METRICS = np.array([m in COUNT_METRICS for m in SCANNED_METRICS])
+
+
+def _same(a: np.ndarray, b: np.ndarray) -> bool:
+    return a.shape == b.shape and bool(((a == b) | (np.isnan(a) & np.isnan(b))).all())
+
+
+def robust_baseline(values: np.ndarray) -> tuple:
+    """
+    Returns the median and the robust scale of every series along the month axis.
+
+    The scale is MAD / 0.6745, or 1.2533 times the mean absolute deviation where the
+    MAD is zero. Both are NaN for series with fewer than MIN_HISTORY values.
+
+    Parameters:
+    values (np.ndarray): Array of shape (months, ...).
+
+    Returns:
+    tuple[np.ndarray, np.ndarray]: Median and scale, of shape values.shape[1:].
+
+    Complexity:
+    Time: O(n * c), for n months and c series (selection-based medians).
+    Space: O(n * c), for the deviations.
+    """
+    enough = (~np.isnan(values)).sum(axis=0) >= MIN_HISTORY
+    with warnings.catch_warnings():
+        # All-NaN series (people without a metric) are expected.
+        warnings.simplefilter("ignore", RuntimeWarning)
+        median = np.nanmedian(values, axis=0)
+        deviation = np.abs(values - median)
+        mad = np.nanmedian(deviation, axis=0) / 0.6745
+        mean_ad = np.nanmean(deviation, axis=0) * 1.2533
+    scale = np.where(mad > 0, mad, mean_ad)
+    scale = np.where(enough & (scale > 0), scale, np.nan)
+    return np.where(enough, median, np.nan), scale
+
+
+class AnomalyScanner:
+    """
+    Incremental anomaly scanner of (months, SCANNED_METRICS, persons) blocks.
+
+    `codes` holds 0 for normal cells and 1 + the index in CHECKS for flagged ones;
+    `scores` holds the robust z-score of every scored cell and `expected` the value
+    the cell was compared with (the median, the trailing mean or the calendar days).
+    """
+
+    def __init__(
+        self,
+        z_threshold: float = Z_THRESHOLD,
+        drop_ratio: float = DROP_RATIO,
+        window: int = DROP_WINDOW,
+    ):
+        self.z_threshold = z_threshold
+        self.drop_ratio = drop_ratio
+        self.window = window
+        self.months = []
+        self.persons = []
+        self.values = np.empty((0, len(SCANNED_METRICS), 0))
+        self.codes = np.zeros(self.values.shape, dtype=np.int8)
+        self.scores = np.full(self.values.shape, np.nan)
+        self.expected = np.full(self.values.shape, np.nan)
+        self.rescored = 0
+
+    def scan(self, values: np.ndarray, months: list, persons: list) -> "AnomalyScanner":
+        """
+        Scores the months that are new or changed since the previous scan.
+
+        Parameters:
+        values (np.ndarray): Array of shape (months, SCANNED_METRICS, persons), such as
+            `MetricCube.block(SCANNED_METRICS)`.
+        months (list): 'MM/YY' labels of the month axis.
+        persons (list): Labels of the person axis.
+
+        Returns:
+        AnomalyScanner: The scanner, with `rescored` set to the months scored.
+
+        Complexity:
+        Time: O(n * c) for the baseline plus O(r * c) scoring, for n months, r new
+        months and c metric-person series; O(n * c) scoring after an edit.
+        Space: O(n * c), for the scored arrays.
+        """
+        n_old = len(self.months)
+        appended = (
+            list(persons) == self.persons
+            and len(months) >= n_old
+            and list(months[:n_old]) == self.months
+            and _same(values[:n_old], self.values)
+        )
+        start = n_old if appended else 0
+        codes = np.zeros(values.shape, dtype=np.int8)
+        scores = np.full(values.shape, np.nan)
+        expected = np.full(values.shape, np.nan)
+        if start:
+            codes[:start] = self.codes
+            scores[:start] = self.scores
+            expected[:start] = self.expected
+        self.codes, self.scores, self.expected = codes, scores, expected
+        self.values = values.copy()
+        self.months = list(months)
+        self.persons = list(persons)
+        self.rescored = len(months) - start
+        if self.rescored:
+            self._score(start)
+        return self
+
+    def _score(self, start: int) -> None:
+        values = self.values
+        new = values[start:]
+        codes = self.codes[start:]
+        expected = self.expected[start:]
+
+        median, scale = robust_baseline(values)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            z = (new - median) / scale
+        z[:, ~_Z_METRICS] = np.nan
+        self.scores[start:] = z
+        outlier = np.abs(z) > self.z_threshold
+        codes[outlier] = 1 + CHECKS.index("outlier")
+        expected[outlier] = np.broadcast_to(median, new.shape)[outlier]
+
+        lo = max(0, start - self.window)
+        means = rolling_mean(values[lo:], self.window)
+        rows = np.arange(start, len(values)) - 1 - lo
+        trailing = np.full(new.shape, np.nan)
+        trailing[rows >= 0] = means[rows[rows >= 0]]
+        with np.errstate(invalid="ignore"):
+            drop = (
+                (new < (1 - self.drop_ratio) * trailing)
+                & (trailing > 0)
+                & (z < -DROP_Z)
+            )
+        drop[:, ~_DROP_METRICS] = False
+        codes[drop] = 1 + CHECKS.index("drop")
+        expected[drop] = trailing[drop]
+
+        periods = pd.PeriodIndex(
+            [
+                pd.Period(year=year, month=month, freq="M")
+                for year, month in map(parse_month_year, self.months[start:])
+            ],
+            freq="M",
+        )
+        calendar_days = business_days_for_months(periods).astype(float)[:, None]
+        days = new[:, _DAYS]
+        with np.errstate(invalid="ignore"):
+            bad_days = np.abs(days - calendar_days) > WORK_DAYS_TOLERANCE
+            negative = (new < 0) & _COUNT_METRICS[None, :, None]
+        impossible = negative.copy()
+        impossible[:, _DAYS] = bad_days
+        codes[impossible] = 1 + CHECKS.index("impossible")
+        expected[negative] = 0.0
+        expected[:, _DAYS] = np.where(
+            bad_days, np.broadcast_to(calendar_days, days.shape), expected[:, _DAYS]
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Returns one row per flagged cell, most recent months first.
+
+        Returns:
+        pd.DataFrame: Columns "Pessoa", "Mês/Ano", "Métrica", "Valor", "Anomalia" (one
+        of CHECKS), "Esperado" and "Score Z".
+
+        Complexity:
+        Time: O(n * c + a log a), for a flagged cells.
+        Space: O(a), for the table.
+        """
+        month, metric, person = np.nonzero(self.codes)
+        order = np.lexsort((metric, person, -month))
+        month, metric, person = month[order], metric[order], person[order]
+        return pd.DataFrame(
+            {
+                PERSON_COLUMN: [self.persons[i] for i in person],
+                MONTH_COLUMN: [self.months[i] for i in month],
+                "Métrica": [SCANNED_METRICS[i] for i in metric],
+                "Valor": self.values[month, metric, person],
+                "Anomalia": [
+                    CHECKS[c - 1] for c in self.codes[month, metric, person]
+                ],
+                "Esperado": self.expected[month, metric, person],
+                "Score Z": self.scores[month, metric, person],
+            }
+        )
@@ -0,0 +1,116 @@
+import calendar
+import datetime
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from produtiva.profiling import timed
+
+
+@timed()
+@lru_cache(maxsize=None)
+def calculate_business_days(year: int, month: int) -> int:
+    """
+    Calculate the number of business days in a given month and year for Porto Alegre, Brazil.
+
+    This function considers national holidays and can be extended to include municipal holidays.
+    The holiday calendar is imported on first use and results are cached per month.
+
+    Parameters:
+    year (int): The year for which business days need to be calculated.
+    month (int): The month (1-12) for which business days need to be calculated.
+
+    Returns:
+    int: The number of business days within the given month.
+
+    Complexity:
+    Time: O(n), where n is the number of days in the given month.
+    Space: O(1), constant space usage.
+    """
+    from workalendar.america import Brazil
+
+    calendar_brazil = Brazil()
+
+    first_day = datetime.date(year, month, 1)
+    last_day = datetime.date(year, month, calendar.monthrange(year, month)[1])
+
+    business_days = calendar_brazil.get_working_days_delta(first_day, last_day)
+    return business_days
+
+
+@lru_cache(maxsize=None)
+def holidays_between(first_year: int, last_year: int) -> np.ndarray:
+    """
+    Lists the holidays of a range of years, as used by `calculate_business_days`.
+
+    Parameters:
+    first_year (int): First year of the range.
+    last_year (int): Last year of the range, inclusive.
+
+    Returns:
+    np.ndarray: The holidays as datetime64[D], for `np.busday_count` and `np.is_busday`.
+
+    Complexity:
+    Time: O(y * h), for y years of h holidays; cached per range.
+    Space: O(y * h), for the dates.
+    """
+    from workalendar.america import Brazil
+
+    calendar_brazil = Brazil()
+    return np.array(
+        [
+            day
+            for year in range(first_year, last_year + 1)
+            for day, _ in calendar_brazil.holidays(year)
+        ],
+        dtype="datetime64[D]",
+    )
+
+
+@timed()
+def business_day_flags(days: np.ndarray) -> np.ndarray:
+    """
+    Tells which of many days are business days, with the same calendar as the months.
+
+    Parameters:
+    days (np.ndarray): Days as datetime64[D].
+
+    Returns:
+    np.ndarray: Boolean array, True for weekdays that are not holidays.
+
+    Complexity:
+    Time: O(d + h), for d days and h holidays in the covered years.
+    Space: O(d), for the flags.
+    """
+    if not len(days):
+        return np.zeros(0, dtype=bool)
+    years = days.astype("datetime64[Y]").astype(int) + 1970
+    return np.is_busday(days, holidays=holidays_between(years.min(), years.max()))
+
+
+@timed()
+def business_days_for_months(months: pd.PeriodIndex) -> np.ndarray:
+    """
+    Calculate the business days of many months at once, as `calculate_business_days` does.
+
+    The holidays of every year in the range are listed once and the days are counted
+    with a single vectorized `np.busday_count` call. Like workalendar's working-days
+    delta, the count runs from the day after the first of the month to its last day.
+
+    Parameters:
+    months (pd.PeriodIndex): Months with monthly frequency, e.g. from `pd.period_range`.
+
+    Returns:
+    np.ndarray: The number of business days of each month.
+
+    Complexity:
+    Time: O(m + h), for m months and h holidays in the covered years.
+    Space: O(m + h), for the date arrays.
+    """
+    if not len(months):
+        return np.zeros(0, dtype=np.int64)
+    holidays = holidays_between(months.min().year, months.max().year)
+    first_days = months.start_time.values.astype("datetime64[D]")
+    last_days = months.end_time.values.astype("datetime64[D]")
+    return np.busday_count(first_days + 1, last_days + 1, holidays=holidays)
@@ -0,0 +1,220 @@
+"""
+Change feed of month-level edits, shared through the 'bin' directory.
+
+Every saved edit appends one JSON line to `bin/changes.jsonl` with the dataset, the
+month and the new values of its row. Readers keep a cursor (file identity and byte
+offset): polling an unchanged feed costs a single `stat`, and new records are read
+from the cursor onwards, so a session applies just the edited rows to its frames
+instead of reloading every dataset. Because the feed is a plain file, processes on
+other replicas sharing 'bin/' see the same records.
+
+When the feed grows past MAX_FEED_BYTES it is rotated. Readers holding a cursor on
+the previous file are told to reset, i.e. to reload the persisted datasets.
+
+Environment:
+    PRODUTIVA_FEED_POLL_SECONDS  how often idle chart pages check the feed (default 5)
+"""
+
+import json
+import os
+import time
+import uuid
+
+import pandas as pd
+
+from produtiva.paths import BIN_DIR
+from produtiva.schema import MONTH_COLUMN, enforce_schema, set_value
+
+FEED_FILE = "changes.jsonl"
+MAX_FEED_BYTES = 1 << 20
+POLL_SECONDS = float(os.environ.get("PRODUTIVA_FEED_POLL_SECONDS", "5"))
+PROCESS_ID = uuid.uuid4().hex[:12]
+
+
+def feed_path() -> str:
+    return os.path.join(BIN_DIR, FEED_FILE)
+
+
+def _plain(value):
+    return value.item() if hasattr(value, "item") else value
+
+
+def row_values(df: pd.DataFrame, month_year: str):
+    """
+    Returns the values of a month's row as JSON-serializable scalars.
+
+    Parameters:
+    df (pd.DataFrame): A dataset frame.
+    month_year (str): The month in 'MM/YY' format.
+
+    Returns:
+    dict or None: Column -> value, without the month column; None if the month is absent.
+
+    Complexity:
+    Time: O(n), to find the row.
+    Space: O(c), for c columns.
+    """
+    rows = df.loc[df[MONTH_COLUMN] == month_year]
+    if rows.empty:
+        return None
+    row = rows.iloc[-1]
+    return {
+        column: _plain(row[column]) for column in df.columns if column != MONTH_COLUMN
+    }
+
+
+def publish(dataset: str, month_year: str, values: dict, origin: str) -> None:
+    """
+    Appends a change record to the feed, rotating the feed when it is too large.
+
+    The record is written with a single append, so concurrent writers on a local
+    file system never interleave lines.
+
+    Parameters:
+    dataset (str): One of "df_tp", "df_tasks" or "df_tamanho".
+    month_year (str): The edited month in 'MM/YY' format.
+    values (dict or None): New values of the month's row, by column; None when the
+        row was removed.
+    origin (str): Identifies the writing session, so it can skip its own records.
+
+    Returns:
+    None
+
+    Complexity:
+    Time: O(c), for c values.
+    Space: O(c), for the record.
+    """
+    record = {
+        "ts": time.time(),
+        "origin": origin,
+        "dataset": dataset,
+        "month": month_year,
+        "values": values,
+    }
+    line = (json.dumps(record, ensure_ascii=False) + "\n").encode()
+    os.makedirs(BIN_DIR, exist_ok=True)
+    path = feed_path()
+    try:
+        if os.stat(path).st_size > MAX_FEED_BYTES:
+            os.replace(path, f"{path}.1")
+    except FileNotFoundError:
+        pass
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+
+def _read_from(path: str, offset: int) -> tuple:
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+    # A writer may be mid-append; only complete lines are consumed.
+    complete = data[: data.rfind(b"\n") + 1]
+    records = [json.loads(line) for line in complete.splitlines() if line.strip()]
+    return records, offset + len(complete)
+
+
+def open_cursor(since: float = None) -> tuple:
+    """
+    Opens a cursor at the end of the feed, returning the records newer than `since`.
+
+    Sessions open their cursor right after loading the persisted datasets; records
+    written after those files are returned so they can be replayed on top of them.
+
+    Parameters:
+    since (float, optional): Timestamp of the loaded data; no records when omitted.
+
+    Returns:
+    tuple: (cursor, records), where cursor is (inode, offset).
+
+    Complexity:
+    Time: O(f) when `since` is given, for a feed of f bytes; O(1) otherwise.
+    Space: O(r), for the returned records.
+    """
+    try:
+        stat = os.stat(feed_path())
+    except FileNotFoundError:
+        return (None, 0), []
+    if since is None:
+        return (stat.st_ino, stat.st_size), []
+    records, offset = _read_from(feed_path(), 0)
+    return (stat.st_ino, offset), [r for r in records if r["ts"] > since]
+
+
+def poll(cursor: tuple) -> tuple:
+    """
+    Returns the records appended since the cursor.
+
+    Parameters:
+    cursor (tuple): (inode, offset) returned by `open_cursor` or a previous poll.
+
+    Returns:
+    tuple: (cursor, records, reset). `reset` is True when the feed was rotated or
+    truncated, in which case the caller should reload the persisted datasets.
+
+    Complexity:
+    Time: O(1) when nothing changed (one stat call), O(k) for k new bytes otherwise.
+    Space: O(r), for the new records.
+    """
+    inode, offset = cursor
+    try:
+        stat = os.stat(feed_path())
+    except FileNotFoundError:
+        return (None, 0), [], inode is not None
+    if stat.st_ino == inode and stat.st_size == offset:
+        return cursor, [], False
+    if stat.st_ino != inode and inode is not None or stat.st_size < offset:
+        return (stat.st_ino, stat.st_size), [], True
+    records, offset = _read_from(feed_path(), offset)
+    return (stat.st_ino, offset), records, False
+
+
+def has_changes(cursor: tuple) -> bool:
+    """
+    Tells whether the feed moved past the cursor, with a single stat call.
+    """
+    inode, offset = cursor
+    try:
+        stat = os.stat(feed_path())
+    except FileNotFoundError:
+        return inode is not None
+    return stat.st_ino != inode or stat.st_size != offset
+
+
+def apply_record(df, record: dict):
+    """
+    Writes the values of a change record into a dataset frame.
+
+    The month's row is updated, appended when the month is new, or removed when the
+    record's values are None (an undone creation). Applying the same record twice
+    leaves the frame unchanged.
+
+    Parameters:
+    df (pd.DataFrame or None): The frame of the record's dataset.
+    record (dict): A record returned by `poll` or `open_cursor`.
+
+    Returns:
+    pd.DataFrame: The updated frame.
+
+    Complexity:
+    Time: O(n), to find the row and enforce the schema.
+    Space: O(1) for an update, O(n) when a row is appended.
+    """
+    values = record["values"]
+    month_year = record["month"]
+    if values is None:
+        if df is not None:
+            df = df.loc[df[MONTH_COLUMN] != month_year].reset_index(drop=True)
+        return enforce_schema(df, record["dataset"])
+    if df is not None and month_year in df[MONTH_COLUMN].values:
+        mask = df[MONTH_COLUMN] == month_year
+        for column, value in values.items():
+            if column not in df.columns:
+                continue
+            set_value(df, mask, column, value)
+    else:
+        row = pd.DataFrame([{MONTH_COLUMN: month_year, **values}])
+        df = row if df is None else pd.concat([df, row], ignore_index=True)
+    return enforce_schema(df, record["dataset"])
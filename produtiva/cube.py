@@ -0,0 +1,371 @@
+import numpy as np
+
+from produtiva.months import month_ordinal, ordinal_to_month
+
+CUBE_METRICS = (
+    "TP Adaptado (22 Dias Úteis)",
+    "TP Ideal (22 Dias Úteis)",
+    "Dias Úteis",
+    "TP Ajustado (Dias Úteis Reais)",
+    "TP Ideal Ajustado (Dias Úteis Reais)",
+    "TP Tasks Revisadas",
+    "TP Adaptado Tasks Revisadas",
+    "Task P",
+    "Task M",
+    "Task G",
+)
+METRIC_INDEX = {metric: i for i, metric in enumerate(CUBE_METRICS)}
+
+
+class MetricCube:
+    """
+    Materialized month × metric × person cube with quarter and year roll-ups.
+
+    Values live in a dense float64 array indexed by (month, metric, person), where
+    missing cells are NaN. The month axis starts in January of the first stored
+    year, so quarter and year roll-ups are plain integer divisions of the month
+    index. Roll-ups are kept in sync by applying the delta of every written cell,
+    which makes each write O(k) for k metrics instead of a full rebuild. `version`
+    counts the writes, so anything derived from the cube can be cached until it
+    changes.
+    """
+
+    def __init__(self, month_capacity: int = 24, person_capacity: int = 1):
+        self.persons = []
+        self._person_index = {}
+        self._origin_year = None
+        self._n_months = 0
+        self.version = 0
+        self._values = np.full(
+            (month_capacity, len(CUBE_METRICS), person_capacity), np.nan
+        )
+        self._quarters = np.zeros(
+            (month_capacity // 3 + 1, len(CUBE_METRICS), person_capacity)
+        )
+        self._years = np.zeros(
+            (month_capacity // 12 + 1, len(CUBE_METRICS), person_capacity)
+        )
+
+    @classmethod
+    def from_frames(cls, df_tp, df_tasks=None, df_tamanho=None, person=None):
+        """
+        Builds a cube holding the three datasets of a single person.
+
+        Parameters:
+        df_tp (pd.DataFrame): Productivity data per month/year.
+        df_tasks (pd.DataFrame or None): Reviewed task data per month/year.
+        df_tamanho (pd.DataFrame or None): Task size data per month/year.
+        person (str, optional): Person label for the cube's person axis.
+
+        Returns:
+        MetricCube: The populated cube.
+
+        Complexity:
+        Time: O(n * k), where n is the number of months and k the number of metrics.
+        Space: O(n * k), for the dense arrays.
+        """
+        cube = cls()
+        cube.load_frames(df_tp, df_tasks, df_tamanho, person=person)
+        return cube
+
+    def load_frames(self, df_tp, df_tasks=None, df_tamanho=None, person=None):
+        """
+        Writes every row of the given frames into the cube for one person.
+
+        Parameters:
+        df_tp (pd.DataFrame): Productivity data per month/year.
+        df_tasks (pd.DataFrame or None): Reviewed task data per month/year.
+        df_tamanho (pd.DataFrame or None): Task size data per month/year.
+        person (str, optional): Person label for the cube's person axis.
+
+        Returns:
+        None
+
+        Complexity:
+        Time: O(n * k), where n is the number of months and k the number of metrics.
+        Space: O(n), for the month keys.
+        """
+        for df in (df_tp, df_tasks, df_tamanho):
+            if df is None or df.empty:
+                continue
+            ordinals = np.fromiter(
+                (month_ordinal(m) for m in df["Mês/Ano"]), dtype=np.int64
+            )
+            metrics = [m for m in CUBE_METRICS if m in df.columns]
+            block = df[metrics].to_numpy(dtype=float)
+            self._write_block(ordinals, metrics, block, self._person_slot(person))
+
+    def update_month(self, month_year: str, values: dict, person=None) -> None:
+        """
+        Incrementally writes the metric values of one month.
+
+        Parameters:
+        month_year (str): The month/year identifier in the format 'MM/YY'.
+        values (dict): Mapping of metric name to value; unknown metrics are ignored.
+        person (str, optional): Person label for the cube's person axis.
+
+        Returns:
+        None
+
+        Complexity:
+        Time: O(k), where k is the number of metrics written (amortized).
+        Space: O(1), aside from occasional capacity growth.
+        """
+        metrics = [m for m in values if m in METRIC_INDEX]
+        if not metrics:
+            return
+        block = np.array([[float(values[m]) for m in metrics]])
+        self._write_block(
+            np.array([month_ordinal(month_year)]),
+            metrics,
+            block,
+            self._person_slot(person),
+        )
+
+    def update_from_frame(self, df, month_year: str, person=None) -> None:
+        """
+        Incrementally writes the row of `month_year` found in a dataset frame.
+
+        Parameters:
+        df (pd.DataFrame): Any of df_tp, df_tasks or df_tamanho.
+        month_year (str): The month/year identifier in the format 'MM/YY'.
+        person (str, optional): Person label for the cube's person axis.
+
+        Returns:
+        None
+
+        Complexity:
+        Time: O(n + k), locating the row and writing k metrics.
+        Space: O(1), constant space usage.
+        """
+        rows = df.loc[df["Mês/Ano"] == month_year]
+        if not rows.empty:
+            self.update_month(month_year, rows.iloc[-1].to_dict(), person=person)
+
+    @property
+    def months(self) -> list:
+        """
+        Returns the 'MM/YY' labels of the cube's month axis.
+        """
+        if self._origin_year is None:
+            return []
+        origin = self._origin_year * 12
+        return [ordinal_to_month(origin + i) for i in range(self._n_months)]
+
+    @property
+    def quarters(self) -> list:
+        """
+        Returns the 'Qn/YY' labels of the quarter roll-up axis.
+        """
+        if self._origin_year is None:
+            return []
+        return [
+            f"Q{q % 4 + 1}/{str(self._origin_year + q // 4)[-2:]}"
+            for q in range((self._n_months + 2) // 3)
+        ]
+
+    @property
+    def years(self) -> list:
+        """
+        Returns the years covered by the year roll-up axis.
+        """
+        if self._origin_year is None:
+            return []
+        return [self._origin_year + y for y in range((self._n_months + 11) // 12)]
+
+    def person_year(self, year: int, person=None) -> np.ndarray:
+        """
+        Returns one person's 12 × k block of monthly values for a calendar year.
+
+        Parameters:
+        year (int): The year in YYYY format.
+        person (str, optional): Person label for the cube's person axis.
+
+        Returns:
+        np.ndarray: A (12, k) view of the cube; months outside the data are NaN.
+
+        Raises:
+        KeyError: When the year is outside `years` or the person is unknown.
+
+        Complexity:
+        Time: O(1), a basic slice returns a view.
+        Space: O(1), no data is copied.
+        """
+        if year not in self.years:
+            raise KeyError(f"year {year} is outside the cube")
+        start = (year - self._origin_year) * 12
+        return self._values[start : start + 12, :, self._person_index[person]]
+
+    def team_quarter_totals(self, metric: str) -> np.ndarray:
+        """
+        Returns the sum of a metric over every person for each quarter.
+
+        Parameters:
+        metric (str): One of CUBE_METRICS.
+
+        Returns:
+        np.ndarray: Quarter totals aligned with `quarters`.
+
+        Complexity:
+        Time: O(q * p), for q quarters and p persons.
+        Space: O(q), for the result.
+        """
+        n_quarters = len(self.quarters)
+        return self._quarters[
+            :n_quarters, METRIC_INDEX[metric], : len(self.persons)
+        ].sum(axis=1)
+
+    def quarter_totals(self, person=None) -> np.ndarray:
+        """
+        Returns one person's quarter roll-up of every metric.
+
+        Parameters:
+        person (str, optional): Person label for the cube's person axis.
+
+        Returns:
+        np.ndarray: A (q, k) view aligned with `quarters` and CUBE_METRICS.
+
+        Complexity:
+        Time: O(1), a basic slice returns a view.
+        Space: O(1), no data is copied.
+        """
+        return self._quarters[: len(self.quarters), :, self._person_index[person]]
+
+    def year_totals(self, person=None) -> np.ndarray:
+        """
+        Returns one person's year roll-up of every metric.
+
+        Parameters:
+        person (str, optional): Person label for the cube's person axis.
+
+        Returns:
+        np.ndarray: A (y, k) view aligned with `years` and CUBE_METRICS.
+
+        Complexity:
+        Time: O(1), a basic slice returns a view.
+        Space: O(1), no data is copied.
+        """
+        return self._years[: len(self.years), :, self._person_index[person]]
+
+    def metric_across_people(self, metric: str) -> np.ndarray:
+        """
+        Returns one metric for every month and person.
+
+        Parameters:
+        metric (str): One of CUBE_METRICS.
+
+        Returns:
+        np.ndarray: A (n, p) view aligned with `months` and `persons`.
+
+        Complexity:
+        Time: O(1), a basic slice returns a view.
+        Space: O(1), no data is copied.
+        """
+        return self._values[
+            : self._n_months, METRIC_INDEX[metric], : len(self.persons)
+        ]
+
+    def block(self, metrics) -> np.ndarray:
+        """
+        Returns several metrics for every month and person.
+
+        Parameters:
+        metrics (iterable): Names among CUBE_METRICS.
+
+        Returns:
+        np.ndarray: A (n, k, p) copy aligned with `months`, `metrics` and `persons`.
+
+        Complexity:
+        Time: O(n * k * p), for the copied cells.
+        Space: O(n * k * p), for the copy.
+        """
+        cols = [METRIC_INDEX[metric] for metric in metrics]
+        return self._values[: self._n_months, cols, : len(self.persons)]
+
+    def yearly_pivot(self, metrics, person=None) -> np.ndarray:
+        """
+        Returns one person's metrics as a year × calendar month pivot.
+
+        The month axis starts in January, so the pivot is a reshape of the month axis
+        rather than a filter per year.
+
+        Parameters:
+        metrics (iterable): Names among CUBE_METRICS.
+        person (str, optional): Person label for the cube's person axis.
+
+        Returns:
+        np.ndarray: A (y, 12, k) copy aligned with `years`, January to December and
+        `metrics`; months outside the data are NaN.
+
+        Complexity:
+        Time: O(y * 12 * k), for the copied cells.
+        Space: O(y * 12 * k), for the pivot.
+        """
+        cols = [METRIC_INDEX[metric] for metric in metrics]
+        pivot = np.full((len(self.years) * 12, len(cols)), np.nan)
+        values = self._values[: self._n_months, :, self._person_index[person]]
+        pivot[: self._n_months] = values[:, cols]
+        return pivot.reshape(len(self.years), 12, len(cols))
+
+    def _person_slot(self, person) -> int:
+        if person not in self._person_index:
+            slot = len(self.persons)
+            if slot == self._values.shape[2]:
+                self._grow(persons=max(1, slot))
+            self.persons.append(person)
+            self._person_index[person] = slot
+        return self._person_index[person]
+
+    def _write_block(self, ordinals, metrics, block, slot) -> None:
+        if self._origin_year is None:
+            self._origin_year = int(ordinals.min()) // 12
+        first_year = int(ordinals.min()) // 12
+        if first_year < self._origin_year:
+            self._shift_origin(self._origin_year - first_year)
+
+        idx = ordinals - self._origin_year * 12
+        needed = int(idx.max()) + 1
+        if needed > self._values.shape[0]:
+            self._grow(months=max(needed, 2 * self._values.shape[0]) - len(self._values))
+        self._n_months = max(self._n_months, needed)
+
+        if len(idx) > 1:
+            # Only the last write of a repeated month lands in the cell, so only its
+            # delta may reach the roll-ups.
+            _, last = np.unique(idx[::-1], return_index=True)
+            keep = len(idx) - 1 - last
+            idx, block = idx[keep], block[keep]
+
+        cols = np.array([METRIC_INDEX[m] for m in metrics])
+        old = np.nan_to_num(self._values[idx[:, None], cols, slot])
+        self._values[idx[:, None], cols, slot] = block
+        delta = np.nan_to_num(block) - old
+        np.add.at(self._quarters, (idx[:, None] // 3, cols, slot), delta)
+        np.add.at(self._years, (idx[:, None] // 12, cols, slot), delta)
+        self.version += 1
+
+    def _grow(self, months: int = 0, persons: int = 0) -> None:
+        def pad(array, rows, fill):
+            return np.pad(
+                array,
+                ((0, rows), (0, 0), (0, persons)),
+                constant_values=fill,
+            )
+
+        self._values = pad(self._values, months, np.nan)
+        self._quarters = pad(
+            self._quarters, len(self._values) // 3 + 1 - len(self._quarters), 0.0
+        )
+        self._years = pad(
+            self._years, len(self._values) // 12 + 1 - len(self._years), 0.0
+        )
+
+    def _shift_origin(self, years: int) -> None:
+        def prepend(array, rows, fill):
+            return np.pad(array, ((rows, 0), (0, 0), (0, 0)), constant_values=fill)
+
+        self._values = prepend(self._values, 12 * years, np.nan)
+        self._quarters = prepend(self._quarters, 4 * years, 0.0)
+        self._years = prepend(self._years, years, 0.0)
+        self._origin_year -= years
+        self._n_months += 12 * years
@@ -0,0 +1,221 @@
+"""
+Excel reports of the datasets, written in openpyxl's write-only (streaming) mode.
+
+A report holds one sheet per dataset plus the derived productivity table, and native
+Excel charts equivalent to the app's productivity line chart (`create_fig_tp`) and
+task size bar chart (`create_fig_tamanho_task`). Rows are converted and streamed in
+blocks of CHUNK_ROWS, and write-only workbooks flush each row to a temporary file,
+so the memory used by the export does not grow with the number of rows.
+
+Reports of a whole team are written in parallel, one workbook per person, by worker
+processes (openpyxl is pure Python, so threads would serialize on the GIL).
+"""
+
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from produtiva.schema import FLOAT_DECIMALS, MONTH_COLUMN
+
+CHUNK_ROWS = 5_000
+
+TP_COLUMNS = {
+    "TP Adaptado (22 Dias Úteis)": "2F4F4F",
+    "TP Ajustado (Dias Úteis Reais)": "8B0000",
+    "TP Ideal (22 Dias Úteis)": "000080",
+    "TP Ideal Ajustado (Dias Úteis Reais)": "00FF00",
+}
+REVISAO_COLUMNS = {
+    "TP Adaptado (22 Dias Úteis) + Revisão Task": "C71585",
+    "TP Ajustado (Dias Úteis Reais) + Revisão Task": "FF4500",
+}
+TAMANHO_COLUMNS = {
+    "Task P": "FFD700",
+    "Task M": "2F4F4F",
+    "Task G": "8B0000",
+}
+SHEETS = {
+    "df_tp": "TP",
+    "df_tasks": "Tasks Revisadas",
+    "df_tamanho": "Tamanho Tasks",
+    "produtividade": "Produtividade Geral",
+}
+
+
+def productivity_table(df_tp: pd.DataFrame, df_tasks: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns the derived productivity table in wide form: one row per month.
+
+    The "+ Revisão Task" columns are taken from df_tp when present, otherwise derived
+    from df_tasks by month, as in `create_df_produtividade_geral`.
+
+    Parameters:
+    df_tp (pd.DataFrame): Productivity data per month/year.
+    df_tasks (pd.DataFrame): Reviewed task data per month/year.
+
+    Returns:
+    pd.DataFrame: The month column, the TP columns and the "+ Revisão Task" columns.
+
+    Complexity:
+    Time: O(n), for n months.
+    Space: O(n), for the new frame.
+    """
+    table = df_tp[[MONTH_COLUMN, *TP_COLUMNS]].copy()
+    if all(column in df_tp.columns for column in REVISAO_COLUMNS):
+        for column in REVISAO_COLUMNS:
+            table[column] = df_tp[column]
+        return table
+    revisadas = dict(
+        zip(df_tasks[MONTH_COLUMN].astype(object), df_tasks["TP Tasks Revisadas"])
+    )
+    revisadas = df_tp[MONTH_COLUMN].astype(object).map(revisadas).fillna(0).to_numpy()
+    table["TP Adaptado (22 Dias Úteis) + Revisão Task"] = (
+        df_tp["TP Adaptado (22 Dias Úteis)"].to_numpy() + revisadas
+    )
+    table["TP Ajustado (Dias Úteis Reais) + Revisão Task"] = (
+        df_tp["TP Ajustado (Dias Úteis Reais)"].to_numpy() + revisadas
+    )
+    return table
+
+
+def _cells(series: pd.Series) -> list:
+    values = series.to_numpy()
+    if values.dtype.kind == "f":
+        values = np.round(values.astype(np.float64), FLOAT_DECIMALS)
+        return [None if v != v else v for v in values.tolist()]
+    if values.dtype.kind in "iub":
+        return values.tolist()
+    return [None if v is None or v != v else str(v) for v in series.astype(object)]
+
+
+def _stream_rows(ws, df: pd.DataFrame, derive=None) -> None:
+    header = True
+    for start in range(0, len(df), CHUNK_ROWS):
+        chunk = df.iloc[start : start + CHUNK_ROWS]
+        if derive is not None:
+            chunk = derive(chunk)
+        if header:
+            ws.append(list(chunk.columns))
+            header = False
+        for row in zip(*(_cells(chunk[column]) for column in chunk.columns)):
+            ws.append(row)
+
+
+def _series_chart(chart, ws, df, columns, anchor) -> None:
+    from openpyxl.chart import Reference, Series
+
+    rows = len(df)
+    categories = Reference(ws, min_col=1, min_row=2, max_row=rows + 1)
+    for column, color in columns.items():
+        position = df.columns.get_loc(column) + 1
+        values = Reference(ws, min_col=position, min_row=1, max_row=rows + 1)
+        series = Series(values, title_from_data=True)
+        series.graphicalProperties.line.solidFill = color
+        if chart.tagname == "barChart":
+            series.graphicalProperties.solidFill = color
+        else:
+            series.graphicalProperties.line.width = 38100
+            series.smooth = True
+            series.marker.symbol = "circle"
+        chart.series.append(series)
+    chart.set_categories(categories)
+    chart.x_axis.title = MONTH_COLUMN
+    chart.y_axis.title = "Valor"
+    chart.width, chart.height = 28, 12
+    ws.add_chart(chart, anchor)
+
+
+def write_report(target, frames: dict, person: str = None):
+    """
+    Writes the datasets and their charts to an XLSX workbook, streaming the rows.
+
+    Parameters:
+    target (str or file-like): Path or binary file to write the workbook to.
+    frames (dict): The frames "df_tp", "df_tasks" and "df_tamanho".
+    person (str, optional): Name shown in the chart titles.
+
+    Returns:
+    str or file-like: The target.
+
+    Complexity:
+    Time: O(n * c), for n rows and c columns across the frames.
+    Space: O(CHUNK_ROWS * c) for the rows being converted, aside from the frames.
+    """
+    from openpyxl import Workbook
+    from openpyxl.chart import BarChart, LineChart
+
+    suffix = f" — {person}" if person else ""
+    df_tp = frames["df_tp"]
+    df_tamanho = frames["df_tamanho"]
+    workbook = Workbook(write_only=True)
+    for name, df in (
+        ("df_tp", df_tp),
+        ("df_tasks", frames["df_tasks"]),
+        ("df_tamanho", df_tamanho),
+        ("produtividade", df_tp),
+    ):
+        ws = workbook.create_sheet(SHEETS[name])
+        if name == "df_tp":
+            line_chart = LineChart()
+            line_chart.title = f"Produtividade Tasks{suffix}"
+            _series_chart(line_chart, ws, df, TP_COLUMNS, "K2")
+        elif name == "df_tamanho" and df is not None:
+            bar_chart = BarChart()
+            bar_chart.type = "col"
+            bar_chart.grouping = "clustered"
+            bar_chart.title = f"Tamanho das Tasks{suffix}"
+            _series_chart(bar_chart, ws, df, TAMANHO_COLUMNS, "G2")
+        if name == "produtividade":
+            # Derived block by block, so the table is never materialized whole.
+            _stream_rows(
+                ws, df, lambda chunk: productivity_table(chunk, frames["df_tasks"])
+            )
+        elif df is not None:
+            _stream_rows(ws, df)
+    workbook.save(target)
+    return target
+
+
+def report_filename(person: str) -> str:
+    """
+    Returns a file name for a person's report, e.g. 'produtividade_Pessoa_0001.xlsx'.
+    """
+    return f"produtividade_{re.sub(r'[^A-Za-z0-9_-]+', '_', person).strip('_')}.xlsx"
+
+
+def _write_person(args):
+    path, frames, person = args
+    write_report(path, frames, person=person)
+    return path
+
+
+def export_team(team: dict, out_dir: str, max_workers: int = None) -> list:
+    """
+    Writes one report per person, in parallel worker processes.
+
+    Parameters:
+    team (dict): Person -> frames, as accepted by `write_report`.
+    out_dir (str): Directory for the workbooks, created if missing.
+    max_workers (int, optional): Number of processes; the CPU count when omitted,
+        and 1 writes the reports in this process.
+
+    Returns:
+    list: The paths of the written workbooks, in the order of `team`.
+
+    Complexity:
+    Time: O(N / w) for the N rows of the team over w workers.
+    Space: O(w * CHUNK_ROWS * c) for the rows being converted, plus one copy of each
+    person's frames sent to the workers.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = [
+        (os.path.join(out_dir, report_filename(person)), frames, person)
+        for person, frames in team.items()
+    ]
+    if max_workers == 1 or len(jobs) <= 1:
+        return [_write_person(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_write_person, jobs))
@@ -0,0 +1,480 @@
+import numpy as np
+import pandas as pd
+
+from produtiva.business_days import business_days_for_months
+from produtiva.months import parse_month_year
+from produtiva.paths import load_json_config
+from produtiva.profiling import timed
+from produtiva.schema import empty_frame, enforce_schema, set_value
+
+WORK_DAYS_POA_CREATE = {
+    "04/24": 22,
+    "05/24": 22,
+    "06/24": 20,
+    "07/24": 23,
+    "08/24": 22,
+    "09/24": 21,
+    "10/24": 23,
+    "11/24": 20,
+    "12/24": 15,
+    "01/25": 20,
+}
+DEFAULT_PERSON = "Pedro Henrique Casarotto Rigon"
+BACKFILL_DEFAULTS = {
+    "TP Adaptado (22 Dias Úteis)": 0,
+    "TP Ideal (22 Dias Úteis)": 15,
+    "TP Tasks Revisadas": 0,
+    "TP Adaptado Tasks Revisadas": 0,
+    "Task P": 0,
+    "Task M": 0,
+    "Task G": 0,
+}
+
+
+def create_df_tp():
+    """
+    Creates a DataFrame containing task productivity data for specific months.
+
+    This function initializes a DataFrame with predefined values for monthly productivity,
+    calculates adjusted productivity based on actual working days, and returns the finalized DataFrame.
+
+    Returns:
+    pd.DataFrame: A DataFrame containing the columns 'Mês/Ano', 'TP Adaptado (22 Dias Úteis)',
+    'TP Ideal (22 Dias Úteis)', 'Dias Úteis', 'TP Ajustado (Dias Úteis Reais)',
+    and 'TP Ideal Ajustado (Dias Úteis Reais)'.
+
+    Complexity:
+    Time: O(n), where n is the number of months.
+    Space: O(n), for storing the productivity data.
+    """
+    df_tp = pd.DataFrame(load_json_config("tp_create.json"))
+    df_tp["Dias Úteis"] = df_tp["Mês/Ano"].map(WORK_DAYS_POA_CREATE)
+
+    df_tp["TP Ajustado (Dias Úteis Reais)"] = df_tp["TP Adaptado (22 Dias Úteis)"] * (
+        22 / df_tp["Dias Úteis"]
+    )
+    df_tp["TP Ideal Ajustado (Dias Úteis Reais)"] = df_tp[
+        "TP Ideal (22 Dias Úteis)"
+    ] * (df_tp["Dias Úteis"] / 22)
+
+    return enforce_schema(df_tp, "df_tp")
+
+
+def create_df_tasks(df_tp):
+    """
+    Generates a tasks DataFrame by merging base data with existing months in df_tp.
+
+    This function returns a DataFrame containing the months from df_tp and merges it with predefined task data.
+    If there are new months in df_tp, they will be included with default values of 0.
+
+    Parameters:
+    df_tp (pd.DataFrame): DataFrame containing months to be merged with the task base data.
+
+    Returns:
+    pd.DataFrame: A DataFrame containing task productivity per month/year.
+
+    Complexity:
+    Time: O(n), where n is the number of months.
+    Space: O(n), for storing the task data.
+    """
+    df_tasks_base = pd.DataFrame(load_json_config("tasks_base.json"))
+
+    df_tasks_merged = pd.merge(
+        df_tp[["Mês/Ano"]], df_tasks_base, on="Mês/Ano", how="left"
+    )
+    df_tasks_merged["TP Tasks Revisadas"] = df_tasks_merged[
+        "TP Tasks Revisadas"
+    ].fillna(0)
+    df_tasks_merged["TP Adaptado Tasks Revisadas"] = df_tasks_merged[
+        "TP Adaptado Tasks Revisadas"
+    ].fillna(0)
+
+    return enforce_schema(df_tasks_merged, "df_tasks")
+
+
+@timed()
+def create_df_produtividade_geral(df_tp, df_tasks):
+    """
+    Generates a productivity DataFrame by merging task data with productivity data.
+
+    This function combines the existing productivity data with reviewed task data,
+    deriving the "+ Revisão Task" columns when df_tp does not carry them yet.
+    The resulting DataFrame is transformed into a long format for visualization purposes.
+
+    Parameters:
+    df_tp (pd.DataFrame): DataFrame containing productivity data with columns related to task productivity.
+    df_tasks (pd.DataFrame): DataFrame containing reviewed task data.
+
+    Returns:
+    pd.DataFrame: A melted DataFrame containing productivity values per month/year and task type.
+
+    Complexity:
+    Time: O(n), where n is the number of rows in df_tp.
+    Space: O(n), since a new DataFrame is created.
+    """
+    # The upserts keep these columns current and migrated frames always carry
+    # them; they are only derived here for frames built from the defaults.
+    if "TP Ajustado (Dias Úteis Reais) + Revisão Task" not in df_tp.columns:
+        df_tp["TP Adaptado (22 Dias Úteis) + Revisão Task"] = (
+            df_tp["TP Adaptado (22 Dias Úteis)"] + df_tasks["TP Tasks Revisadas"]
+        )
+        df_tp["TP Ajustado (Dias Úteis Reais) + Revisão Task"] = (
+            df_tp["TP Ajustado (Dias Úteis Reais)"] + df_tasks["TP Tasks Revisadas"]
+        )
+
+    df_produtividade_geral = df_tp.melt(
+        id_vars=["Mês/Ano"],
+        value_vars=[
+            "TP Adaptado (22 Dias Úteis)",
+            "TP Ajustado (Dias Úteis Reais)",
+            "TP Ideal (22 Dias Úteis)",
+            "TP Ideal Ajustado (Dias Úteis Reais)",
+            "TP Adaptado (22 Dias Úteis) + Revisão Task",
+            "TP Ajustado (Dias Úteis Reais) + Revisão Task",
+        ],
+        var_name="Tipo de TP",
+        value_name="Valor",
+    )
+    return df_produtividade_geral
+
+
+def create_df_tamanho_task(df_tp):
+    """
+    Generates a DataFrame containing task size information for specific months.
+
+    This function merges a base dataset with the provided df_tp DataFrame, ensuring that
+    all months in df_tp are present and filling missing values with zero.
+
+    Parameters:
+    df_tp (pd.DataFrame): DataFrame containing months to be merged with the task size base data.
+
+    Returns:
+    pd.DataFrame: A DataFrame containing task size details per month/year.
+
+    Complexity:
+    Time: O(n), where n is the number of months.
+    Space: O(n), for storing the task size data.
+    """
+    df_tamanho_task_base = pd.DataFrame(
+        load_json_config("tamanho_task_base.json")
+    )
+
+    df_tamanho_task_merged = pd.merge(
+        df_tp[["Mês/Ano"]], df_tamanho_task_base, on="Mês/Ano", how="left"
+    )
+    df_tamanho_task_merged["Task P"] = df_tamanho_task_merged["Task P"].fillna(0)
+    df_tamanho_task_merged["Task M"] = df_tamanho_task_merged["Task M"].fillna(0)
+    df_tamanho_task_merged["Task G"] = df_tamanho_task_merged["Task G"].fillna(0)
+
+    return enforce_schema(df_tamanho_task_merged, "df_tamanho")
+
+
+def add_or_update_month_df_tp(
+    df_tp,
+    df_tasks,
+    work_days_dict,
+    month_year,
+    tp_adaptado_22,
+    tp_ideal_22,
+    dias_uteis,
+    cube=None,
+    sketches=None,
+    alerts=None,
+    person=DEFAULT_PERSON,
+):
+    """
+    Adds or updates a month entry in the df_tp DataFrame.
+
+    This function updates productivity values for a given month, including adjustments
+    based on working days and reviewed tasks.
+
+    Parameters:
+    df_tp (pd.DataFrame): DataFrame containing productivity data per month/year.
+    df_tasks (pd.DataFrame): DataFrame containing reviewed tasks data.
+    work_days_dict (dict): Dictionary storing working days for each month.
+    month_year (str): The month/year identifier in the format 'MM/YY'.
+    tp_adaptado_22 (int): Adapted TP for 22 business days.
+    tp_ideal_22 (int): Ideal TP for 22 business days.
+    dias_uteis (int): Actual number of business days for the given month.
+    cube (MetricCube, optional): Cube updated incrementally with the written month.
+    sketches (TeamSketches, optional): Team quantile sketches updated with the month.
+    alerts (AlertEngine, optional): Alert rules re-evaluated for the written month.
+    person (str): The person the frame belongs to, for the cube, sketches and alerts.
+
+    Returns:
+    pd.DataFrame: Updated df_tp DataFrame with new or modified month data.
+
+    Complexity:
+    Time: O(n), where n is the number of rows in df_tp.
+    Space: O(1), modifying the existing DataFrame.
+    """
+    work_days_dict[month_year] = dias_uteis
+
+    if month_year in df_tp["Mês/Ano"].values:
+        idx = df_tp.index[df_tp["Mês/Ano"] == month_year][0]
+        set_value(df_tp, idx, "TP Adaptado (22 Dias Úteis)", tp_adaptado_22)
+        set_value(df_tp, idx, "TP Ideal (22 Dias Úteis)", tp_ideal_22)
+    else:
+        task_row = df_tasks.loc[
+            df_tasks["Mês/Ano"] == month_year, "TP Tasks Revisadas"
+        ].sum()
+        new_data = {
+            "Mês/Ano": month_year,
+            "TP Adaptado (22 Dias Úteis)": tp_adaptado_22,
+            "TP Ideal (22 Dias Úteis)": tp_ideal_22,
+            "Dias Úteis": dias_uteis,
+            "TP Ajustado (Dias Úteis Reais)": tp_adaptado_22 * (22 / dias_uteis),
+            "TP Ideal Ajustado (Dias Úteis Reais)": tp_ideal_22 * (dias_uteis / 22),
+            "TP Adaptado (22 Dias Úteis) + Revisão Task": tp_adaptado_22 + task_row,
+            "TP Ajustado (Dias Úteis Reais) + Revisão Task": (
+                tp_adaptado_22 * (22 / dias_uteis)
+            )
+            + task_row,
+        }
+        df_tp = pd.concat([df_tp, pd.DataFrame([new_data])], ignore_index=True)
+
+    df_tp["Dias Úteis"] = df_tp["Mês/Ano"].astype(object).map(work_days_dict)
+    df_tp["TP Ajustado (Dias Úteis Reais)"] = df_tp["TP Adaptado (22 Dias Úteis)"] * (
+        22 / df_tp["Dias Úteis"]
+    )
+    df_tp["TP Ideal Ajustado (Dias Úteis Reais)"] = df_tp[
+        "TP Ideal (22 Dias Úteis)"
+    ] * (df_tp["Dias Úteis"] / 22)
+    df_tp["TP Adaptado (22 Dias Úteis) + Revisão Task"] = (
+        df_tp["TP Adaptado (22 Dias Úteis)"] + df_tasks["TP Tasks Revisadas"]
+    )
+    df_tp["TP Ajustado (Dias Úteis Reais) + Revisão Task"] = (
+        df_tp["TP Ajustado (Dias Úteis Reais)"] + df_tasks["TP Tasks Revisadas"]
+    )
+    df_tp = enforce_schema(df_tp, "df_tp")
+    if cube is not None:
+        cube.update_from_frame(df_tp, month_year, person=person)
+    if sketches is not None:
+        sketches.update_from_frame(df_tp, month_year, person=person)
+    if alerts is not None:
+        alerts.update_from_frame(df_tp, month_year, person=person)
+    return df_tp
+
+
+def add_or_update_month_df_tasks(
+    df_tasks,
+    month_year,
+    tp_tasks_revisadas,
+    tp_adaptado_tasks_revisadas,
+    cube=None,
+    sketches=None,
+    alerts=None,
+    person=DEFAULT_PERSON,
+):
+    """
+    Adds or updates a month's data in the df_tasks DataFrame.
+
+    This function updates productivity values for a given month or adds a new row if the month does not exist.
+
+    Parameters:
+    df_tasks (pd.DataFrame): DataFrame containing task review data per month/year.
+    month_year (str): The month/year identifier in the format 'MM/YY'.
+    tp_tasks_revisadas (int): Number of reviewed tasks.
+    tp_adaptado_tasks_revisadas (int): Number of adjusted reviewed tasks.
+    cube (MetricCube, optional): Cube updated incrementally with the written month.
+    sketches (TeamSketches, optional): Team quantile sketches updated with the month.
+    alerts (AlertEngine, optional): Alert rules re-evaluated for the written month.
+    person (str): The person the frame belongs to, for the cube, sketches and alerts.
+
+    Returns:
+    pd.DataFrame: Updated df_tasks DataFrame with new or modified month data.
+
+    Complexity:
+    Time: O(n), where n is the number of rows in df_tasks.
+    Space: O(1), modifying the existing DataFrame.
+    """
+    if month_year in df_tasks["Mês/Ano"].values:
+        idx = df_tasks.index[df_tasks["Mês/Ano"] == month_year][0]
+        set_value(df_tasks, idx, "TP Tasks Revisadas", tp_tasks_revisadas)
+        set_value(
+            df_tasks, idx, "TP Adaptado Tasks Revisadas", tp_adaptado_tasks_revisadas
+        )
+    else:
+        new_data = {
+            "Mês/Ano": month_year,
+            "TP Tasks Revisadas": tp_tasks_revisadas,
+            "TP Adaptado Tasks Revisadas": tp_adaptado_tasks_revisadas,
+        }
+        df_tasks = pd.concat([df_tasks, pd.DataFrame([new_data])], ignore_index=True)
+    df_tasks = enforce_schema(df_tasks, "df_tasks")
+    if cube is not None:
+        cube.update_from_frame(df_tasks, month_year, person=person)
+    if sketches is not None:
+        sketches.update_from_frame(df_tasks, month_year, person=person)
+    if alerts is not None:
+        alerts.update_from_frame(df_tasks, month_year, person=person)
+    return df_tasks
+
+
+def add_or_update_month_df_tamanho_task(
+    df_tamanho,
+    month_year,
+    task_p,
+    task_m,
+    task_g,
+    cube=None,
+    alerts=None,
+    person=DEFAULT_PERSON,
+):
+    """
+    Adds or updates a month's data in the df_tamanho DataFrame.
+
+    This function updates the task size values (P, M, G) for a given month/year.
+    If the month does not exist, a new row is added.
+
+    Parameters:
+    df_tamanho (pd.DataFrame or None): DataFrame containing task size data per month/year.
+    month_year (str): The month/year identifier in the format 'MM/YY'.
+    task_p (int): Number of small tasks (P).
+    task_m (int): Number of medium tasks (M).
+    task_g (int): Number of large tasks (G).
+    cube (MetricCube, optional): Cube updated incrementally with the written month.
+    alerts (AlertEngine, optional): Alert rules re-evaluated for the written month.
+    person (str): The person the frame belongs to, for the cube, sketches and alerts.
+
+    Returns:
+    pd.DataFrame: Updated df_tamanho DataFrame with new or modified month data.
+
+    Complexity:
+    Time: O(n), where n is the number of rows in df_tamanho.
+    Space: O(1), modifying the existing DataFrame.
+    """
+    if df_tamanho is None:
+        df_tamanho = empty_frame("df_tamanho")
+
+    if month_year in df_tamanho["Mês/Ano"].values:
+        idx = df_tamanho.index[df_tamanho["Mês/Ano"] == month_year][0]
+        set_value(df_tamanho, idx, "Task P", task_p)
+        set_value(df_tamanho, idx, "Task M", task_m)
+        set_value(df_tamanho, idx, "Task G", task_g)
+    else:
+        new_row = {
+            "Mês/Ano": month_year,
+            "Task P": task_p,
+            "Task M": task_m,
+            "Task G": task_g,
+        }
+        df_tamanho = pd.concat([df_tamanho, pd.DataFrame([new_row])], ignore_index=True)
+
+    df_tamanho = enforce_schema(df_tamanho, "df_tamanho")
+    if cube is not None:
+        cube.update_from_frame(df_tamanho, month_year, person=person)
+    if alerts is not None:
+        alerts.update_from_frame(df_tamanho, month_year, person=person)
+    return df_tamanho
+
+
+def _month_period(month_year: str) -> pd.Period:
+    year, month = parse_month_year(month_year)
+    return pd.Period(year=year, month=month, freq="M")
+
+
+def _with_rows(df, block, dataset):
+    block = block.loc[~block["Mês/Ano"].isin(df["Mês/Ano"].astype(object))]
+    if block.empty:
+        return df, []
+    df = pd.concat([df.astype({"Mês/Ano": object}), block], ignore_index=True)
+    df = enforce_schema(df, dataset)
+    df = df.sort_values("Mês/Ano", kind="stable").reset_index(drop=True)
+    return df, block["Mês/Ano"].tolist()
+
+
+@timed()
+def backfill_months(
+    df_tp, df_tasks, df_tamanho, work_days_dict, start, end, values=None, skip=()
+):
+    """
+    Adds every month of a range that is missing from the datasets, in one pass.
+
+    The months come from `pd.period_range`; each frame only receives the months it
+    does not have yet. The business days and the derived TP columns of the whole
+    block are computed vectorized, the block is appended to each frame with a single
+    concat, and the frames are returned in chronological order.
+
+    Parameters:
+    df_tp (pd.DataFrame): DataFrame containing productivity data per month/year.
+    df_tasks (pd.DataFrame): DataFrame containing task review data per month/year.
+    df_tamanho (pd.DataFrame or None): DataFrame containing task size data per month/year.
+    work_days_dict (dict): Business days per month, updated with the new months.
+    start (str): First month of the range in 'MM/YY' format.
+    end (str): Last month of the range in 'MM/YY' format.
+    values (dict, optional): Values of the new rows by column, overriding
+        BACKFILL_DEFAULTS.
+    skip (iterable): Months in 'MM/YY' format that must not be added, such as the
+        archived ones (see `produtiva.tiering.cold_months`).
+
+    Returns:
+    tuple: (df_tp, df_tasks, df_tamanho, added), where added maps each dataset name
+    to the months added to it.
+
+    Complexity:
+    Time: O((n + m) log(n + m)), for n stored months and m added months.
+    Space: O(n + m), for the new frames.
+    """
+    values = {**BACKFILL_DEFAULTS, **(values or {})}
+    periods = pd.period_range(_month_period(start), _month_period(end), freq="M")
+    periods = periods[~periods.strftime("%m/%y").isin(list(skip))]
+    months = list(periods.strftime("%m/%y"))
+
+    block_tasks = pd.DataFrame(
+        {
+            "Mês/Ano": months,
+            "TP Tasks Revisadas": values["TP Tasks Revisadas"],
+            "TP Adaptado Tasks Revisadas": values["TP Adaptado Tasks Revisadas"],
+        }
+    )
+    df_tasks, added_tasks = _with_rows(df_tasks, block_tasks, "df_tasks")
+
+    if df_tamanho is None:
+        df_tamanho = empty_frame("df_tamanho")
+    block_tamanho = pd.DataFrame(
+        {
+            "Mês/Ano": months,
+            "Task P": values["Task P"],
+            "Task M": values["Task M"],
+            "Task G": values["Task G"],
+        }
+    )
+    df_tamanho, added_tamanho = _with_rows(df_tamanho, block_tamanho, "df_tamanho")
+
+    missing = ~periods.strftime("%m/%y").isin(df_tp["Mês/Ano"].astype(object))
+    periods = periods[missing]
+    dias_uteis = business_days_for_months(periods)
+    tp_adaptado = values["TP Adaptado (22 Dias Úteis)"]
+    tp_ideal = values["TP Ideal (22 Dias Úteis)"]
+    block_tp = pd.DataFrame(
+        {
+            "Mês/Ano": list(periods.strftime("%m/%y")),
+            "TP Adaptado (22 Dias Úteis)": tp_adaptado,
+            "TP Ideal (22 Dias Úteis)": tp_ideal,
+            "Dias Úteis": dias_uteis,
+            "TP Ajustado (Dias Úteis Reais)": tp_adaptado * (22 / dias_uteis),
+            "TP Ideal Ajustado (Dias Úteis Reais)": tp_ideal * (dias_uteis / 22),
+        }
+    )
+    work_days_dict.update(zip(block_tp["Mês/Ano"], dias_uteis.tolist()))
+    df_tp, added_tp = _with_rows(df_tp, block_tp, "df_tp")
+
+    # Frames without the revision columns get them derived for every row at render.
+    if "TP Ajustado (Dias Úteis Reais) + Revisão Task" in df_tp.columns:
+        tp_months = df_tp["Mês/Ano"].astype(object)
+        changed = tp_months.isin(set(added_tp) | set(added_tasks)).to_numpy()
+        revisadas = dict(
+            zip(df_tasks["Mês/Ano"].astype(object), df_tasks["TP Tasks Revisadas"])
+        )
+        revisadas = tp_months[changed].map(revisadas).fillna(0).to_numpy()
+        for base in ("TP Adaptado (22 Dias Úteis)", "TP Ajustado (Dias Úteis Reais)"):
+            column = f"{base} + Revisão Task"
+            updated = df_tp[column].to_numpy(dtype="float64", na_value=np.nan, copy=True)
+            updated[changed] = df_tp[base].to_numpy(dtype="float64")[changed]
+            updated[changed] += revisadas
+            df_tp[column] = updated
+        df_tp = enforce_schema(df_tp, "df_tp")
+
+    added = {"df_tp": added_tp, "df_tasks": added_tasks, "df_tamanho": added_tamanho}
+    return df_tp, df_tasks, df_tamanho, added
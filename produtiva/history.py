@@ -0,0 +1,362 @@
+"""
+Versioned, append-only history of the datasets with point-in-time reads and undo.
+
+Each dataset has a log in `bin/history/<dataset>.jsonl`. A commit is one JSON line
+holding the rows it wrote (month -> values, or null when the row was removed); the
+first commit is a baseline with every row, and later ones only carry the edited rows.
+Commits written by one action across datasets (a backfill, or a task edit and the
+df_tp revision columns it changes) share a group id and are undone together.
+Commits are never rewritten: an undo is a new commit that restores older values.
+
+In memory, every cell (month, column) keeps the list of commit numbers at which it
+changed and the value it took, so unchanged cells are shared by all versions and the
+space grows with the number of edited cells. A point-in-time read bisects each cell's
+list, reconstructing a frame in O(cells * log(edits per cell)) regardless of how many
+commits the history holds.
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+import uuid
+
+import pandas as pd
+
+from produtiva.months import month_ordinal
+from produtiva.paths import BIN_DIR
+from produtiva.schema import MONTH_COLUMN, enforce_schema
+
+ROW_KEY = None
+
+
+def history_path(dataset: str) -> str:
+    return os.path.join(BIN_DIR, "history", f"{dataset}.jsonl")
+
+
+def _plain(value):
+    value = value.item() if hasattr(value, "item") else value
+    return None if isinstance(value, float) and value != value else value
+
+
+class DatasetHistory:
+    """
+    The commits of one dataset, indexed per cell for point-in-time reads.
+    """
+
+    def __init__(self, dataset: str):
+        self.dataset = dataset
+        self._lock = threading.RLock()
+        self._reset(None)
+
+    def _reset(self, inode) -> None:
+        self.commits = []
+        self._times = []
+        self.columns = []
+        self.months = set()
+        self._cells = {}
+        self._offset = 0
+        self._inode = inode
+
+    def refresh(self) -> None:
+        """
+        Reads the commits appended to the log since the last refresh.
+
+        Returns:
+        None
+
+        Complexity:
+        Time: O(1) when the log is unchanged, O(k) for k new bytes otherwise.
+        Space: O(e), for e new cell changes.
+        """
+        path = history_path(self.dataset)
+        with self._lock:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                if self._inode is not None:
+                    self._reset(None)
+                return
+            if stat.st_ino != self._inode:
+                self._reset(stat.st_ino)
+            if stat.st_size == self._offset:
+                return
+            with open(path, "rb") as f:
+                f.seek(self._offset)
+                data = f.read()
+            complete = data[: data.rfind(b"\n") + 1]
+            self._offset += len(complete)
+            for line in complete.splitlines():
+                if line.strip():
+                    self._index(json.loads(line))
+
+    def _index(self, commit: dict) -> None:
+        number = len(self.commits)
+        undoes = commit.get("undoes")
+        self.commits.append(
+            {key: commit.get(key) for key in ("ts", "kind", "origin")}
+            | {
+                "undoes": [undoes] if isinstance(undoes, int) else list(undoes or ()),
+                # Commits from before grouping form a group of their own.
+                "group": commit.get("group") or f"{self.dataset}#{number}",
+                "months": list(commit["rows"]),
+            }
+        )
+        self._times.append(commit["ts"])
+        for month, values in commit["rows"].items():
+            self.months.add(month)
+            self._set(month, ROW_KEY, values is not None, number)
+            for column, value in (values or {}).items():
+                if column not in self.columns:
+                    self.columns.append(column)
+                self._set(month, column, value, number)
+
+    def _set(self, month, column, value, number) -> None:
+        numbers, values = self._cells.setdefault((month, column), ([], []))
+        if values and values[-1] == value:
+            return
+        numbers.append(number)
+        values.append(value)
+
+    def _value_at(self, month, column, number):
+        numbers, values = self._cells.get((month, column), ((), ()))
+        position = bisect.bisect_right(numbers, number)
+        return values[position - 1] if position else None
+
+    def version_at(self, timestamp: float) -> int:
+        """
+        Returns the number of the last commit made at or before a timestamp, or -1.
+        """
+        with self._lock:
+            return bisect.bisect_right(self._times, timestamp) - 1
+
+    def row_at(self, month_year: str, number: int):
+        """
+        Returns the values of a month's row as of a commit, or None if it did not exist.
+        """
+        with self._lock:
+            if not self._value_at(month_year, ROW_KEY, number):
+                return None
+            return {
+                column: self._value_at(month_year, column, number)
+                for column in self.columns
+            }
+
+    def as_of(self, number: int = None) -> pd.DataFrame:
+        """
+        Reconstructs the dataset frame as of a commit.
+
+        Parameters:
+        number (int, optional): Commit number; the latest commit when omitted.
+
+        Returns:
+        pd.DataFrame: The frame, with months in chronological order.
+
+        Complexity:
+        Time: O(m * c * log e), for m months, c columns and e edits per cell.
+        Space: O(m * c), for the frame.
+        """
+        with self._lock:
+            if number is None:
+                number = len(self.commits) - 1
+            months = sorted(
+                (m for m in self.months if self._value_at(m, ROW_KEY, number)),
+                key=month_ordinal,
+            )
+            data = {MONTH_COLUMN: months}
+            for column in self.columns:
+                data[column] = [self._value_at(m, column, number) for m in months]
+        return enforce_schema(pd.DataFrame(data), self.dataset)
+
+    def undoable(self, origin: str = None) -> list:
+        """
+        Returns the numbers of the edits that have not been undone, oldest first.
+
+        Parameters:
+        origin (str, optional): Only consider edits made by this origin.
+        """
+        with self._lock:
+            undone = {n for c in self.commits if c["kind"] == "undo" for n in c["undoes"]}
+            return [
+                number
+                for number, commit in enumerate(self.commits)
+                if commit["kind"] == "edit"
+                and number not in undone
+                and (origin is None or commit["origin"] == origin)
+            ]
+
+    def last_undoable(self, origin: str = None):
+        """
+        Returns the number of the latest edit that has not been undone, or None.
+
+        Parameters:
+        origin (str, optional): Only consider edits made by this origin.
+        """
+        numbers = self.undoable(origin)
+        return numbers[-1] if numbers else None
+
+
+_HISTORIES = {}
+_HISTORIES_LOCK = threading.Lock()
+
+
+def get_history(dataset: str, baseline=None) -> DatasetHistory:
+    """
+    Returns the up-to-date history of a dataset, seeding its log when it is empty.
+
+    Parameters:
+    dataset (str): One of "df_tp", "df_tasks" or "df_tamanho".
+    baseline (pd.DataFrame, optional): Current frame, written as the first commit
+        when the dataset has no history yet.
+
+    Returns:
+    DatasetHistory: The process-wide history of the dataset.
+
+    Complexity:
+    Time: O(k) for k bytes appended to the log since the last call.
+    Space: O(e), for the indexed cell changes.
+    """
+    with _HISTORIES_LOCK:
+        history = _HISTORIES.setdefault(dataset, DatasetHistory(dataset))
+    history.refresh()
+    if not history.commits and baseline is not None:
+        _append(dataset, {"kind": "baseline", "rows": _frame_rows(baseline)})
+        history.refresh()
+    return history
+
+
+def _frame_rows(df: pd.DataFrame) -> dict:
+    columns = [column for column in df.columns if column != MONTH_COLUMN]
+    return {
+        month: {column: _plain(value) for column, value in zip(columns, values)}
+        for month, *values in df[[MONTH_COLUMN, *columns]].itertuples(
+            index=False, name=None
+        )
+    }
+
+
+def _append(dataset: str, commit: dict) -> None:
+    commit = {"ts": time.time(), **commit}
+    path = history_path(dataset)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    line = (json.dumps(commit, ensure_ascii=False) + "\n").encode()
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+
+def new_group() -> str:
+    """
+    Returns a fresh id for commits that are undone together.
+    """
+    return uuid.uuid4().hex
+
+
+def commit_rows(
+    dataset: str, rows: dict, origin: str, group: str = None, kind: str = "edit"
+) -> None:
+    """
+    Appends a commit of several months' rows to the history of a dataset.
+
+    Parameters:
+    dataset (str): One of "df_tp", "df_tasks" or "df_tamanho".
+    rows (dict): Month in 'MM/YY' format -> new values of the row, by column.
+    origin (str): Identifies the editing session, for per-session undo.
+    group (str, optional): Id shared with the commits of the same action in other
+        datasets (see `new_group`); a group of its own when omitted.
+    kind (str): "edit", or "undo" for rows derived from an undo.
+
+    Returns:
+    None
+
+    Complexity:
+    Time: O(r * c), for r rows of c values.
+    Space: O(r * c) on disk, and O(changed cells) in memory.
+    """
+    commit = {
+        "kind": kind,
+        "origin": origin,
+        "group": group,
+        "rows": {
+            month: {k: _plain(v) for k, v in values.items()}
+            for month, values in rows.items()
+        },
+    }
+    if kind == "undo":
+        commit["undoes"] = []
+    _append(dataset, commit)
+
+
+def commit_row(dataset: str, month_year: str, values: dict, origin: str) -> None:
+    """
+    Appends an edit of one month's row to the history of a dataset; see `commit_rows`.
+    """
+    commit_rows(dataset, {month_year: values}, origin)
+
+
+def undo(datasets, origin: str = None):
+    """
+    Reverts the latest edit across some datasets, with every edit of its group.
+
+    Each month written by the group is restored to its values before the group's
+    first commit touching it, or removed when the group created it. The undo is
+    itself recorded as one commit per dataset, sharing a new group id.
+
+    Parameters:
+    datasets (iterable): Dataset names, e.g. "df_tp", "df_tasks" and "df_tamanho".
+    origin (str, optional): Only undo edits made by this origin.
+
+    Returns:
+    tuple or None: (group, rows), the id of the undo commits and a list of
+    (dataset, month, values) for the restored rows, with values None when a row was
+    removed; None when there is nothing to undo.
+
+    Complexity:
+    Time: O(h + r * c * log e), for h commits, r restored rows and c columns.
+    Space: O(r * c), for the restored rows.
+    """
+    histories = {dataset: get_history(dataset) for dataset in datasets}
+    latest = None
+    for dataset_history in histories.values():
+        number = dataset_history.last_undoable(origin)
+        if number is not None:
+            commit = dataset_history.commits[number]
+            if latest is None or commit["ts"] > latest["ts"]:
+                latest = commit
+    if latest is None:
+        return None
+
+    group = new_group()
+    restored = []
+    for dataset, dataset_history in histories.items():
+        numbers = [
+            number
+            for number in dataset_history.undoable(origin)
+            if dataset_history.commits[number]["group"] == latest["group"]
+        ]
+        if not numbers:
+            continue
+        first = {}
+        for number in numbers:
+            for month_year in dataset_history.commits[number]["months"]:
+                first.setdefault(month_year, number)
+        rows = {
+            month_year: dataset_history.row_at(month_year, number - 1)
+            for month_year, number in first.items()
+        }
+        _append(
+            dataset,
+            {
+                "kind": "undo",
+                "origin": origin,
+                "undoes": numbers,
+                "group": group,
+                "rows": rows,
+            },
+        )
+        dataset_history.refresh()
+        restored.extend((dataset, month, values) for month, values in rows.items())
+    return group, restored
@@ -0,0 +1,141 @@
+"""
+Vectorized integrity checks of the loaded datasets.
+
+The checks run once when the datasets are loaded, in O(n) over integer month
+ordinals, so the render path can rely on their invariants instead of re-deriving
+columns defensively: one row per month, in chronological order and without gaps, task
+frames aligned row by row with df_tp (possibly missing its latest months, which are
+entered in df_tp first), and no negative counts or invalid business days.
+"""
+
+import numpy as np
+import pandas as pd
+
+from produtiva.months import month_ordinal, ordinal_to_month
+from produtiva.schema import MONTH_COLUMN, SCHEMAS
+
+MAX_LISTED_MONTHS = 12
+
+
+def month_ordinals(months: pd.Series) -> np.ndarray:
+    """
+    Returns the month ordinals of a month column.
+
+    Categorical columns are converted through their categories, in O(n + m) for m
+    distinct months; other columns month by month.
+
+    Parameters:
+    months (pd.Series): A month column in 'MM/YY' format.
+
+    Returns:
+    np.ndarray: The ordinal of each row's month.
+    """
+    if isinstance(months.dtype, pd.CategoricalDtype):
+        categories = np.fromiter(
+            (month_ordinal(m) for m in months.cat.categories),
+            dtype=np.int64,
+            count=len(months.cat.categories),
+        )
+        return categories[months.cat.codes.to_numpy()]
+    return np.fromiter(
+        (month_ordinal(m) for m in months), dtype=np.int64, count=len(months)
+    )
+
+
+def _months(ordinals) -> list:
+    return [ordinal_to_month(int(o)) for o in ordinals[:MAX_LISTED_MONTHS]]
+
+
+def check_integrity(frames: dict) -> list:
+    """
+    Checks the loaded datasets and returns the problems found.
+
+    Parameters:
+    frames (dict): Dataset name ("df_tp", "df_tasks", "df_tamanho") -> frame.
+
+    Returns:
+    list: One dict per problem with "dataset", "check" (duplicate_months,
+    unsorted_months, month_gaps, misaligned, negative_counts or invalid_work_days)
+    and "months" or "columns" detailing it. Empty when everything is consistent.
+
+    Complexity:
+    Time: O(n), for n rows across the frames.
+    Space: O(n), for the ordinal arrays.
+    """
+    issues = []
+    ordinals = {}
+    for name, df in frames.items():
+        if df is None or name not in SCHEMAS:
+            continue
+        values = month_ordinals(df[MONTH_COLUMN])
+        ordinals[name] = values
+        if not len(values):
+            continue
+
+        steps = np.diff(values)
+        if (steps < 0).any():
+            issues.append({"dataset": name, "check": "unsorted_months", "months": []})
+        unique = np.unique(values)
+        if len(unique) < len(values):
+            counts = np.bincount(np.searchsorted(unique, values))
+            issues.append(
+                {
+                    "dataset": name,
+                    "check": "duplicate_months",
+                    "months": _months(unique[counts > 1]),
+                }
+            )
+        gaps = np.flatnonzero(np.diff(unique) > 1)
+        if len(gaps):
+            missing = np.concatenate(
+                [np.arange(unique[i] + 1, unique[i + 1]) for i in gaps]
+            )
+            issues.append(
+                {"dataset": name, "check": "month_gaps", "months": _months(missing)}
+            )
+
+        negative = [
+            column
+            for column, dtype in SCHEMAS[name].items()
+            if column in df.columns
+            and np.dtype(dtype).kind == "i"
+            and (df[column].to_numpy() < 0).any()
+        ]
+        if negative:
+            issues.append(
+                {"dataset": name, "check": "negative_counts", "columns": negative}
+            )
+        if "Dias Úteis" in df.columns:
+            days = df["Dias Úteis"].to_numpy()
+            invalid = ~((days >= 1) & (days <= 31))
+            if invalid.any():
+                issues.append(
+                    {
+                        "dataset": name,
+                        "check": "invalid_work_days",
+                        "months": _months(values[invalid]),
+                    }
+                )
+
+    reference = ordinals.get("df_tp")
+    if reference is not None:
+        for name in ("df_tasks", "df_tamanho"):
+            values = ordinals.get(name)
+            if values is None:
+                continue
+            # Task frames may trail df_tp: its newest months are entered first.
+            prefix = len(values) <= len(reference) and np.array_equal(
+                values, reference[: len(values)]
+            )
+            same_index = frames[name].index.equals(
+                frames["df_tp"].index[: len(values)]
+            )
+            if not (prefix and same_index):
+                issues.append(
+                    {
+                        "dataset": name,
+                        "check": "misaligned",
+                        "months": _months(np.setxor1d(values, reference)),
+                    }
+                )
+    return issues
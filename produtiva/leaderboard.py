@@ -0,0 +1,150 @@
+"""
+Top-k rankings of people over the metric cube.
+
+`period_scores` rolls one metric of every person up to months, quarters or years in a
+single reshape of the cube's month axis, which starts in January, so quarter and year
+boundaries are plain multiples of 3 and 12. Rates ("TP Ajustado", "TP Ideal") are
+averaged over the period's months and counts are summed.
+
+`leaderboard` ranks a period's scores, or their change against the previous period,
+with `top_k`: `np.argpartition` selects the k best in O(p) and only those k are
+sorted, instead of sorting all p people.
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from produtiva.schema import PERSON_COLUMN
+
+PERIODS = {"month": 1, "quarter": 3, "year": 12}
+RANKINGS = ("value", "improvement")
+LEADERBOARD_METRICS = (
+    "TP Ajustado (Dias Úteis Reais)",
+    "TP Adaptado (22 Dias Úteis)",
+    "TP Tasks Revisadas",
+    "TP Adaptado Tasks Revisadas",
+    "Task P",
+    "Task M",
+    "Task G",
+)
+RATE_METRICS = ("TP Ideal (22 Dias Úteis)", "TP Ajustado (Dias Úteis Reais)")
+DEFAULT_TOP = 10
+
+
+def period_scores(cube, metric: str, period: str = "quarter") -> dict:
+    """
+    Rolls one metric of every person up to a period.
+
+    Parameters:
+    cube (MetricCube): The month × metric × person cube.
+    metric (str): One of CUBE_METRICS.
+    period (str): "month", "quarter" or "year".
+
+    Returns:
+    dict: "labels" (one per period, in order), "persons" and "scores", an array of
+    shape (periods, persons); NaN where a person has no month in the period. The last
+    period may still be in progress.
+
+    Complexity:
+    Time: O(n * p), for n months and p persons.
+    Space: O(n * p), for the padded copy.
+    """
+    months = PERIODS[period]
+    values = cube.metric_across_people(metric)
+    n_periods = -(-len(values) // months)
+    padded = np.full((n_periods * months, values.shape[1]), np.nan)
+    padded[: len(values)] = values
+    padded = padded.reshape(n_periods, months, values.shape[1])
+    with warnings.catch_warnings():
+        # Periods where a person has no data are expected.
+        warnings.simplefilter("ignore", RuntimeWarning)
+        if metric in RATE_METRICS:
+            scores = np.nanmean(padded, axis=1)
+        else:
+            scores = np.where(
+                np.isnan(padded).all(axis=1), np.nan, np.nansum(padded, axis=1)
+            )
+    labels = {
+        "month": cube.months,
+        "quarter": cube.quarters,
+        "year": [str(year) for year in cube.years],
+    }[period]
+    return {"labels": list(labels), "persons": list(cube.persons), "scores": scores}
+
+
+def top_k(scores: np.ndarray, k: int = DEFAULT_TOP, largest: bool = True) -> np.ndarray:
+    """
+    Returns the indices of the k best scores, best first.
+
+    NaN scores are never selected. Equal scores are ordered by index, except that
+    which of several people tied at the k-th place make the cut is arbitrary.
+
+    Parameters:
+    scores (np.ndarray): One score per person.
+    k (int): Number of people to return.
+    largest (bool): Rank the largest scores first; the smallest when False.
+
+    Returns:
+    np.ndarray: Up to k indices into `scores`.
+
+    Complexity:
+    Time: O(p + k log k), partial selection of p scores plus sorting the k selected.
+    Space: O(p), for the keys.
+    """
+    valid = np.flatnonzero(~np.isnan(scores))
+    keys = -scores[valid] if largest else scores[valid]
+    if k < len(valid):
+        selected = np.argpartition(keys, k - 1)[:k]
+    else:
+        selected = np.arange(len(valid))
+    return valid[selected[np.lexsort((valid[selected], keys[selected]))]]
+
+
+def leaderboard(
+    scores: dict, k: int = DEFAULT_TOP, by: str = "value", period_index: int = -1
+) -> pd.DataFrame:
+    """
+    Ranks the people of one period.
+
+    Parameters:
+    scores (dict): Output of `period_scores`.
+    k (int): Number of people to list.
+    by (str): "value" ranks the period's scores; "improvement" ranks the change
+        against the previous period, for people with data in both.
+    period_index (int): Period to rank, the latest by default.
+
+    Returns:
+    pd.DataFrame: Columns "Posição", PERSON_COLUMN, "Valor", "Anterior" and "Variação",
+    best first; `attrs["period"]` and `attrs["previous"]` hold the period labels.
+
+    Complexity:
+    Time: O(p + k log k), see `top_k`.
+    Space: O(p), for the change of every person.
+    """
+    labels = scores["labels"]
+    columns = ["Posição", PERSON_COLUMN, "Valor", "Anterior", "Variação"]
+    if not labels:
+        return pd.DataFrame(columns=columns)
+    index = period_index % len(labels)
+    current = scores["scores"][index]
+    if index:
+        previous = scores["scores"][index - 1]
+    else:
+        previous = np.full(current.shape, np.nan)
+    change = current - previous
+    ranked = top_k(change if by == "improvement" else current, k)
+    board = pd.DataFrame(
+        {
+            "Posição": np.arange(1, len(ranked) + 1),
+            PERSON_COLUMN: [scores["persons"][i] for i in ranked],
+            "Valor": current[ranked],
+            "Anterior": previous[ranked],
+            "Variação": change[ranked],
+        },
+        columns=columns,
+    )
+    board.attrs["period"] = labels[index]
+    board.attrs["previous"] = labels[index - 1] if index else None
+    return board
@@ -0,0 +1,311 @@
+"""
+Memory accounting and budgeted storage of per-session derived artifacts.
+
+Derived artifacts (the metric cube, cached figure fragments and similar caches) are
+kept in a process-wide ArtifactStore keyed by session, instead of in each session's
+state. The store knows the deep size of every artifact, keeps them in LRU order and,
+when the configured budget is exceeded or a session goes idle, drops the least
+recently used ones. Evicted artifacts are rebuilt on demand by the builder passed to
+`get`, from the session's frames or the persisted datasets.
+
+Environment:
+    PRODUTIVA_MEMORY_BUDGET_MB        budget for all derived artifacts (default 256)
+    PRODUTIVA_SESSION_IDLE_SECONDS    idle time before a session's artifacts are
+                                      dropped (default 900)
+    PRODUTIVA_FRAGMENT_CACHE_SIZE     entries kept by each session's figure fragment
+                                      cache (default 240)
+"""
+
+import os
+import sys
+import threading
+import time
+import types
+from collections import OrderedDict, deque
+
+import numpy as np
+import pandas as pd
+
+MEMORY_BUDGET_BYTES = int(
+    float(os.environ.get("PRODUTIVA_MEMORY_BUDGET_MB", "256")) * 2**20
+)
+SESSION_IDLE_SECONDS = float(os.environ.get("PRODUTIVA_SESSION_IDLE_SECONDS", "900"))
+FRAGMENT_CACHE_SIZE = int(os.environ.get("PRODUTIVA_FRAGMENT_CACHE_SIZE", "240"))
+
+_OPAQUE_TYPES = (
+    type,
+    types.ModuleType,
+    types.FunctionType,
+    types.BuiltinFunctionType,
+    types.MethodType,
+)
+
+
+def deep_sizeof(obj, _seen=None) -> int:
+    """
+    Estimates the memory held by an object and everything it references.
+
+    DataFrames and Series use pandas' deep memory usage, arrays their buffer size and
+    Plotly objects the size of their JSON representation; containers and plain objects
+    are traversed recursively, counting shared objects once.
+
+    Parameters:
+    obj (object): The object to measure.
+
+    Returns:
+    int: The estimated size in bytes.
+
+    Complexity:
+    Time: O(n), where n is the number of objects reachable from `obj`.
+    Space: O(n), for the set of visited objects.
+    """
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen or isinstance(obj, _OPAQUE_TYPES):
+        return 0
+    _seen.add(id(obj))
+
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True, index=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(deep=True, index=True))
+    if isinstance(obj, np.ndarray):
+        return sys.getsizeof(obj)
+    if hasattr(obj, "to_plotly_json"):
+        return deep_sizeof(obj.to_plotly_json(), _seen)
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(
+            deep_sizeof(k, _seen) + deep_sizeof(v, _seen) for k, v in obj.items()
+        )
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        size += sum(deep_sizeof(item, _seen) for item in obj)
+    elif hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), _seen)
+    return size
+
+
+class LRUCache(OrderedDict):
+    """
+    Dict bounded to `maxsize` entries that drops the least recently used one when full.
+
+    Reads through `get` and `[]` mark an entry as recently used, so a cache shared by
+    overlapping month windows keeps the months still on screen.
+    """
+
+    def __init__(self, maxsize: int = FRAGMENT_CACHE_SIZE):
+        super().__init__()
+        self.maxsize = maxsize
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self.maxsize:
+            self.popitem(last=False)
+
+
+class ArtifactStore:
+    """
+    Process-wide LRU store of derived artifacts, bounded by a memory budget.
+
+    Entries are keyed by (session_id, key). The store also keeps the last reported
+    per-key sizes of each session's own state, so `report` can show where memory goes
+    per session, per key and for the whole process.
+    """
+
+    def __init__(
+        self,
+        budget_bytes: int = MEMORY_BUDGET_BYTES,
+        idle_seconds: float = SESSION_IDLE_SECONDS,
+        clock=time.monotonic,
+    ):
+        self.budget_bytes = budget_bytes
+        self.idle_seconds = idle_seconds
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._entries = OrderedDict()
+        self._last_seen = {}
+        self._state_sizes = {}
+        self.evictions = 0
+
+    def get(self, session_id: str, key: str, builder):
+        """
+        Returns an artifact of a session, building and storing it when missing.
+
+        Parameters:
+        session_id (str): The owning session.
+        key (str): The artifact name.
+        builder (callable): Zero-argument function that rebuilds the artifact.
+
+        Returns:
+        object: The stored or freshly built artifact.
+
+        Complexity:
+        Time: O(1) on a hit; the builder's cost plus O(size) to measure it on a miss.
+        Space: O(size), for the stored artifact.
+        """
+        with self._lock:
+            self._last_seen[session_id] = self._clock()
+            entry = self._entries.get((session_id, key))
+            if entry is not None:
+                self._entries.move_to_end((session_id, key))
+                return entry[0]
+
+        value = builder()
+        with self._lock:
+            self._entries[(session_id, key)] = [value, deep_sizeof(value)]
+            self.enforce(protect=session_id)
+        return value
+
+    def refresh(self, session_id: str) -> None:
+        """
+        Re-measures the artifacts of a session, which may have grown in place.
+
+        Parameters:
+        session_id (str): The session whose artifacts are measured.
+
+        Returns:
+        None
+
+        Complexity:
+        Time: O(size) of the session's artifacts.
+        Space: O(1), aside from the traversal bookkeeping.
+        """
+        with self._lock:
+            self._last_seen[session_id] = self._clock()
+            for (owner, _), entry in self._entries.items():
+                if owner == session_id:
+                    entry[1] = deep_sizeof(entry[0])
+            self.enforce(protect=session_id)
+
+    def record_state(self, session_id: str, state) -> None:
+        """
+        Stores the per-key deep sizes of a session's own state for reporting.
+
+        Parameters:
+        session_id (str): The session being measured.
+        state (Mapping): The session's state, e.g. Streamlit's session state.
+
+        Returns:
+        None
+
+        Complexity:
+        Time: O(size) of the session state.
+        Space: O(k), for k keys.
+        """
+        sizes = {key: deep_sizeof(state[key]) for key in list(state.keys())}
+        with self._lock:
+            self._last_seen[session_id] = self._clock()
+            self._state_sizes[session_id] = sizes
+
+    def evict(self, session_id: str, key: str = None) -> None:
+        """
+        Drops one artifact of a session, or all of them when `key` is None.
+        """
+        with self._lock:
+            for entry_key in list(self._entries):
+                if entry_key[0] == session_id and key in (None, entry_key[1]):
+                    del self._entries[entry_key]
+                    self.evictions += 1
+
+    def enforce(self, protect: str = None) -> None:
+        """
+        Drops artifacts of idle sessions, then least recently used ones over budget.
+
+        Artifacts of the `protect` session are only evicted when nothing else is left.
+
+        Parameters:
+        protect (str, optional): Session currently rendering.
+
+        Returns:
+        None
+
+        Complexity:
+        Time: O(e), for e stored artifacts.
+        Space: O(1), constant space usage.
+        """
+        with self._lock:
+            now = self._clock()
+            for session_id, last_seen in list(self._last_seen.items()):
+                if now - last_seen > self.idle_seconds and session_id != protect:
+                    self.evict(session_id)
+                    del self._last_seen[session_id]
+                    self._state_sizes.pop(session_id, None)
+
+            total = self.artifact_bytes()
+            for entry_key in [k for k in self._entries if k[0] != protect] + [
+                k for k in self._entries if k[0] == protect
+            ]:
+                if total <= self.budget_bytes:
+                    break
+                total -= self._entries.pop(entry_key)[1]
+                self.evictions += 1
+
+    def artifact_bytes(self) -> int:
+        """
+        Returns the total measured size of all stored artifacts.
+        """
+        with self._lock:
+            return sum(size for _, size in self._entries.values())
+
+    def report(self) -> dict:
+        """
+        Reports memory per session and key, and the aggregate for the process.
+
+        Returns:
+        dict: Budget, totals, eviction count and one entry per known session with its
+        idle time, state sizes per key and artifact sizes per key.
+
+        Complexity:
+        Time: O(s * k), for s sessions with k keys each.
+        Space: O(s * k), for the report.
+        """
+        with self._lock:
+            now = self._clock()
+            sessions = {}
+            for session_id, last_seen in self._last_seen.items():
+                sessions[session_id] = {
+                    "idle_seconds": round(now - last_seen, 1),
+                    "state": dict(self._state_sizes.get(session_id, {})),
+                    "artifacts": {},
+                }
+            for (session_id, key), (_, size) in self._entries.items():
+                sessions.setdefault(
+                    session_id, {"idle_seconds": None, "state": {}, "artifacts": {}}
+                )["artifacts"][key] = size
+            for usage in sessions.values():
+                usage["total_bytes"] = sum(usage["state"].values()) + sum(
+                    usage["artifacts"].values()
+                )
+            return {
+                "budget_bytes": self.budget_bytes,
+                "artifact_bytes": self.artifact_bytes(),
+                "state_bytes": sum(sum(s.values()) for s in self._state_sizes.values()),
+                "evictions": self.evictions,
+                "process_peak_rss_bytes": process_peak_rss(),
+                "sessions": sessions,
+            }
+
+
+def process_peak_rss() -> int:
+    """
+    Returns the peak resident set size of the process in bytes, or 0 if unavailable.
+    """
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+ARTIFACTS = ArtifactStore()
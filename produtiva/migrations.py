@@ -0,0 +1,118 @@
+"""
+Versioned migrations of the persisted dataset frames.
+
+Every saved frame records the schema version it was written with (in its snapshot
+header, or `DataFrame.attrs` for pickles; frames from before versioning count as
+version 0). At load, the migrations registered for each version between the frame's
+and SCHEMA_VERSION run in order, and the migrated frames are persisted back, so each
+migration runs once per dataset instead of being patched up on every render.
+
+Versions:
+    1  df_tp carries the "+ Revisão Task" columns.
+    2  compact column types and months in chronological order, one row per month.
+"""
+
+import numpy as np
+
+from produtiva.months import month_ordinal
+from produtiva.schema import MONTH_COLUMN, SCHEMA_VERSION, enforce_schema
+
+MIGRATIONS = {}
+
+
+def migration(dataset: str, version: int):
+    """
+    Registers a function migrating a dataset frame to `version`.
+
+    The function receives the frame and every loaded frame (for migrations that need
+    other datasets) and returns the migrated frame. A dataset of "*" applies to all.
+
+    Parameters:
+    dataset (str): One of "df_tp", "df_tasks", "df_tamanho", or "*".
+    version (int): The schema version the migration produces.
+    """
+
+    def register(func):
+        MIGRATIONS.setdefault(version, []).append((dataset, func))
+        return func
+
+    return register
+
+
+def frame_version(df) -> int:
+    """
+    Returns the schema version a frame was written with, 0 when it is unknown.
+    """
+    return int(df.attrs.get("schema_version", 0))
+
+
+@migration("df_tp", 1)
+def add_revisao_columns(df_tp, frames):
+    df_tasks = frames.get("df_tasks")
+    if df_tasks is None:
+        revisadas = np.zeros(len(df_tp))
+    else:
+        by_month = dict(
+            zip(
+                df_tasks[MONTH_COLUMN].astype(object),
+                df_tasks["TP Tasks Revisadas"],
+            )
+        )
+        revisadas = (
+            df_tp[MONTH_COLUMN].astype(object).map(by_month).fillna(0).to_numpy()
+        )
+    if "TP Adaptado (22 Dias Úteis) + Revisão Task" not in df_tp.columns:
+        df_tp["TP Adaptado (22 Dias Úteis) + Revisão Task"] = (
+            df_tp["TP Adaptado (22 Dias Úteis)"].to_numpy() + revisadas
+        )
+    if "TP Ajustado (Dias Úteis Reais) + Revisão Task" not in df_tp.columns:
+        df_tp["TP Ajustado (Dias Úteis Reais) + Revisão Task"] = (
+            df_tp["TP Ajustado (Dias Úteis Reais)"].to_numpy() + revisadas
+        )
+    return df_tp
+
+
+@migration("*", 2)
+def compact_and_sort(df, frames):
+    df = enforce_schema(df, df.attrs["dataset"])
+    ordinals = np.fromiter(
+        (month_ordinal(m) for m in df[MONTH_COLUMN].astype(object)),
+        dtype=np.int64,
+        count=len(df),
+    )
+    order = np.argsort(ordinals, kind="stable")
+    keep = np.ones(len(df), dtype=bool)
+    sorted_ordinals = ordinals[order]
+    # For repeated months, the last written row wins, as in the upserts.
+    keep[:-1] = sorted_ordinals[:-1] != sorted_ordinals[1:]
+    return df.iloc[order[keep]].reset_index(drop=True)
+
+
+def migrate(frames: dict) -> list:
+    """
+    Migrates the loaded frames to SCHEMA_VERSION, in place.
+
+    Parameters:
+    frames (dict): Dataset name -> frame, as loaded; None values are skipped.
+
+    Returns:
+    list: Names of the datasets that were migrated and should be persisted back.
+
+    Complexity:
+    Time: O(n log n) for a migrated frame of n rows (sorting), O(1) otherwise.
+    Space: O(n), for the migrated copies.
+    """
+    migrated = []
+    for name, df in frames.items():
+        if df is None or frame_version(df) >= SCHEMA_VERSION:
+            continue
+        for version in range(frame_version(df) + 1, SCHEMA_VERSION + 1):
+            for dataset, func in MIGRATIONS.get(version, []):
+                if dataset in ("*", name):
+                    df.attrs["dataset"] = name
+                    df = func(df, frames)
+        df.attrs.pop("dataset", None)
+        df.attrs["schema_version"] = SCHEMA_VERSION
+        frames[name] = df
+        migrated.append(name)
+    return migrated
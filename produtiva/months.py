@@ -0,0 +1,116 @@
+import datetime
+
+
+def parse_month_year(str_mm_yy: str) -> tuple[int, int]:
+    """
+    Converts a date string in 'MM/YY' format to a tuple of integers (year, month).
+
+    Parameters:
+    str_mm_yy (str): A string representing month and year in 'MM/YY' format.
+
+    Returns:
+    tuple[int, int]: A tuple containing the year (YYYY) and month (MM).
+
+    Complexity:
+    Time: O(1), constant time operations.
+    Space: O(1), constant space usage.
+    """
+    mm, yy = str_mm_yy.split("/")
+    return (2000 + int(yy), int(mm))
+
+
+def format_month_year(year: int, month: int) -> str:
+    """
+    Converts a year and month tuple to a date string in 'MM/YY' format.
+
+    Parameters:
+    year (int): The year in YYYY format.
+    month (int): The month as an integer (1-12).
+
+    Returns:
+    str: A string representing the month and year in 'MM/YY' format.
+
+    Complexity:
+    Time: O(1), constant time operations.
+    Space: O(1), constant space usage.
+    """
+    return f"{month:02d}/{str(year)[-2:]}"
+
+
+def next_month(str_mm_yy: str) -> str:
+    """
+    Given a date string in 'MM/YY' format, returns the next month in the same format.
+
+    Parameters:
+    str_mm_yy (str): A string representing month and year in 'MM/YY' format.
+
+    Returns:
+    str: The next month/year in 'MM/YY' format.
+
+    Complexity:
+    Time: O(1), constant time operations.
+    Space: O(1), constant space usage.
+    """
+    year, month = parse_month_year(str_mm_yy)
+    month += 1
+    if month > 12:
+        month = 1
+        year += 1
+    return format_month_year(year, month)
+
+
+def month_ordinal(str_mm_yy: str) -> int:
+    """
+    Converts a date string in 'MM/YY' format to a sortable integer month key.
+
+    Parameters:
+    str_mm_yy (str): A string representing month and year in 'MM/YY' format.
+
+    Returns:
+    int: The number of months since year 0 (year * 12 + month - 1).
+
+    Complexity:
+    Time: O(1), constant time operations.
+    Space: O(1), constant space usage.
+    """
+    year, month = parse_month_year(str_mm_yy)
+    return year * 12 + month - 1
+
+
+def ordinal_to_month(ordinal: int) -> str:
+    """
+    Converts an integer month key back to a date string in 'MM/YY' format.
+
+    Parameters:
+    ordinal (int): The number of months since year 0.
+
+    Returns:
+    str: A string representing the month and year in 'MM/YY' format.
+
+    Complexity:
+    Time: O(1), constant time operations.
+    Space: O(1), constant space usage.
+    """
+    year, month0 = divmod(int(ordinal), 12)
+    return format_month_year(year, month0 + 1)
+
+
+def last_month_in_df(df_tp):
+    """
+    Returns the most recent month/year present in df_tp, assuming it's sorted in ascending order.
+    If empty, returns the current month/year in MM/YY format.
+
+    Parameters:
+    df_tp (DataFrame): A pandas DataFrame containing a column "Mês/Ano".
+
+    Returns:
+    str: The most recent month/year in MM/YY format.
+
+    Complexity:
+    Time: O(n), a single pass over the unique months.
+    Space: O(n), storing unique values.
+    """
+    if df_tp.empty:
+        return datetime.datetime.now().strftime("%m/%y")
+
+    return max(df_tp["Mês/Ano"].unique(), key=month_ordinal)
@@ -0,0 +1,26 @@
+import json
+import os
+from functools import lru_cache
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(PACKAGE_DIR)
+DATA_DIR = os.path.join(PACKAGE_DIR, "data")
+BIN_DIR = os.environ.get("PRODUTIVA_BIN_DIR", os.path.join(PROJECT_DIR, "bin"))
+
+
+@lru_cache(maxsize=None)
+def load_json_config(file_name):
+    """
+    Load configuration data from a JSON file located in the package 'data' directory.
+
+    The file is read on first use and cached, so importing the package never touches disk.
+
+    Parameters:
+    file_name (str): The name of the JSON file to load.
+
+    Returns:
+    dict: A dictionary containing the loaded data.
+    """
+    data_path = os.path.join(DATA_DIR, file_name)
+    with open(data_path, "r", encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,183 @@
+"""
+Write-behind persistence of datasets on a background thread.
+
+`WriteBehindPersister.submit` snapshots a dataset and returns at once; a worker thread
+writes it to the 'bin' directory. Saves of a file that is still waiting are coalesced,
+so only its newest version is written. The queue of waiting files is bounded, and
+submitting blocks when it is full, which keeps memory bounded when the disk cannot
+keep up. Pending writes are flushed when the interpreter exits.
+
+Each submission returns a WriteTicket, which is acknowledged once that version, or a
+newer one of the same file, is durably on disk (written, fsynced and atomically moved
+into place).
+
+Environment:
+    PRODUTIVA_PERSIST_MODE        "background" (default) or "inline"
+    PRODUTIVA_PERSIST_QUEUE_SIZE  maximum number of files waiting to be written
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+
+from produtiva.storage import save_to_binary
+
+PERSIST_MODE = os.environ.get("PRODUTIVA_PERSIST_MODE", "background")
+QUEUE_SIZE = int(os.environ.get("PRODUTIVA_PERSIST_QUEUE_SIZE", "16"))
+
+
+class WriteTicket:
+    """
+    Durability acknowledgement of one submitted save.
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.error = None
+        self._done = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Waits until the save is on disk or failed.
+
+        Parameters:
+        timeout (float, optional): Maximum seconds to wait; forever when omitted.
+
+        Returns:
+        bool: True if the save was written, False on timeout or failure.
+        """
+        return self._done.wait(timeout) and self.error is None
+
+    def _resolve(self, error: Exception = None) -> None:
+        self.error = error
+        self._done.set()
+
+
+def snapshot(data: object) -> object:
+    """
+    Copies data that the caller may keep mutating while it waits to be written.
+
+    DataFrames and dicts are copied; anything else is assumed immutable.
+
+    Parameters:
+    data (object): The data being saved.
+
+    Returns:
+    object: An independent copy of the data.
+
+    Complexity:
+    Time: O(n), where n is the size of the data.
+    Space: O(n), for the copy.
+    """
+    if hasattr(data, "copy"):
+        return data.copy()
+    return data
+
+
+class WriteBehindPersister:
+    """
+    Background writer of dataset files with coalescing and a bounded queue.
+    """
+
+    def __init__(self, writer=save_to_binary, max_pending: int = QUEUE_SIZE):
+        self.writer = writer
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._pending = {}
+        self._in_flight = []
+        self._lock = threading.Lock()
+        self._thread = None
+        self.written = 0
+        self.coalesced = 0
+
+    def submit(self, filename: str, data: object) -> WriteTicket:
+        """
+        Schedules a save of `data` to `filename`, coalescing with a waiting save.
+
+        Parameters:
+        filename (str): The file name inside the 'bin' directory.
+        data (object): The data to save; it is copied, so the caller may mutate it.
+
+        Returns:
+        WriteTicket: Acknowledged once this version or a newer one is on disk.
+
+        Complexity:
+        Time: O(n) for the snapshot, where n is the size of the data; blocks while the
+        queue is full.
+        Space: O(n), for the snapshot.
+        """
+        ticket = WriteTicket(filename)
+        data = snapshot(data)
+        with self._lock:
+            self._ensure_worker()
+            waiting = self._pending.get(filename)
+            if waiting is not None:
+                waiting[0] = data
+                waiting[1].append(ticket)
+                self.coalesced += 1
+                return ticket
+            self._pending[filename] = [data, [ticket]]
+        self._queue.put(filename)
+        return ticket
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Waits until every submitted save has been written, including the one being
+        written when it is called.
+
+        Parameters:
+        timeout (float, optional): Maximum total seconds to wait; forever when omitted.
+
+        Returns:
+        bool: True if nothing is left to write.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            tickets = list(self._in_flight)
+            tickets += [t for _, waiting in self._pending.values() for t in waiting]
+        for ticket in tickets:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not ticket._done.wait(remaining):
+                return False
+        return True
+
+    def pending(self) -> list:
+        """
+        Returns the names of the files waiting to be written.
+        """
+        with self._lock:
+            return list(self._pending)
+
+    def _ensure_worker(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name="produtiva-persister", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            filename = self._queue.get()
+            with self._lock:
+                data, tickets = self._pending.pop(filename)
+                self._in_flight = tickets
+            error = None
+            try:
+                self.writer(filename, data, durable=True)
+                self.written += 1
+            except Exception as exc:
+                error = exc
+            with self._lock:
+                self._in_flight = []
+            for ticket in tickets:
+                ticket._resolve(error)
+            self._queue.task_done()
+
+
+PERSISTER = WriteBehindPersister()
+atexit.register(PERSISTER.flush)
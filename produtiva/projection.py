@@ -0,0 +1,126 @@
+"""
+Monte Carlo projection of the yearly TP against the adjusted ideal.
+
+The yearly target is the sum of "TP Ideal Ajustado (Dias Úteis Reais)" over the months
+of the year that are entered or still ahead (months before tracking started do not
+count): entered months keep their stored value, and the months after the latest one
+use the latest "TP Ideal (22 Dias Úteis)" scaled by their business days. The months
+left are projected by resampling the historical pace per business day (TP Adaptado /
+Dias Úteis) with replacement: every scenario draws one pace per remaining month, and
+all scenarios are evaluated at once as a (scenarios, months) array whose product with
+the business days gives the yearly totals.
+"""
+
+import numpy as np
+import pandas as pd
+
+from produtiva.business_days import business_days_for_months
+from produtiva.integrity import month_ordinals
+from produtiva.months import ordinal_to_month
+from produtiva.profiling import timed
+from produtiva.schema import MONTH_COLUMN
+
+SCENARIOS = 100_000
+PERCENTILES = (10, 50, 90)
+TP_COLUMN = "TP Adaptado (22 Dias Úteis)"
+IDEAL_COLUMN = "TP Ideal (22 Dias Úteis)"
+IDEAL_ADJUSTED_COLUMN = "TP Ideal Ajustado (Dias Úteis Reais)"
+DAYS_COLUMN = "Dias Úteis"
+
+
+def historical_pace(df_tp: pd.DataFrame) -> np.ndarray:
+    """
+    Returns the TP per business day of every month with business days.
+
+    Parameters:
+    df_tp (pd.DataFrame): Productivity data per month/year.
+
+    Returns:
+    np.ndarray: One pace per usable month, as float64.
+
+    Complexity:
+    Time: O(n), for n months.
+    Space: O(n), for the paces.
+    """
+    days = df_tp[DAYS_COLUMN].to_numpy(dtype=np.float64)
+    tp = df_tp[TP_COLUMN].to_numpy(dtype=np.float64)
+    usable = (days > 0) & ~np.isnan(tp)
+    return tp[usable] / days[usable]
+
+
+@timed()
+def simulate_year(
+    df_tp: pd.DataFrame,
+    year: int = None,
+    scenarios: int = SCENARIOS,
+    seed=None,
+) -> dict:
+    """
+    Projects a year's TP and estimates the probability of meeting the adjusted ideal.
+
+    Parameters:
+    df_tp (pd.DataFrame): Productivity data per month/year, for a single person.
+    year (int, optional): Year to project, e.g. 2025; the year of the latest month
+        when omitted.
+    scenarios (int): Number of simulated scenarios.
+    seed (int or np.random.Generator, optional): Seed of the resampling.
+
+    Returns:
+    dict: "year", "achieved" (TP entered so far), "target" (yearly adjusted ideal),
+    "remaining_months" ('MM/YY' labels), "remaining_days", "required_pace" (TP per
+    business day needed in the remaining months), "required_tp_22" (the same pace over
+    22 business days, comparable with "TP Adaptado (22 Dias Úteis)"), "historical_pace"
+    (mean TP per business day), "probability" of meeting the target, and
+    "percentiles" of the projected yearly TP.
+
+    Complexity:
+    Time: O(s * r + n), for s scenarios, r remaining months and n months of history.
+    Space: O(s * r), for the resampled paces.
+    """
+    if df_tp.empty:
+        raise ValueError("df_tp has no months to project from")
+    ordinals = month_ordinals(df_tp[MONTH_COLUMN])
+    if year is None:
+        year = int(ordinals.max()) // 12
+    first = year * 12
+    in_year = (ordinals >= first) & (ordinals < first + 12)
+    remaining = np.arange(max(first, int(ordinals.max()) + 1), first + 12) - first
+
+    achieved = float(df_tp[TP_COLUMN].to_numpy(dtype=np.float64)[in_year].sum())
+    entered_target = float(
+        df_tp[IDEAL_ADJUSTED_COLUMN].to_numpy(dtype=np.float64)[in_year].sum()
+    )
+    periods = pd.PeriodIndex(
+        [pd.Period(year=year, month=int(m) + 1, freq="M") for m in remaining],
+        freq="M",
+    )
+    remaining_days = business_days_for_months(periods).astype(np.float64)
+    ideal_22 = float(df_tp[IDEAL_COLUMN].to_numpy()[np.argmax(ordinals)])
+    target = entered_target + ideal_22 * remaining_days.sum() / 22
+    required = target - achieved
+
+    paces = historical_pace(df_tp)
+    if len(remaining) and len(paces):
+        rng = np.random.default_rng(seed)
+        draws = paces[rng.integers(0, len(paces), size=(scenarios, len(remaining)))]
+        totals = achieved + draws @ remaining_days
+    else:
+        # A closed year (or no history to resample) has a single outcome.
+        totals = np.array([achieved])
+
+    days_left = remaining_days.sum()
+    required_pace = float(max(required, 0.0) / days_left) if days_left else np.nan
+    return {
+        "year": year,
+        "achieved": achieved,
+        "target": float(target),
+        "remaining_months": [ordinal_to_month(first + int(m)) for m in remaining],
+        "remaining_days": remaining_days.astype(int).tolist(),
+        "required_pace": required_pace,
+        "required_tp_22": required_pace * 22,
+        "historical_pace": float(paces.mean()) if len(paces) else np.nan,
+        "probability": float(np.mean(totals >= target)),
+        "percentiles": dict(
+            zip(PERCENTILES, np.percentile(totals, PERCENTILES).tolist())
+        ),
+    }
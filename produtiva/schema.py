@@ -0,0 +1,258 @@
+"""
+Column types of the persisted datasets.
+
+Month keys are stored as an ordered categorical whose categories are sorted
+chronologically, so each row holds a small integer code instead of a Python string
+and sorting by month is chronological. Counts use the smallest integer type that
+holds them, and derived rates use float32, which keeps far more precision than the
+two decimals shown in the app.
+
+The schema is enforced when datasets are created, loaded, upserted and persisted.
+Columns that cannot be represented losslessly by their integer type (missing or
+fractional values) fall back to float32 instead of failing. Values leaving the app
+(JSON, exports) are rounded to FLOAT_DECIMALS so float32 noise is not shown.
+
+SCHEMA_VERSION is stored with every saved frame; frames written under an older
+version are brought up to date by `produtiva.migrations` when they are loaded.
+"""
+
+import numpy as np
+import pandas as pd
+
+from produtiva.months import month_ordinal
+
+SCHEMA_VERSION = 2
+FLOAT_DECIMALS = 6
+MONTH_COLUMN = "Mês/Ano"
+PERSON_COLUMN = "Pessoa"
+
+SCHEMAS = {
+    "df_tp": {
+        "TP Adaptado (22 Dias Úteis)": "int16",
+        "TP Ideal (22 Dias Úteis)": "int16",
+        "Dias Úteis": "int8",
+        "TP Ajustado (Dias Úteis Reais)": "float32",
+        "TP Ideal Ajustado (Dias Úteis Reais)": "float32",
+        "TP Adaptado (22 Dias Úteis) + Revisão Task": "int16",
+        "TP Ajustado (Dias Úteis Reais) + Revisão Task": "float32",
+    },
+    "df_tasks": {
+        "TP Tasks Revisadas": "int16",
+        "TP Adaptado Tasks Revisadas": "int16",
+    },
+    "df_tamanho": {
+        "Task P": "int16",
+        "Task M": "int16",
+        "Task G": "int16",
+    },
+}
+
+
+def month_dtype(months) -> pd.CategoricalDtype:
+    """
+    Builds the ordered categorical type of a set of 'MM/YY' month labels.
+
+    Parameters:
+    months (iterable): Month labels, possibly repeated.
+
+    Returns:
+    pd.CategoricalDtype: Ordered type whose categories are the distinct months in
+    chronological order.
+
+    Complexity:
+    Time: O(n + m log m), for n labels with m distinct months.
+    Space: O(m), for the categories.
+    """
+    return pd.CategoricalDtype(
+        sorted(set(months), key=month_ordinal), ordered=True
+    )
+
+
+def _is_month_dtype(dtype) -> bool:
+    """
+    Tells whether a column type is already a month type built by `month_dtype`.
+
+    Concatenating frames whose months differ yields object columns, so an ordered
+    categorical can only come from `month_dtype` and its categories are chronological.
+    """
+    return isinstance(dtype, pd.CategoricalDtype) and dtype.ordered
+
+
+def downcast_column(series: pd.Series, dtype: str) -> pd.Series:
+    """
+    Converts a column to its schema type, or to float32 when that would lose data.
+
+    Parameters:
+    series (pd.Series): The column to convert.
+    dtype (str): Target NumPy type name, e.g. "int16" or "float32".
+
+    Returns:
+    pd.Series: The converted column, or `series` itself when it already has the type.
+
+    Complexity:
+    Time: O(n), where n is the length of the column.
+    Space: O(n), for the converted column.
+    """
+    target = np.dtype(dtype)
+    if series.dtype == target:
+        return series
+
+    if series.dtype.kind in "biuf":
+        values = series.to_numpy()
+    else:
+        values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=float)
+    if target.kind in "iu" and not _fits_integer(values, target):
+        target = np.dtype("float32")
+    return pd.Series(values.astype(target), index=series.index, name=series.name)
+
+
+def _fits_integer(values: np.ndarray, dtype: np.dtype) -> bool:
+    """
+    Tells whether every value is a whole number within the range of an integer type.
+    """
+    if not values.size:
+        return True
+    low, high = values.min(), values.max()
+    if values.dtype.kind == "f":
+        if not (np.isfinite(low) and np.isfinite(high)):
+            return False
+        if (np.mod(values, 1) != 0).any():
+            return False
+    info = np.iinfo(dtype)
+    return info.min <= low and high <= info.max
+
+
+def enforce_schema(df, dataset: str):
+    """
+    Converts the columns of a dataset frame to the schema types, in place.
+
+    The month column becomes an ordered categorical, a "Pessoa" column (present in
+    multi-person frames) becomes a categorical, and the known value columns are
+    downcast. Other columns are left untouched, and frames that already follow the
+    schema are only checked, in O(c).
+
+    Parameters:
+    df (pd.DataFrame or None): Frame of the dataset; None is returned unchanged.
+    dataset (str): One of "df_tp", "df_tasks" or "df_tamanho".
+
+    Returns:
+    pd.DataFrame or None: The same frame, with converted columns.
+
+    Complexity:
+    Time: O(n * c), for n rows and c columns.
+    Space: O(n), for one converted column at a time.
+    """
+    if df is None:
+        return df
+
+    if MONTH_COLUMN in df.columns and not _is_month_dtype(df[MONTH_COLUMN].dtype):
+        months = df[MONTH_COLUMN].astype(object)
+        df[MONTH_COLUMN] = months.astype(month_dtype(months.dropna()))
+    if PERSON_COLUMN in df.columns and not isinstance(
+        df[PERSON_COLUMN].dtype, pd.CategoricalDtype
+    ):
+        df[PERSON_COLUMN] = df[PERSON_COLUMN].astype("category")
+
+    for column, dtype in SCHEMAS[dataset].items():
+        if column in df.columns and df[column].dtype != dtype:
+            df[column] = downcast_column(df[column], dtype)
+    return df
+
+
+def set_value(df, rows, column: str, value) -> None:
+    """
+    Writes a value into rows of a column, in place, widening the column when needed.
+
+    Integer columns reject values outside their range or with a fraction, so such a
+    column is first converted to float64; `enforce_schema` afterwards picks the
+    narrowest type that holds the new values.
+
+    Parameters:
+    df (pd.DataFrame): The frame to update.
+    rows (label or boolean mask): Rows to write, as accepted by `df.loc`.
+    column (str): The column to write.
+    value (object): The new value.
+
+    Returns:
+    None
+
+    Complexity:
+    Time: O(1) for a fitting value, O(n) when the column is widened.
+    Space: O(1), or O(n) for the widened column.
+    """
+    try:
+        df.loc[rows, column] = value
+    except (TypeError, ValueError, AssertionError):
+        df[column] = df[column].astype("float64")
+        df.loc[rows, column] = value
+
+
+def empty_frame(dataset: str) -> pd.DataFrame:
+    """
+    Creates an empty frame of a dataset with its schema types.
+
+    Parameters:
+    dataset (str): One of "df_tp", "df_tasks" or "df_tamanho".
+
+    Returns:
+    pd.DataFrame: A frame with no rows and typed columns.
+
+    Complexity:
+    Time: O(c), for c columns.
+    Space: O(c), for the empty columns.
+    """
+    columns = {MONTH_COLUMN: pd.Series([], dtype=month_dtype([]))}
+    for column, dtype in SCHEMAS[dataset].items():
+        columns[column] = pd.Series([], dtype=dtype)
+    return pd.DataFrame(columns)
+
+
+def frame_memory(df) -> int:
+    """
+    Returns the deep memory usage of a frame in bytes, index included.
+
+    Parameters:
+    df (pd.DataFrame or None): The frame to measure.
+
+    Returns:
+    int: Memory usage in bytes, 0 for None.
+
+    Complexity:
+    Time: O(n), since object columns are traversed.
+    Space: O(1), constant space usage.
+    """
+    if df is None:
+        return 0
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def memory_report(frames: dict) -> list:
+    """
+    Measures each dataset frame before and after enforcing the schema.
+
+    The frames are copied, so the input is left unchanged.
+
+    Parameters:
+    frames (dict): Dataset name ("df_tp", "df_tasks" or "df_tamanho") -> frame.
+
+    Returns:
+    list: One dict per frame with its rows, bytes before and after, and the ratio.
+
+    Complexity:
+    Time: O(n * c), over all frames.
+    Space: O(n * c), for the converted copies.
+    """
+    rows = []
+    for dataset, df in frames.items():
+        before = frame_memory(df)
+        after = frame_memory(enforce_schema(df.copy(), dataset))
+        rows.append(
+            {
+                "dataset": dataset,
+                "rows": len(df),
+                "before_bytes": before,
+                "after_bytes": after,
+                "ratio": round(before / after, 2) if after else None,
+            }
+        )
+    return rows
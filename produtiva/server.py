@@ -0,0 +1,455 @@
+"""
+Local JSON query API over the persisted Produtiva datasets.
+
+Endpoints (all GET, optional `start`/`end` month range in 'MM/YY' format, the hot
+months by default; ranges reaching archived years read the cold segments):
+    /tp        rows of df_tp
+    /tasks     rows of df_tasks
+    /tamanho   rows of df_tamanho
+    /metrics   derived productivity series and totals for the range
+    /trends    rolling mean/std, EWMA and forecast of the main series (optional
+               `window`, `alpha`, `horizon` and `method`=holt|linear)
+    /version   current data version
+
+Unknown paths and explicit ranges without any stored month answer 404, and unexpected
+errors are logged and answer 500. Responses are cached per data version and carry an
+ETag, so clients sending If-None-Match get a bodyless 304 while the data is unchanged.
+Pickle loads run in a worker thread and are shared by every request waiting on the
+same version.
+
+Usage:
+    python -m produtiva.server [--host 127.0.0.1] [--port 8765]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from produtiva.analytics import (
+    EWMA_ALPHA,
+    FORECAST_METHODS,
+    FORECAST_MONTHS,
+    ROLLING_WINDOW,
+    TREND_METRICS,
+    compute_trends,
+)
+from produtiva.cube import MetricCube
+from produtiva.months import month_ordinal
+from produtiva.schema import FLOAT_DECIMALS
+from produtiva.storage import data_version, load_datasets
+from produtiva.tiering import cold_months, select_range
+from produtiva.window import month_index
+
+DATASET_ENDPOINTS = {
+    "/tp": "df_tp",
+    "/tasks": "df_tasks",
+    "/tamanho": "df_tamanho",
+}
+MAX_HEADER_LINES = 100
+MAX_CACHED_RESPONSES = 1024
+REASONS = {
+    200: "OK",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+}
+
+logger = logging.getLogger(__name__)
+
+
+class BadRequest(Exception):
+    pass
+
+
+class NotFound(Exception):
+    pass
+
+
+class DatasetCache:
+    """
+    Holds the datasets of the latest data version, loading each version only once.
+
+    Concurrent requests that arrive while a version is being loaded await the same
+    task, so a burst of requests after a write triggers a single off-loop pickle load.
+    """
+
+    def __init__(self):
+        self.version = None
+        self._datasets = None
+        self._loading = None
+
+    async def get(self) -> tuple:
+        """
+        Returns the current data version and its datasets.
+
+        Returns:
+        tuple: (version, datasets) where datasets is the dict from `load_datasets`.
+
+        Complexity:
+        Time: O(1) when the version is cached, O(n) for the load otherwise.
+        Space: O(n), for the cached datasets.
+        """
+        version = data_version()
+        if version == self.version:
+            return self.version, self._datasets
+
+        if self._loading is None or self._loading[0] != version:
+            task = asyncio.get_running_loop().run_in_executor(None, load_datasets)
+            self._loading = (version, task)
+        loading_version, task = self._loading
+        datasets = await task
+        if self._loading is not None and self._loading[0] == loading_version:
+            self.version, self._datasets = loading_version, datasets
+            self._loading = None
+        return loading_version, datasets
+
+
+class MetricsAPI:
+    """
+    Routes requests to JSON bodies and caches encoded responses per data version.
+    """
+
+    def __init__(self):
+        self.datasets = DatasetCache()
+        self._responses = {}
+        self._responses_version = None
+
+    async def respond(self, path: str, query: str, if_none_match: str) -> tuple:
+        """
+        Builds the response for a GET request.
+
+        Parameters:
+        path (str): The request path.
+        query (str): The raw query string.
+        if_none_match (str): The If-None-Match header value, or an empty string.
+
+        Returns:
+        tuple: (status, headers, body) ready to be written to the client.
+
+        Complexity:
+        Time: O(1) for cached responses, O(k) to encode a window of k rows otherwise.
+        Space: O(k), for the encoded body.
+        """
+        version, datasets = await self.datasets.get()
+        if (
+            version != self._responses_version
+            or len(self._responses) >= MAX_CACHED_RESPONSES
+        ):
+            self._responses = {}
+            self._responses_version = version
+
+        key = (path, query)
+        cached = self._responses.get(key)
+        if cached is None:
+            params = {k: v[-1] for k, v in parse_qs(query).items()}
+            body = self._build_body(path, params, datasets, version)
+            digest = hashlib.sha1(repr((version, key)).encode()).hexdigest()
+            cached = (f'"{digest[:20]}"', body)
+            self._responses[key] = cached
+
+        etag, body = cached
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag in (tag.strip() for tag in if_none_match.split(",")):
+            return 304, headers, b""
+        headers["Content-Type"] = "application/json; charset=utf-8"
+        return 200, headers, body
+
+    def _build_body(self, path, params, datasets, version) -> bytes:
+        if path == "/version":
+            return json.dumps({"version": repr(version)}).encode()
+        if path not in DATASET_ENDPOINTS and path not in ("/metrics", "/trends"):
+            raise NotFound(path)
+
+        start, end = self._month_range(params, datasets["df_tp"])
+        explicit = "start" in params or "end" in params
+        if explicit and not self._has_months(datasets["df_tp"], start, end):
+            raise NotFound(f"no stored months between {start} and {end}")
+        if path in DATASET_ENDPOINTS:
+            name = DATASET_ENDPOINTS[path]
+            df = select_range(name, datasets[name], start, end)
+            return df.to_json(
+                orient="records", force_ascii=False, double_precision=FLOAT_DECIMALS
+            ).encode()
+        if path == "/metrics":
+            return json.dumps(
+                derived_metrics(datasets, start, end), ensure_ascii=False
+            ).encode()
+        if path == "/trends":
+            return json.dumps(
+                trend_series(datasets, start, end, self._trend_params(params)),
+                ensure_ascii=False,
+            ).encode()
+        raise NotFound(path)
+
+    @staticmethod
+    def _trend_params(params) -> dict:
+        try:
+            trend_params = {
+                "window": int(params.get("window", ROLLING_WINDOW)),
+                "alpha": float(params.get("alpha", EWMA_ALPHA)),
+                "horizon": int(params.get("horizon", FORECAST_MONTHS)),
+                "method": params.get("method", "holt"),
+            }
+        except ValueError:
+            raise BadRequest("window/horizon must be integers and alpha a number")
+        if not (
+            2 <= trend_params["window"] <= 24
+            and 0 < trend_params["alpha"] <= 1
+            and 1 <= trend_params["horizon"] <= 24
+            and trend_params["method"] in FORECAST_METHODS
+        ):
+            raise BadRequest(
+                "window in 2..24, alpha in (0, 1], horizon in 1..24, "
+                f"method in {FORECAST_METHODS}"
+            )
+        return trend_params
+
+    @staticmethod
+    def _has_months(df_tp, start: str, end: str) -> bool:
+        first, last = month_ordinal(start), month_ordinal(end)
+        months = month_index(df_tp).months + cold_months("df_tp")
+        return any(first <= month_ordinal(month) <= last for month in months)
+
+    @staticmethod
+    def _month_range(params, df_tp) -> tuple[str, str]:
+        try:
+            months = month_index(df_tp).months
+            start = params.get("start") or (months[0] if months else "01/00")
+            end = params.get("end") or (months[-1] if months else "12/99")
+            for value in (start, end):
+                mm, yy = value.split("/")
+                if not (1 <= int(mm) <= 12 and len(yy) == 2):
+                    raise ValueError(value)
+        except ValueError:
+            raise BadRequest("start/end must be in MM/YY format")
+        return start, end
+
+
+def derived_metrics(datasets: dict, start: str, end: str) -> dict:
+    """
+    Computes the derived productivity series and totals for a month range.
+
+    Parameters:
+    datasets (dict): The datasets returned by `load_datasets`.
+    start (str): First month of the range in 'MM/YY' format.
+    end (str): Last month of the range in 'MM/YY' format.
+
+    Returns:
+    dict: Per-month series, range totals and the attainment ratio of adjusted TP
+    against adjusted ideal TP.
+
+    Complexity:
+    Time: O(log n + k), where k is the number of months inside the range, plus the
+    first read of the cold segments it reaches.
+    Space: O(k), for the windowed frames.
+    """
+    df_tp, df_tasks, df_tamanho = (
+        select_range(name, datasets[name], start, end)
+        for name in ("df_tp", "df_tasks", "df_tamanho")
+    )
+
+    revisadas = (
+        df_tasks.set_index("Mês/Ano")["TP Tasks Revisadas"]
+        .reindex(df_tp["Mês/Ano"])
+        .fillna(0)
+        .to_numpy()
+    )
+    ajustado = np.round(
+        df_tp["TP Ajustado (Dias Úteis Reais)"].to_numpy(dtype=float), FLOAT_DECIMALS
+    )
+    ideal_ajustado = np.round(
+        df_tp["TP Ideal Ajustado (Dias Úteis Reais)"].to_numpy(dtype=float),
+        FLOAT_DECIMALS,
+    )
+    series = {
+        "Mês/Ano": df_tp["Mês/Ano"].tolist(),
+        "TP Ajustado (Dias Úteis Reais)": ajustado.tolist(),
+        "TP Ideal Ajustado (Dias Úteis Reais)": ideal_ajustado.tolist(),
+        "TP Ajustado (Dias Úteis Reais) + Revisão Task": (
+            ajustado + revisadas
+        ).tolist(),
+    }
+    ideal_total = float(ideal_ajustado.sum())
+    totals = {
+        "TP Adaptado (22 Dias Úteis)": float(df_tp["TP Adaptado (22 Dias Úteis)"].sum()),
+        "TP Ajustado (Dias Úteis Reais)": float(ajustado.sum()),
+        "TP Ideal Ajustado (Dias Úteis Reais)": ideal_total,
+        "TP Tasks Revisadas": float(revisadas.sum()),
+        "Dias Úteis": float(df_tp["Dias Úteis"].sum()),
+        "Task P": float(df_tamanho["Task P"].sum()),
+        "Task M": float(df_tamanho["Task M"].sum()),
+        "Task G": float(df_tamanho["Task G"].sum()),
+    }
+    return {
+        "start": start,
+        "end": end,
+        "series": series,
+        "totals": totals,
+        "attainment": float(ajustado.sum()) / ideal_total if ideal_total else None,
+    }
+
+
+def trend_series(datasets: dict, start: str, end: str, params: dict) -> dict:
+    """
+    Computes the rolling statistics and forecast of the main series for a month range.
+
+    The statistics are computed over the whole history, so windows at the start of
+    the range still look back before it; the forecast follows the last stored month.
+
+    Parameters:
+    datasets (dict): The datasets returned by `load_datasets`.
+    start (str): First month of the range in 'MM/YY' format.
+    end (str): Last month of the range in 'MM/YY' format.
+    params (dict): Keyword arguments of `produtiva.analytics.compute_trends`.
+
+    Returns:
+    dict: "months", "forecast_months" and, per metric of TREND_METRICS, its
+    "rolling_mean", "rolling_std", "ewma" and "forecast" lists.
+
+    Complexity:
+    Time: O(n * k), for n months and k metrics.
+    Space: O(n * k), for the cube and the statistics.
+    """
+    cube = MetricCube.from_frames(
+        datasets["df_tp"], datasets["df_tasks"], datasets["df_tamanho"]
+    )
+    trends = compute_trends(cube.block(TREND_METRICS), cube.months, **params)
+    ordinals = np.array([month_ordinal(m) for m in trends["months"]], dtype=int)
+    inside = (ordinals >= month_ordinal(start)) & (ordinals <= month_ordinal(end))
+
+    def encode(values):
+        values = np.round(values, FLOAT_DECIMALS)
+        return [None if np.isnan(v) else float(v) for v in values]
+
+    metrics = {}
+    for i, metric in enumerate(TREND_METRICS):
+        metrics[metric] = {
+            key: encode(trends[key][inside, i, 0])
+            for key in ("rolling_mean", "rolling_std", "ewma")
+        }
+        metrics[metric]["forecast"] = encode(trends["forecast"][:, i, 0])
+    return {
+        "months": [m for m, keep in zip(trends["months"], inside) if keep],
+        "forecast_months": trends["forecast_months"],
+        "params": params,
+        "metrics": metrics,
+    }
+
+
+async def handle_connection(api: MetricsAPI, reader, writer) -> None:
+    """
+    Serves HTTP/1.1 requests on one connection until the client closes it.
+
+    Parameters:
+    api (MetricsAPI): The request router.
+    reader (asyncio.StreamReader): The connection reader.
+    writer (asyncio.StreamWriter): The connection writer.
+
+    Returns:
+    None
+    """
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            headers = {}
+            for _ in range(MAX_HEADER_LINES):
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            try:
+                method, target, http_version = (
+                    request_line.decode("latin-1").strip().split(" ")
+                )
+            except ValueError:
+                status, response_headers, body = 400, {}, b""
+                http_version = "HTTP/1.0"
+            else:
+                status, response_headers, body = await _dispatch(
+                    api, method, target, headers
+                )
+
+            keep_alive = http_version == "HTTP/1.1" and (
+                headers.get("connection", "").lower() != "close"
+            )
+            response_headers["Content-Length"] = str(len(body))
+            response_headers["Connection"] = "keep-alive" if keep_alive else "close"
+            head = f"HTTP/1.1 {status} {REASONS[status]}\r\n" + "".join(
+                f"{name}: {value}\r\n" for name, value in response_headers.items()
+            )
+            writer.write(head.encode("latin-1") + b"\r\n" + body)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionResetError, BrokenPipeError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _dispatch(api, method, target, headers) -> tuple:
+    if method != "GET":
+        return 405, {"Allow": "GET"}, b""
+    url = urlsplit(target)
+    try:
+        return await api.respond(
+            url.path.rstrip("/") or "/", url.query, headers.get("if-none-match", "")
+        )
+    except BadRequest as error:
+        body = json.dumps({"error": str(error)}).encode()
+        return 400, {"Content-Type": "application/json"}, body
+    except NotFound as error:
+        body = json.dumps({"error": f"not found: {error}"}).encode()
+        return 404, {"Content-Type": "application/json"}, body
+    except Exception:
+        logger.exception("%s %s failed", method, target)
+        return 500, {}, b""
+
+
+async def serve(host: str = "127.0.0.1", port: int = 8765) -> None:
+    """
+    Runs the API server until cancelled.
+
+    Parameters:
+    host (str): Interface to bind.
+    port (int): TCP port to bind.
+
+    Returns:
+    None
+    """
+    api = MetricsAPI()
+    server = await asyncio.start_server(
+        lambda reader, writer: handle_connection(api, reader, writer),
+        host,
+        port,
+        backlog=1024,
+    )
+    print(f"Produtiva API listening on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Produtiva local metrics API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
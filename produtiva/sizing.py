@@ -0,0 +1,99 @@
+"""
+TP derived from the task-size counts, and its reconciliation with the entered TP.
+
+Each task size is worth a fixed amount of TP Adaptado (by default P = 1, M = 3 and
+G = 5, as documented in the size form; see `data/size_weights.json`). The size-derived
+TP of every month is the dot product of its counts with the weights, computed for
+all months (and people) at once, and is normalized to the real business days like
+"TP Ajustado (Dias Úteis Reais)". Months where the entered TP and the size-derived TP
+differ by more than a relative tolerance are flagged.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from produtiva.paths import load_json_config
+from produtiva.schema import MONTH_COLUMN, PERSON_COLUMN
+
+RECONCILE_TOLERANCE = 0.2
+
+SIZE_TP = "TP por Tamanho (22 Dias Úteis)"
+SIZE_TP_ADJUSTED = "TP por Tamanho Ajustado (Dias Úteis Reais)"
+DIVERGENCE = "Divergência TP"
+DIVERGENT = "TP Divergente"
+
+
+@lru_cache(maxsize=None)
+def _default_weights() -> tuple:
+    return tuple(load_json_config("size_weights.json").items())
+
+
+def size_weights(weights: dict = None) -> dict:
+    """
+    Returns the TP weight of each task-size column.
+
+    Parameters:
+    weights (dict, optional): Column -> weight overrides, e.g. {"Task G": 8}.
+
+    Returns:
+    dict: The weights of "Task P", "Task M" and "Task G".
+    """
+    return {**dict(_default_weights()), **(weights or {})}
+
+
+def size_weighted_tp(
+    df_tp: pd.DataFrame,
+    df_tamanho: pd.DataFrame,
+    weights: dict = None,
+    tolerance: float = RECONCILE_TOLERANCE,
+) -> pd.DataFrame:
+    """
+    Derives TP from the task-size counts and reconciles it with the entered TP.
+
+    Parameters:
+    df_tp (pd.DataFrame): Productivity data with "TP Adaptado (22 Dias Úteis)" and
+        "Dias Úteis" per month (and person, when a "Pessoa" column is present).
+    df_tamanho (pd.DataFrame): Task size counts per month (and person).
+    weights (dict, optional): Overrides of the weights in `size_weights`.
+    tolerance (float): Relative difference above which a month is flagged.
+
+    Returns:
+    pd.DataFrame: One row per month of df_tp with the month (and person), the entered
+    TP, SIZE_TP, SIZE_TP_ADJUSTED, DIVERGENCE (entered minus size-derived TP) and
+    DIVERGENT. Months without size counts have NaN size-derived values and are not
+    flagged.
+
+    Complexity:
+    Time: O(n + m), for n months in df_tp and m in df_tamanho.
+    Space: O(n), for the result.
+    """
+    weights = size_weights(weights)
+    keys = [MONTH_COLUMN]
+    if PERSON_COLUMN in df_tp.columns and PERSON_COLUMN in df_tamanho.columns:
+        keys.append(PERSON_COLUMN)
+
+    counts = df_tamanho[list(weights)].to_numpy(dtype=np.float64)
+    sizes = df_tamanho[keys].copy()
+    sizes[SIZE_TP] = counts @ np.fromiter(weights.values(), dtype=np.float64)
+    for key in keys:
+        sizes[key] = sizes[key].astype(object)
+
+    result = df_tp[[*keys, "TP Adaptado (22 Dias Úteis)", "Dias Úteis"]].copy()
+    for key in keys:
+        result[key] = result[key].astype(object)
+    result = result.merge(sizes, on=keys, how="left", validate="many_to_one")
+    result[MONTH_COLUMN] = result[MONTH_COLUMN].astype(df_tp[MONTH_COLUMN].dtype)
+
+    entered = result["TP Adaptado (22 Dias Úteis)"].to_numpy(dtype=np.float64)
+    derived = result[SIZE_TP].to_numpy()
+    result[SIZE_TP_ADJUSTED] = derived * (
+        22 / result["Dias Úteis"].to_numpy(dtype=np.float64)
+    )
+    divergence = entered - derived
+    result[DIVERGENCE] = divergence
+    scale = np.fmax(np.abs(entered), np.abs(derived))
+    with np.errstate(invalid="ignore"):
+        result[DIVERGENT] = np.abs(divergence) > tolerance * scale
+    return result.drop(columns="Dias Úteis")
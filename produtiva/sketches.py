@@ -0,0 +1,325 @@
+"""
+Mergeable quantile sketches of monthly metrics across a team.
+
+A KLL sketch summarizes a stream of values in O(k log(n / k)) space and answers any
+quantile within a normalized rank error that depends only on k: the returned value's
+rank is within about `rank_error(k)` * n of the requested one. Sketches of disjoint
+inputs merge into a sketch of their union with the same guarantee, so partitions of a
+team (one person, or a group of people kept together) summarize their own values and
+the team percentiles come from merging them.
+
+`TeamSketches` keeps one sketch per partition, month and metric, updated on every
+upsert, plus the merged team sketch of each month, which new values are also inserted
+into. A sketch cannot remove a value, so when an upsert replaces a person's value
+for a month, that partition's sketch for the month is rebuilt and the month's team
+sketch is merged again on the next read. A one-person partition is rebuilt from the
+new value alone; a partition grouping several people keeps its members' values to be
+rebuilt from.
+
+The sketches bound the cost of merging and reading a month's team percentiles, not
+memory: every partition holds a sketch per month and metric, so memory still grows
+with people × months × metrics, plus the raw values of grouped partitions.
+"""
+
+import math
+import random
+
+import numpy as np
+import pandas as pd
+
+from produtiva.months import month_ordinal
+
+DEFAULT_K = 200
+SKETCH_METRICS = (
+    "TP Adaptado (22 Dias Úteis)",
+    "TP Ajustado (Dias Úteis Reais)",
+    "TP Tasks Revisadas",
+    "TP Adaptado Tasks Revisadas",
+)
+TEAM_QUANTILES = (0.5, 0.9, 0.99)
+_CAPACITY_DECAY = 2 / 3
+
+
+def rank_error(k: int = DEFAULT_K) -> float:
+    """
+    Returns the normalized rank error of a KLL sketch with parameter k.
+
+    Uses the empirical fit published with Apache DataSketches' KLL sketch, which
+    holds with 99% confidence for single quantile queries.
+
+    Parameters:
+    k (int): Sketch parameter.
+
+    Returns:
+    float: The error, e.g. about 0.0133 for k = 200.
+    """
+    return 2.296 / k**0.9723
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch: a stack of compactors where level h holds items of weight 2^h.
+
+    A full level is sorted and every other item (from a random offset) is promoted to
+    the next level, halving the items while keeping ranks unbiased. Lower levels
+    have geometrically smaller capacities, which bounds the size by O(k).
+    """
+
+    def __init__(self, k: int = DEFAULT_K, seed=None):
+        self.k = k
+        self.n = 0
+        self.levels = [[]]
+        self._random = random.Random(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * _CAPACITY_DECAY**depth)))
+
+    def _size(self) -> int:
+        return sum(len(items) for items in self.levels)
+
+    def _max_size(self) -> int:
+        return sum(self._capacity(level) for level in range(len(self.levels)))
+
+    def _compress(self) -> None:
+        while self._size() > self._max_size():
+            for level, items in enumerate(self.levels):
+                if len(items) >= self._capacity(level):
+                    if level + 1 == len(self.levels):
+                        self.levels.append([])
+                    items.sort()
+                    # An odd item out stays at this level, keeping the total weight.
+                    keep = [items.pop()] if len(items) % 2 else []
+                    offset = self._random.randint(0, 1)
+                    self.levels[level + 1].extend(items[offset::2])
+                    self.levels[level] = keep
+                    break
+
+    def update(self, value: float) -> None:
+        """
+        Adds a value to the sketch.
+
+        Complexity:
+        Time: O(1) amortized, O(k log k) when a level is compacted.
+        Space: O(1), amortized.
+        """
+        self.levels[0].append(float(value))
+        self.n += 1
+        if len(self.levels[0]) >= self._capacity(0):
+            self._compress()
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        """
+        Adds the values summarized by another sketch, in place.
+
+        Parameters:
+        other (KLLSketch): Sketch of a disjoint set of values.
+
+        Returns:
+        KLLSketch: This sketch.
+
+        Complexity:
+        Time: O(k log k), for the compactions.
+        Space: O(k), for the merged levels.
+        """
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for level, items in enumerate(other.levels):
+            self.levels[level].extend(items)
+        self.n += other.n
+        self._compress()
+        return self
+
+    def quantiles(self, qs) -> np.ndarray:
+        """
+        Returns approximate quantiles of the values added so far.
+
+        Parameters:
+        qs (iterable): Quantiles in [0, 1].
+
+        Returns:
+        np.ndarray: One value per quantile; NaN when the sketch is empty.
+
+        Complexity:
+        Time: O(k log k), to sort the retained items.
+        Space: O(k), for the weighted items.
+        """
+        qs = np.asarray(qs, dtype=np.float64)
+        if not self.n:
+            return np.full(qs.shape, np.nan)
+        values = np.concatenate([np.asarray(items) for items in self.levels])
+        weights = np.concatenate(
+            [np.full(len(items), 2**level) for level, items in enumerate(self.levels)]
+        )
+        order = np.argsort(values, kind="stable")
+        cumulative = np.cumsum(weights[order])
+        ranks = np.searchsorted(cumulative, qs * cumulative[-1], side="left")
+        return values[order][np.minimum(ranks, len(values) - 1)]
+
+    def quantile(self, q: float) -> float:
+        """
+        Returns one approximate quantile; see `quantiles`.
+        """
+        return float(self.quantiles([q])[0])
+
+
+class TeamSketches:
+    """
+    Per-partition and merged team sketches of SKETCH_METRICS per month.
+
+    `update_from_frame` has the signature of `MetricCube.update_from_frame`, so the
+    sketches follow the same upserts as the cube.
+    """
+
+    def __init__(self, k: int = DEFAULT_K, seed=None):
+        self.k = k
+        self._seed = seed
+        self._values = {}
+        self._partitions = {}
+        self._team = {}
+        self._stale = set()
+
+    def _new_sketch(self) -> KLLSketch:
+        return KLLSketch(self.k, seed=self._seed)
+
+    def update(self, month_year: str, metric: str, person, value, partition=None):
+        """
+        Records one person's value of a metric for a month.
+
+        Parameters:
+        month_year (str): The month/year identifier in the format 'MM/YY'.
+        metric (str): One of SKETCH_METRICS.
+        person (str): The person the value belongs to.
+        value (float): The value; NaN is ignored.
+        partition (hashable, optional): Partition of the person; the person itself
+            when omitted.
+
+        Returns:
+        None
+
+        Complexity:
+        Time: O(1) amortized for a new value; O(m log m) for a replaced one, to rebuild
+        the partition's sketch of the month from its m values.
+        Space: O(1), amortized; grouped partitions also keep the value.
+        """
+        if value != value:
+            return
+        key = (month_year, metric)
+        sketches = self._partitions.setdefault(key, {})
+        if partition is None:
+            partition = person
+            replaced = partition in sketches
+            values = {person: float(value)}
+        else:
+            values = self._values.setdefault(key, {}).setdefault(partition, {})
+            replaced = person in values
+            values[person] = float(value)
+        if replaced:
+            sketch = self._new_sketch()
+            for v in values.values():
+                sketch.update(v)
+            sketches[partition] = sketch
+            self._stale.add(key)
+        else:
+            sketches.setdefault(partition, self._new_sketch()).update(value)
+            if key in self._team and key not in self._stale:
+                self._team[key].update(value)
+
+    def update_from_frame(self, df, month_year: str, person=None, partition=None):
+        """
+        Records the row of `month_year` found in a dataset frame.
+
+        Parameters:
+        df (pd.DataFrame): Any of df_tp or df_tasks.
+        month_year (str): The month/year identifier in the format 'MM/YY'.
+        person (str, optional): The person the row belongs to.
+        partition (hashable, optional): Partition of the person.
+
+        Returns:
+        None
+
+        Complexity:
+        Time: O(n) to locate the row, plus `update` per metric.
+        Space: O(1), amortized.
+        """
+        rows = df.loc[df["Mês/Ano"] == month_year]
+        if rows.empty:
+            return
+        row = rows.iloc[-1]
+        for metric in SKETCH_METRICS:
+            if metric in row.index:
+                self.update(month_year, metric, person, row[metric], partition)
+
+    def load_frame(self, df, person=None, partition=None) -> None:
+        """
+        Records every row of a dataset frame for one person.
+
+        Complexity:
+        Time: O(n * k), for n rows and k metrics.
+        Space: O(n * k), for the partition sketches (and values of a grouped partition).
+        """
+        metrics = [m for m in SKETCH_METRICS if m in df.columns]
+        block = df[metrics].to_numpy(dtype=np.float64)
+        for month_year, values in zip(df["Mês/Ano"].astype(str), block):
+            for metric, value in zip(metrics, values):
+                self.update(month_year, metric, person, value, partition)
+
+    def team_sketch(self, month_year: str, metric: str) -> KLLSketch:
+        """
+        Returns the team sketch of a month, merging the partitions when it is stale.
+
+        Complexity:
+        Time: O(1) when current, O(P * k log k) to merge P partitions otherwise.
+        Space: O(k), for the merged sketch.
+        """
+        key = (month_year, metric)
+        if key not in self._team or key in self._stale:
+            merged = self._new_sketch()
+            for sketch in self._partitions.get(key, {}).values():
+                merged.merge(sketch)
+            self._team[key] = merged
+            self._stale.discard(key)
+        return self._team[key]
+
+    def percentiles(
+        self, metric: str, quantiles=TEAM_QUANTILES, bounds: bool = False
+    ) -> pd.DataFrame:
+        """
+        Returns the team percentiles of a metric for every month.
+
+        Parameters:
+        metric (str): One of SKETCH_METRICS.
+        quantiles (tuple): Quantiles in [0, 1].
+        bounds (bool): Also return "pNN_low" and "pNN_high", the values at the
+            quantile minus and plus the rank error, which bracket the exact value.
+
+        Returns:
+        pd.DataFrame: Indexed by month in chronological order, with one "pNN" column
+        per quantile and "n" (values summarized). `attrs["rank_error"]` holds the
+        normalized rank error of the sketches.
+
+        Complexity:
+        Time: O(m * k log k), for m months, when the team sketches are current.
+        Space: O(m * q), for the table.
+        """
+        months = sorted(
+            (month for (month, m) in self._partitions if m == metric),
+            key=month_ordinal,
+        )
+        error = rank_error(self.k)
+        names = [f"p{q * 100:g}" for q in quantiles]
+        qs = np.asarray(quantiles, dtype=np.float64)
+        if bounds:
+            names += [f"{name}_low" for name in names] + [
+                f"{name}_high" for name in names
+            ]
+            qs = np.concatenate([qs, np.clip(qs - error, 0, 1), np.clip(qs + error, 0, 1)])
+        rows = []
+        for month in months:
+            sketch = self.team_sketch(month, metric)
+            rows.append([*sketch.quantiles(qs), sketch.n])
+        result = pd.DataFrame(
+            rows, index=pd.Index(months, name="Mês/Ano"), columns=[*names, "n"]
+        )
+        result.attrs["rank_error"] = error
+        return result
@@ -0,0 +1,254 @@
+import contextlib
+import os
+import pickle
+import threading
+
+import pandas as pd
+
+from produtiva.frames import create_df_tamanho_task, create_df_tasks, create_df_tp
+from produtiva.integrity import check_integrity
+from produtiva.migrations import migrate
+from produtiva.paths import BIN_DIR
+from produtiva.schema import SCHEMA_VERSION, SCHEMAS, enforce_schema
+from produtiva.snapshot import load_snapshot, meta_path, save_snapshot
+from produtiva.tiering import archive
+
+SNAPSHOT_FORMAT = os.environ.get("PRODUTIVA_SNAPSHOT_FORMAT", "columnar")
+WRITE_LOCK = threading.RLock()
+
+DEFAULT_WORK_DAYS = {
+    "04/24": 22,
+    "05/24": 22,
+    "06/24": 20,
+    "07/24": 23,
+    "08/24": 22,
+    "09/24": 21,
+    "10/24": 23,
+    "11/24": 20,
+    "12/24": 15,
+    "01/25": 20,
+}
+
+
+def columnar_name(filename: str):
+    """
+    Returns the snapshot name of a dataset file stored in the columnar format.
+
+    Parameters:
+    filename (str): A file name such as 'df_tp.pkl'.
+
+    Returns:
+    str or None: The dataset name, or None for files stored as pickles.
+    """
+    name, extension = os.path.splitext(filename)
+    if SNAPSHOT_FORMAT == "columnar" and extension == ".pkl" and name in SCHEMAS:
+        return name
+    return None
+
+
+def save_to_binary(filename: str, data: object, durable: bool = False) -> None:
+    """
+    Saves data to a binary file in the 'bin' directory.
+
+    Dataset frames are written as columnar snapshots (see `produtiva.snapshot`) unless
+    PRODUTIVA_SNAPSHOT_FORMAT=pickle. Anything else is pickled to a temporary file that
+    then replaces the target, so readers never see a partially written file. Frames
+    are stamped with the schema version they follow, SCHEMA_VERSION unless their
+    `attrs` say otherwise. Writes hold WRITE_LOCK, so they never land between the
+    read and the write-back of an archiving `load_datasets`.
+
+    Parameters:
+    filename (str): The name of the file to save the data.
+    data (object): The data to be saved.
+    durable (bool): Whether to fsync the file before replacing the target, so the
+        save survives a crash once this function returns.
+
+    Returns:
+    None
+
+    Complexity:
+    Time: O(n), where n is the size of the data.
+    Space: O(1), constant space usage aside from the file storage.
+    """
+    with WRITE_LOCK:
+        name = columnar_name(filename)
+        if isinstance(data, pd.DataFrame):
+            data.attrs.setdefault("schema_version", SCHEMA_VERSION)
+            if name is not None:
+                save_snapshot(BIN_DIR, name, data, durable=durable)
+                return
+
+        os.makedirs(BIN_DIR, exist_ok=True)
+        filepath = os.path.join(BIN_DIR, filename)
+        temp_path = f"{filepath}.tmp"
+        with open(temp_path, "wb") as file:
+            pickle.dump(data, file)
+            if durable:
+                file.flush()
+                os.fsync(file.fileno())
+        os.replace(temp_path, filepath)
+
+
+def load_from_binary(filename: str, default_data: object) -> object:
+    """
+    Loads data from a binary file in the 'bin' directory, returning default data if the file does not exist or cannot be read.
+
+    Dataset frames are loaded from their columnar snapshot, memory-mapped. A frame
+    that only exists as a pickle is converted on its first load: it is written as a
+    snapshot with the schema types, and the pickle is kept as '<name>.pkl.bak'. The
+    conversion keeps the pickle's schema version, so the frame is still migrated.
+
+    Parameters:
+    filename (str): The name of the file to load the data from.
+    default_data (object): The default data to return if loading fails.
+
+    Returns:
+    object: The loaded data or the default data.
+
+    Complexity:
+    Time: O(c) for a snapshot of c columns, O(n) for a pickle of size n.
+    Space: O(1) for a snapshot aside from the pages read, O(n) for a pickle.
+    """
+    name = columnar_name(filename)
+    if name is not None:
+        data = load_snapshot(BIN_DIR, name)
+        if data is not None:
+            return data
+
+    filepath = os.path.join(BIN_DIR, filename)
+    if os.path.exists(filepath):
+        with open(filepath, "rb") as file:
+            try:
+                data = pickle.load(file)
+            except (EOFError, pickle.UnpicklingError):
+                return default_data
+        if data is None:
+            return default_data
+        if name is not None and isinstance(data, pd.DataFrame):
+            version = data.attrs.get("schema_version", 0)
+            save_snapshot(
+                BIN_DIR,
+                name,
+                enforce_schema(data, name),
+                durable=True,
+                attrs={**data.attrs, "schema_version": version},
+            )
+            os.replace(filepath, f"{filepath}.bak")
+            return load_snapshot(BIN_DIR, name)
+        return data
+    return default_data
+
+
+def dataset_path(filename: str) -> str:
+    """
+    Returns the file that is rewritten whenever a dataset is saved.
+
+    Parameters:
+    filename (str): A file name such as 'df_tp.pkl'.
+
+    Returns:
+    str: The snapshot header for columnar datasets, the pickle otherwise.
+    """
+    name = columnar_name(filename)
+    if name is not None:
+        return meta_path(BIN_DIR, name)
+    return os.path.join(BIN_DIR, filename)
+
+
+DATASET_FILES = {
+    "df_tp": "df_tp.pkl",
+    "df_tasks": "df_tasks.pkl",
+    "df_tamanho": "df_tamanho.pkl",
+    "work_days_dict": "work_days_dict.pkl",
+}
+
+
+def data_version() -> tuple:
+    """
+    Returns a cheap fingerprint of the persisted datasets, based on file metadata only.
+
+    The fingerprint changes whenever any dataset file is rewritten, so it can key caches
+    of anything derived from the stored data without reading the files.
+
+    Returns:
+    tuple: One (mtime_ns, size) pair per dataset file, or None for missing files.
+
+    Complexity:
+    Time: O(1), one stat call per dataset file.
+    Space: O(1), constant space usage.
+    """
+    version = []
+    for filename in DATASET_FILES.values():
+        try:
+            stat = os.stat(dataset_path(filename))
+            version.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            version.append(None)
+    return tuple(version)
+
+
+def load_datasets(names=None, archive_cold: bool = False) -> dict:
+    """
+    Loads the persisted datasets, migrated and checked, filling missing ones with the
+    same defaults as the app.
+
+    Frames saved under an older schema version are migrated (see
+    `produtiva.migrations`) and persisted back, so the migration only runs once. With
+    `archive_cold`, and when all three frames are loaded, the years older than the hot
+    window are moved to cold segments (see `produtiva.tiering`) and the hot frames
+    persisted back, so the session only holds the recent months. Only the app's writer
+    path archives; read-only loaders such as `produtiva.server` leave the files as they
+    are. The read, the archive and the write-back hold WRITE_LOCK, so a save from the
+    write-behind persister cannot land in between and be overwritten. The loaded
+    frames are then checked by `produtiva.integrity.check_integrity`.
+
+    Parameters:
+    names (iterable, optional): Keys of DATASET_FILES to load; all when omitted. The
+        defaults of the task frames are built from "df_tp", which is loaded whenever
+        one of them is requested.
+    archive_cold (bool): Whether to move the years older than the hot window to the
+        cold segments.
+
+    Returns:
+    dict: The requested keys among the frames "df_tp", "df_tasks", "df_tamanho" and
+    the "work_days_dict" mapping, plus "issues", the list of integrity problems.
+
+    Complexity:
+    Time: O(n), where n is the total size of the stored data, plus O(n log n) for a
+    frame being migrated.
+    Space: O(n), for the loaded data.
+    """
+    names = set(DATASET_FILES if names is None else names)
+    if names & set(SCHEMAS):
+        names.add("df_tp")
+    archive_cold = archive_cold and set(SCHEMAS) <= names
+    with WRITE_LOCK if archive_cold else contextlib.nullcontext():
+        loaded = {
+            name: load_from_binary(DATASET_FILES[name], None)
+            for name in SCHEMAS
+            if name in names
+        }
+        for name, df in loaded.items():
+            if df is not None and df.empty and name != "df_tp":
+                loaded[name] = None
+        for name in migrate(loaded):
+            save_to_binary(DATASET_FILES[name], loaded[name], durable=True)
+        if archive_cold:
+            for name in archive(loaded):
+                save_to_binary(DATASET_FILES[name], loaded[name], durable=True)
+
+    frames = dict(loaded)
+    if frames.get("df_tp") is None and "df_tp" in names:
+        frames["df_tp"] = create_df_tp()
+    if "df_tasks" in names and frames["df_tasks"] is None:
+        frames["df_tasks"] = create_df_tasks(frames["df_tp"])
+    if "df_tamanho" in names and frames["df_tamanho"] is None:
+        frames["df_tamanho"] = create_df_tamanho_task(frames["df_tp"])
+    for name, df in frames.items():
+        enforce_schema(df, name)
+    frames["issues"] = check_integrity(frames)
+    if "work_days_dict" in names:
+        frames["work_days_dict"] = load_from_binary(
+            DATASET_FILES["work_days_dict"], dict(DEFAULT_WORK_DAYS)
+        )
+    return frames
@@ -0,0 +1,179 @@
+"""
+Synthetic Produtiva datasets and alert rules for the tests and benchmarks.
+
+Each person gets a month-aligned df_tp, df_tasks and df_tamanho with the same columns
+as the app, plus a work_days_dict. Values follow simple but realistic shapes: TP
+varies around a per-person pace, business days come from the weekday count of each
+month minus a few holidays, and P/M/G sizes are Poisson with P > M > G.
+"""
+
+import numpy as np
+import pandas as pd
+
+from produtiva.alerts import OPERATORS
+from produtiva.months import ordinal_to_month
+
+FIRST_MONTH = 2000 * 12
+MAX_MONTHS = 1200
+TP_IDEAL_22 = 15
+SIZE_MEANS = {"Task P": 4.0, "Task M": 2.0, "Task G": 0.6}
+
+
+def month_labels(n_months: int) -> list:
+    """
+    Returns `n_months` consecutive 'MM/YY' labels starting at 01/00.
+
+    Parameters:
+    n_months (int): Number of months, at most 1200 (the 'MM/YY' range).
+
+    Returns:
+    list: The month labels in chronological order.
+    """
+    if not 1 <= n_months <= MAX_MONTHS:
+        raise ValueError(f"n_months must be between 1 and {MAX_MONTHS}")
+    return [ordinal_to_month(FIRST_MONTH + i) for i in range(n_months)]
+
+
+def business_days(n_months: int, rng) -> np.ndarray:
+    """
+    Returns plausible business days per month: weekdays minus 0 to 2 holidays.
+
+    Parameters:
+    n_months (int): Number of months starting at 01/00.
+    rng (np.random.Generator): Random generator.
+
+    Returns:
+    np.ndarray: Business days per month.
+    """
+    starts = np.arange(
+        np.datetime64("2000-01"), np.datetime64("2000-01") + n_months + 1
+    ).astype("datetime64[D]")
+    weekdays = np.busday_count(starts[:-1], starts[1:])
+    return weekdays - rng.integers(0, 3, size=n_months)
+
+
+def generate_person(n_months: int, rng) -> dict:
+    """
+    Generates the datasets of a single person.
+
+    Parameters:
+    n_months (int): Number of months of history.
+    rng (np.random.Generator): Random generator.
+
+    Returns:
+    dict: "df_tp", "df_tasks", "df_tamanho" and "work_days_dict", shaped like the app's.
+    """
+    months = month_labels(n_months)
+    days = business_days(n_months, rng)
+    pace = rng.uniform(0.6, 1.4)
+    tp_adaptado = rng.poisson(TP_IDEAL_22 * pace, size=n_months)
+
+    df_tp = pd.DataFrame(
+        {
+            "Mês/Ano": months,
+            "TP Adaptado (22 Dias Úteis)": tp_adaptado,
+            "TP Ideal (22 Dias Úteis)": np.full(n_months, TP_IDEAL_22),
+            "Dias Úteis": days,
+        }
+    )
+    df_tp["TP Ajustado (Dias Úteis Reais)"] = tp_adaptado * (22 / days)
+    df_tp["TP Ideal Ajustado (Dias Úteis Reais)"] = TP_IDEAL_22 * (days / 22)
+
+    revisadas = rng.poisson(4 * pace, size=n_months)
+    df_tasks = pd.DataFrame(
+        {
+            "Mês/Ano": months,
+            "TP Tasks Revisadas": revisadas,
+            "TP Adaptado Tasks Revisadas": revisadas + rng.poisson(2, size=n_months),
+        }
+    )
+    df_tp["TP Adaptado (22 Dias Úteis) + Revisão Task"] = tp_adaptado + revisadas
+    df_tp["TP Ajustado (Dias Úteis Reais) + Revisão Task"] = (
+        df_tp["TP Ajustado (Dias Úteis Reais)"] + revisadas
+    )
+
+    df_tamanho = pd.DataFrame({"Mês/Ano": months})
+    for column, mean in SIZE_MEANS.items():
+        df_tamanho[column] = rng.poisson(mean * pace, size=n_months)
+
+    return {
+        "df_tp": df_tp,
+        "df_tasks": df_tasks,
+        "df_tamanho": df_tamanho,
+        "work_days_dict": dict(zip(months, days.tolist())),
+    }
+
+
+def generate_team(n_people: int, n_months: int, seed: int = 0) -> dict:
+    """
+    Generates the datasets of a whole team.
+
+    Parameters:
+    n_people (int): Number of people (1 to 1,000 in the benchmark grid).
+    n_months (int): Number of months of history per person (12 to 1,200).
+    seed (int): Seed of the random generator, for reproducible datasets.
+
+    Returns:
+    dict: Person label -> datasets as returned by `generate_person`.
+    """
+    rng = np.random.default_rng(seed)
+    return {
+        f"Pessoa {i + 1:04d}": generate_person(n_months, rng) for i in range(n_people)
+    }
+
+
+def stack_team(team: dict, dataset: str) -> pd.DataFrame:
+    """
+    Concatenates one dataset of every person into a long frame with a "Pessoa" column.
+
+    Parameters:
+    team (dict): Output of `generate_team`.
+    dataset (str): One of "df_tp", "df_tasks" or "df_tamanho".
+
+    Returns:
+    pd.DataFrame: The stacked frame.
+    """
+    return pd.concat(
+        [data[dataset].assign(Pessoa=person) for person, data in team.items()],
+        ignore_index=True,
+    )
+
+
+RULE_METRICS = (
+    "TP Adaptado (22 Dias Úteis)",
+    "TP Ideal (22 Dias Úteis)",
+    "TP Ajustado (Dias Úteis Reais)",
+    "TP Ideal Ajustado (Dias Úteis Reais)",
+    "TP Tasks Revisadas",
+    "TP Adaptado Tasks Revisadas",
+)
+
+
+def generate_rules(n_rules: int, seed: int = 0) -> list:
+    """
+    Returns random alert rules comparing RULE_METRICS with thresholds or with a
+    multiple of another metric, over windows of 1 to 3 months.
+
+    Parameters:
+    n_rules (int): Number of rules.
+    seed (int): Seed of the random generator.
+
+    Returns:
+    list: Rule dicts accepted by `produtiva.alerts.AlertEngine`.
+    """
+    rng = np.random.default_rng(seed)
+    rules = []
+    for i in range(n_rules):
+        metric, reference = rng.choice(RULE_METRICS, size=2, replace=False)
+        rule = {
+            "name": f"regra_{i:05d}",
+            "metric": str(metric),
+            "op": OPERATORS[rng.integers(len(OPERATORS))],
+            "months": int(rng.integers(1, 4)),
+        }
+        if rng.random() < 0.5:
+            rule.update(reference=str(reference), factor=float(rng.uniform(0.3, 1.5)))
+        else:
+            rule["value"] = float(rng.uniform(0, 25))
+        rules.append(rule)
+    return rules
@@ -0,0 +1,374 @@
+"""
+Hot/cold tiering of the dataset frames.
+
+The persisted frames and the session keep only the hot window: the calendar years
+that overlap the last HOT_MONTHS months, so the hot frames always hold the whole
+current year. Older years are compacted into one segment per dataset and year under
+`bin/cold/<dataset>/<year>.seg` when the app loads the datasets (see the
+`archive_cold` flag of `produtiva.storage.load_datasets`), and are read back only when a range query, the
+year-over-year view or a full export reaches them. Archived months are read-only:
+the app does not write them, and `archive` keeps the archived row of a month that
+also reaches it from a frame.
+
+A segment is a one-line JSON header followed by the compressed rows (stdlib zlib or
+lzma). The header holds the codec, the months stored, the schema version and the
+SHA-256 of the uncompressed payload, which is verified on every read. Segments are
+written to a temporary file that then replaces the target, like the other files in
+'bin'. Decoded segments are cached per file version, so repeated range queries only
+pay for the concatenation.
+
+Environment:
+    PRODUTIVA_HOT_MONTHS   months kept hot (default 12); 0 disables tiering
+    PRODUTIVA_COLD_CODEC   "zlib" (default) or "lzma"
+"""
+
+import hashlib
+import io
+import json
+import lzma
+import os
+import zlib
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from produtiva.migrations import migrate
+from produtiva.months import month_ordinal, ordinal_to_month
+from produtiva.paths import BIN_DIR
+from produtiva.schema import MONTH_COLUMN, SCHEMA_VERSION, SCHEMAS, enforce_schema
+from produtiva.window import month_index
+
+HOT_MONTHS = int(os.environ.get("PRODUTIVA_HOT_MONTHS", "12"))
+COLD_CODEC = os.environ.get("PRODUTIVA_COLD_CODEC", "zlib")
+COLD_DIR = "cold"
+SEGMENT_SUFFIX = ".seg"
+SEGMENT_FORMAT = 1
+CODECS = {
+    "zlib": (lambda data: zlib.compress(data, 9), zlib.decompress),
+    "lzma": (lzma.compress, lzma.decompress),
+}
+
+
+class SegmentError(ValueError):
+    """
+    Raised when a cold segment is truncated, corrupted or in an unknown format.
+    """
+
+
+def cold_dir(dataset: str) -> str:
+    return os.path.join(BIN_DIR, COLD_DIR, dataset)
+
+
+def segment_path(dataset: str, year: int) -> str:
+    return os.path.join(cold_dir(dataset), f"{year}{SEGMENT_SUFFIX}")
+
+
+def _ordinals(df) -> np.ndarray:
+    return np.fromiter(
+        (month_ordinal(m) for m in df[MONTH_COLUMN].astype(object)),
+        dtype=np.int64,
+        count=len(df),
+    )
+
+
+def hot_start(months, hot_months: int = HOT_MONTHS):
+    """
+    Returns the ordinal of the first hot month: January of the year that holds the
+    month `hot_months - 1` months before the latest one.
+
+    Parameters:
+    months (iterable): 'MM/YY' labels of df_tp.
+    hot_months (int): Months kept hot; 0 disables tiering.
+
+    Returns:
+    int or None: A month ordinal, or None when tiering is disabled or there are no months.
+    """
+    ordinals = [month_ordinal(m) for m in months]
+    if hot_months <= 0 or not ordinals:
+        return None
+    return (max(ordinals) - hot_months + 1) // 12 * 12
+
+
+def write_segment(dataset: str, year: int, df: pd.DataFrame, codec: str = None) -> int:
+    """
+    Writes the rows of one year of a dataset as a compressed, checksummed segment.
+
+    Parameters:
+    dataset (str): One of "df_tp", "df_tasks" or "df_tamanho".
+    year (int): The year in YYYY format.
+    df (pd.DataFrame): The year's rows, following the dataset schema.
+    codec (str, optional): "zlib" or "lzma"; COLD_CODEC when omitted.
+
+    Returns:
+    int: The size of the written segment in bytes.
+
+    Complexity:
+    Time: O(n), for n rows (serialization and compression).
+    Space: O(n), for the encoded payload.
+    """
+    codec = codec or COLD_CODEC
+    compress, _ = CODECS[codec]
+    df = enforce_schema(df.reset_index(drop=True), dataset)
+    payload = df.to_json(orient="split", index=False, double_precision=15).encode()
+    header = {
+        "format": SEGMENT_FORMAT,
+        "dataset": dataset,
+        "year": year,
+        "codec": codec,
+        "rows": len(df),
+        "months": df[MONTH_COLUMN].astype(str).tolist(),
+        "schema_version": int(df.attrs.get("schema_version", SCHEMA_VERSION)),
+        "sha256": hashlib.sha256(payload).hexdigest(),
+    }
+    data = (json.dumps(header, ensure_ascii=False) + "\n").encode() + compress(payload)
+    os.makedirs(cold_dir(dataset), exist_ok=True)
+    path = segment_path(dataset, year)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
+    return len(data)
+
+
+def _split(data: bytes) -> tuple:
+    newline = data.find(b"\n")
+    if newline < 0:
+        raise SegmentError("segment has no header")
+    header = json.loads(data[:newline])
+    if header.get("format") != SEGMENT_FORMAT or header.get("codec") not in CODECS:
+        raise SegmentError(f"unsupported segment {header.get('format')}/{header.get('codec')}")
+    return header, data[newline + 1 :]
+
+
+@lru_cache(maxsize=256)
+def _read_header(path: str, version: tuple) -> dict:
+    with open(path, "rb") as file:
+        return _split(file.readline())[0]
+
+
+@lru_cache(maxsize=64)
+def _read_segment(path: str, version: tuple) -> pd.DataFrame:
+    with open(path, "rb") as file:
+        header, compressed = _split(file.read())
+    try:
+        payload = CODECS[header["codec"]][1](compressed)
+    except (zlib.error, lzma.LZMAError) as error:
+        raise SegmentError(f"{path}: {error}") from error
+    if hashlib.sha256(payload).hexdigest() != header["sha256"]:
+        raise SegmentError(f"{path}: checksum mismatch")
+    df = pd.read_json(
+        io.StringIO(payload.decode()), orient="split", dtype=False, convert_dates=False
+    )
+    if df.empty:
+        df = pd.DataFrame(columns=df.columns)
+    df.attrs["schema_version"] = header["schema_version"]
+    frames = {header["dataset"]: df}
+    migrate(frames)
+    return enforce_schema(frames[header["dataset"]], header["dataset"])
+
+
+def _version(path: str) -> tuple:
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def read_segment(dataset: str, year: int) -> pd.DataFrame:
+    """
+    Reads one cold segment, verifying its checksum and migrating it when older.
+
+    Parameters:
+    dataset (str): One of "df_tp", "df_tasks" or "df_tamanho".
+    year (int): The year in YYYY format.
+
+    Returns:
+    pd.DataFrame: The year's rows. The frame is cached and shared; do not modify it.
+
+    Raises:
+    SegmentError: When the segment is corrupted or in an unknown format.
+
+    Complexity:
+    Time: O(n) on first read, for n rows; O(1) while the file is unchanged.
+    Space: O(n), for the cached frame.
+    """
+    path = segment_path(dataset, year)
+    return _read_segment(path, _version(path))
+
+
+def cold_years(dataset: str) -> list:
+    """
+    Returns the years archived for a dataset, in ascending order.
+    """
+    try:
+        names = os.listdir(cold_dir(dataset))
+    except FileNotFoundError:
+        return []
+    return sorted(
+        int(name[: -len(SEGMENT_SUFFIX)])
+        for name in names
+        if name.endswith(SEGMENT_SUFFIX) and name[: -len(SEGMENT_SUFFIX)].isdigit()
+    )
+
+
+def cold_months(dataset: str) -> list:
+    """
+    Returns the archived months of a dataset, read from the segment headers only.
+
+    Complexity:
+    Time: O(s) header reads on first use, O(s) stat calls afterwards, for s segments.
+    Space: O(m), for the month labels.
+    """
+    months = []
+    for year in cold_years(dataset):
+        path = segment_path(dataset, year)
+        months.extend(_read_header(path, _version(path))["months"])
+    return months
+
+
+def cold_version() -> tuple:
+    """
+    Returns a fingerprint of every cold segment, from file metadata only.
+
+    Complexity:
+    Time: O(s), one stat call per segment.
+    Space: O(s), for the fingerprint.
+    """
+    return tuple(
+        (dataset, year, _version(segment_path(dataset, year)))
+        for dataset in SCHEMAS
+        for year in cold_years(dataset)
+    )
+
+
+def archive(frames: dict, hot_months: int = None, codec: str = None) -> list:
+    """
+    Moves the rows older than the hot window into cold segments, in place.
+
+    The window is computed from df_tp, so the three frames keep the same months. Rows
+    of a year that already has a segment are merged into it, keeping the archived row
+    of a month stored in both, so archiving is idempotent, safe to repeat on every
+    load, and never overwrites archived values.
+
+    Parameters:
+    frames (dict): Dataset name -> frame, as loaded; None values are skipped.
+    hot_months (int, optional): Months kept hot, 0 disabling tiering; HOT_MONTHS when
+        omitted.
+    codec (str, optional): "zlib" or "lzma"; COLD_CODEC when omitted.
+
+    Returns:
+    list: Names of the datasets that lost rows and should be persisted back.
+
+    Complexity:
+    Time: O(n), for n rows, plus O(c) to merge the c rows of touched segments.
+    Space: O(c + n), for the merged years.
+    """
+    df_tp = frames.get("df_tp")
+    if df_tp is None:
+        return []
+    start = hot_start(
+        df_tp[MONTH_COLUMN].astype(str), HOT_MONTHS if hot_months is None else hot_months
+    )
+    if start is None:
+        return []
+    archived = []
+    for name, df in frames.items():
+        if df is None or name not in SCHEMAS or df.empty:
+            continue
+        ordinals = _ordinals(df)
+        cold = ordinals < start
+        if not cold.any():
+            continue
+        years = ordinals // 12
+        for year in np.unique(years[cold]):
+            rows = df.loc[cold & (years == year)]
+            if year in cold_years(name):
+                kept = read_segment(name, int(year))
+                # Archived rows are read-only: a frame row for an archived month can
+                # only come from a stale or invalid write, so it is dropped.
+                archived_months = kept[MONTH_COLUMN].astype(object).tolist()
+                rows = rows.loc[~rows[MONTH_COLUMN].astype(object).isin(archived_months)]
+                if rows.empty:
+                    continue
+                rows = pd.concat([kept, rows], ignore_index=True)
+                order = np.argsort(_ordinals(rows), kind="stable")
+                rows = rows.iloc[order]
+            write_segment(name, int(year), rows, codec)
+        hot = df.loc[~cold].reset_index(drop=True)
+        hot.attrs = dict(df.attrs)
+        frames[name] = hot
+        archived.append(name)
+    return archived
+
+
+def select_range(dataset: str, hot_df, start: str = None, end: str = None):
+    """
+    Returns the rows of [start, end] from the hot frame and, when needed, the cold tier.
+
+    Segments are read only for the years of the range that precede the hot frame.
+
+    Parameters:
+    dataset (str): One of "df_tp", "df_tasks" or "df_tamanho".
+    hot_df (pd.DataFrame or None): The dataset's hot frame.
+    start (str, optional): First month in 'MM/YY' format; the oldest when omitted.
+    end (str, optional): Last month in 'MM/YY' format; the latest when omitted.
+
+    Returns:
+    pd.DataFrame or None: The rows inside the range, in chronological order, with a
+    fresh RangeIndex; None if `hot_df` is None.
+
+    Complexity:
+    Time: O(log h + k), for h hot rows and k rows in the range, plus the decoding of
+    the touched segments on their first read.
+    Space: O(k), for the concatenated range.
+    """
+    if hot_df is None:
+        return None
+    lo = month_ordinal(start) if start else None
+    hi = month_ordinal(end) if end else None
+    index = month_index(hot_df)
+    first_hot = int(index.ordinals[0]) if len(index.ordinals) else None
+    parts = []
+    for year in cold_years(dataset):
+        if first_hot is not None and year * 12 >= first_hot:
+            continue
+        if lo is not None and (year + 1) * 12 <= lo or hi is not None and year * 12 > hi:
+            continue
+        segment = read_segment(dataset, year)
+        ordinals = _ordinals(segment)
+        keep = ordinals < first_hot if first_hot is not None else np.ones(len(segment), bool)
+        if lo is not None:
+            keep &= ordinals >= lo
+        if hi is not None:
+            keep &= ordinals <= hi
+        parts.append(segment.loc[keep])
+    if first_hot is not None:
+        parts.append(
+            index.select(
+                hot_df,
+                start or ordinal_to_month(first_hot),
+                end or ordinal_to_month(int(index.ordinals[-1])),
+            )
+        )
+    if not parts:
+        return hot_df.copy()
+    if len(parts) == 1:
+        return parts[0].reset_index(drop=True)
+    return enforce_schema(pd.concat(parts, ignore_index=True), dataset)
+
+
+def full_frames(frames: dict) -> dict:
+    """
+    Returns the datasets with their cold years prepended; see `select_range`.
+
+    Parameters:
+    frames (dict): Dataset name -> hot frame.
+
+    Returns:
+    dict: The same keys, with the full history of every dataset frame.
+    """
+    return {
+        name: select_range(name, df) if name in SCHEMAS else df
+        for name, df in frames.items()
+    }
@@ -0,0 +1,249 @@
+"""
+Weekly tracking and resampling between weeks, months and quarters.
+
+Weeks are keyed by ISO week ('2024-W15'). A week that crosses a month boundary is
+stored as one segment per month, so every row belongs to exactly one week and one
+month: summing segments gives exact weekly totals, and summing them by month gives
+exactly the monthly columns of `create_df_tp`, business days included. Business days
+follow the monthly count, which (like workalendar's working-days delta used by
+`calculate_business_days`) does not count the first day of each month.
+
+Every granularity shares the df_tp columns: "TP Adaptado (22 Dias Úteis)" and
+"TP Ideal Ajustado (Dias Úteis Reais)" are totals for the period, while
+"TP Ajustado (Dias Úteis Reais)" and "TP Ideal (22 Dias Úteis)" are rates over 22
+business days, so the same chart renders weeks, months or quarters. Resampling
+factorizes the period keys and sums with `np.bincount`, without Python loops.
+"""
+
+import numpy as np
+import pandas as pd
+
+from produtiva.business_days import business_day_flags
+from produtiva.months import format_month_year, parse_month_year
+from produtiva.schema import MONTH_COLUMN, enforce_schema
+
+WEEK_COLUMN = "Semana"
+QUARTER_COLUMN = "Trimestre"
+PER_DAY_COLUMN = "TP por Dia Útil"
+TP_IDEAL_22 = 15
+GRANULARITIES = {
+    "week": WEEK_COLUMN,
+    "month": MONTH_COLUMN,
+    "quarter": QUARTER_COLUMN,
+}
+
+
+def quarter_label(month_year: str) -> str:
+    """
+    Returns the quarter of a month, in the cube's 'Qn/YY' format.
+
+    Parameters:
+    month_year (str): Month in 'MM/YY' format.
+
+    Returns:
+    str: E.g. 'Q2/24' for '05/24'.
+    """
+    year, month = parse_month_year(month_year)
+    return f"Q{(month - 1) // 3 + 1}/{str(year)[-2:]}"
+
+
+def period_frame(key_column: str, keys, tp, days, ideal_22) -> pd.DataFrame:
+    """
+    Builds a frame with the df_tp columns from period totals.
+
+    Parameters:
+    key_column (str): Name of the period column, e.g. WEEK_COLUMN.
+    keys (array-like): Period labels.
+    tp (array-like): "TP Adaptado (22 Dias Úteis)" total of each period.
+    days (array-like): Business days of each period.
+    ideal_22 (array-like): "TP Ideal (22 Dias Úteis)" of each period.
+
+    Returns:
+    pd.DataFrame: The period column, the four TP columns, "Dias Úteis" and
+    PER_DAY_COLUMN, derived as in `create_df_tp`.
+
+    Complexity:
+    Time: O(n), for n periods.
+    Space: O(n), for the frame.
+    """
+    tp = np.asarray(tp)
+    days = np.asarray(days)
+    ideal_22 = np.asarray(ideal_22)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        per_day = np.where(days > 0, tp / days, np.nan)
+        tp_ajustado = np.where(days > 0, tp * (22 / days), np.nan)
+    return pd.DataFrame(
+        {
+            key_column: keys,
+            "TP Adaptado (22 Dias Úteis)": tp,
+            "TP Ideal (22 Dias Úteis)": ideal_22,
+            "Dias Úteis": days,
+            "TP Ajustado (Dias Úteis Reais)": tp_ajustado,
+            "TP Ideal Ajustado (Dias Úteis Reais)": ideal_22 * (days / 22),
+            PER_DAY_COLUMN: per_day,
+        }
+    )
+
+
+def week_segments(start: str, end: str) -> pd.DataFrame:
+    """
+    Lists the week segments of a range of months with their business days.
+
+    Parameters:
+    start (str): First month, in 'MM/YY' format.
+    end (str): Last month, in 'MM/YY' format, inclusive.
+
+    Returns:
+    pd.DataFrame: WEEK_COLUMN, MONTH_COLUMN and "Dias Úteis", one row per (ISO week,
+    month) pair, in chronological order.
+
+    Complexity:
+    Time: O(d + h), for d days in the range and h holidays.
+    Space: O(d), for the day arrays.
+    """
+    (first_year, first_month), (last_year, last_month) = map(
+        parse_month_year, (start, end)
+    )
+    days = np.arange(
+        np.datetime64(f"{first_year:04d}-{first_month:02d}", "M").astype("datetime64[D]"),
+        (np.datetime64(f"{last_year:04d}-{last_month:02d}", "M") + 1).astype(
+            "datetime64[D]"
+        ),
+    )
+    index = pd.DatetimeIndex(days)
+    iso = index.isocalendar()
+    month_ordinals = index.year.to_numpy() * 12 + index.month.to_numpy() - 1
+    week_ordinals = iso["year"].to_numpy(np.int64) * 100 + iso["week"].to_numpy(np.int64)
+    business = business_day_flags(days) & (index.day.to_numpy() != 1)
+
+    # Days are consecutive, so a segment starts wherever the week or the month changes.
+    starts = np.flatnonzero(
+        np.r_[True, (np.diff(week_ordinals) != 0) | (np.diff(month_ordinals) != 0)]
+    )
+    counts = np.add.reduceat(business.astype(np.int64), starts)
+    return pd.DataFrame(
+        {
+            WEEK_COLUMN: [
+                f"{w // 100}-W{w % 100:02d}" for w in week_ordinals[starts]
+            ],
+            MONTH_COLUMN: [
+                format_month_year(o // 12, o % 12 + 1) for o in month_ordinals[starts]
+            ],
+            "Dias Úteis": counts,
+        }
+    )
+
+
+def create_df_weeks(start: str, end: str, ideal_22: int = TP_IDEAL_22) -> pd.DataFrame:
+    """
+    Creates an empty weekly dataset for a range of months.
+
+    Parameters:
+    start (str): First month, in 'MM/YY' format.
+    end (str): Last month, in 'MM/YY' format, inclusive.
+    ideal_22 (int): "TP Ideal (22 Dias Úteis)" of every segment.
+
+    Returns:
+    pd.DataFrame: The segments of `week_segments` with the df_tp columns, TP zero.
+
+    Complexity:
+    Time: O(d + h), for d days in the range and h holidays.
+    Space: O(w), for w segments.
+    """
+    segments = week_segments(start, end)
+    df_weeks = period_frame(
+        WEEK_COLUMN,
+        segments[WEEK_COLUMN],
+        np.zeros(len(segments), dtype=np.int64),
+        segments["Dias Úteis"].to_numpy(),
+        np.full(len(segments), ideal_22),
+    )
+    df_weeks.insert(1, MONTH_COLUMN, segments[MONTH_COLUMN])
+    return df_weeks
+
+
+def set_week_tp(df_weeks: pd.DataFrame, week: str, tp: int) -> pd.DataFrame:
+    """
+    Records the TP of a week, split across its month segments by business days.
+
+    The split uses largest remainders, so the segments hold whole tasks that add up
+    to `tp` exactly.
+
+    Parameters:
+    df_weeks (pd.DataFrame): Weekly dataset, as created by `create_df_weeks`.
+    week (str): ISO week key, e.g. '2024-W15'.
+    tp (int): Tasks delivered in the week.
+
+    Returns:
+    pd.DataFrame: The same frame, updated in place.
+
+    Complexity:
+    Time: O(n) to locate the week's segments, O(1) to update them.
+    Space: O(1), at most two segments per week.
+    """
+    rows = np.flatnonzero(df_weeks[WEEK_COLUMN].to_numpy() == week)
+    if not len(rows):
+        raise KeyError(f"week {week} is not in the weekly dataset")
+    days = df_weeks["Dias Úteis"].to_numpy()[rows].astype(np.float64)
+    share = tp * days / days.sum() if days.sum() else np.full(len(rows), tp / len(rows))
+    split = np.floor(share).astype(np.int64)
+    split[np.argsort(split - share)[: tp - split.sum()]] += 1
+
+    derived = period_frame(
+        WEEK_COLUMN,
+        df_weeks[WEEK_COLUMN].to_numpy()[rows],
+        split,
+        df_weeks["Dias Úteis"].to_numpy()[rows],
+        df_weeks["TP Ideal (22 Dias Úteis)"].to_numpy()[rows],
+    )
+    columns = [c for c in derived.columns if c != WEEK_COLUMN]
+    df_weeks.loc[df_weeks.index[rows], columns] = derived[columns].to_numpy()
+    return df_weeks
+
+
+def resample(df: pd.DataFrame, granularity: str) -> pd.DataFrame:
+    """
+    Sums week segments or months into weeks, months or quarters.
+
+    Totals are summed and the 22-day rates re-derived from them, so resampling a
+    weekly dataset to months gives exactly the monthly columns, and months to
+    quarters gives the quarter totals of the metric cube.
+
+    Parameters:
+    df (pd.DataFrame): Weekly dataset (with WEEK_COLUMN and MONTH_COLUMN) or df_tp.
+    granularity (str): "week", "month" or "quarter". Monthly data cannot be split
+        into weeks.
+
+    Returns:
+    pd.DataFrame: One row per period in chronological order, keyed by the
+    granularity's column. Monthly results follow the df_tp schema types.
+
+    Complexity:
+    Time: O(n), for n rows.
+    Space: O(p), for p periods.
+    """
+    key_column = GRANULARITIES[granularity]
+    if granularity == "quarter":
+        keys = df[MONTH_COLUMN].astype(str).map(quarter_label)
+    elif key_column in df.columns:
+        keys = df[key_column].astype(str)
+    else:
+        raise ValueError(f"monthly data cannot be resampled to {granularity}")
+
+    # Rows are chronological (df_tp passes the integrity checks and week segments are
+    # generated in order), so periods come out in order of first appearance.
+    codes, labels = pd.factorize(keys, sort=False)
+    tp = np.bincount(codes, df["TP Adaptado (22 Dias Úteis)"].to_numpy(np.float64))
+    days = np.bincount(codes, df["Dias Úteis"].to_numpy(np.float64))
+    ideal_days = np.bincount(
+        codes,
+        df["TP Ideal (22 Dias Úteis)"].to_numpy(np.float64)
+        * df["Dias Úteis"].to_numpy(np.float64),
+    )
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ideal_22 = np.where(days > 0, ideal_days / days, np.nan)
+    result = period_frame(key_column, np.asarray(labels), tp, days, ideal_22)
+    if granularity == "month":
+        result = result.drop(columns=PER_DAY_COLUMN)
+        return enforce_schema(result, "df_tp")
+    return result
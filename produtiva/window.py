@@ -0,0 +1,151 @@
+import weakref
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+from produtiva.months import month_ordinal, ordinal_to_month
+
+_INDEX_CACHE = {}
+
+
+class MonthIndex:
+    """
+    Sorted month axis of a dataset frame, answering month-range queries by binary search.
+
+    The index keeps the integer month keys in ascending order together with the row
+    positions they came from, so a range query costs O(log n) for the two searches
+    plus O(k) to materialize the k rows inside the window.
+    """
+
+    def __init__(self, month_series):
+        ordinals = np.fromiter(
+            (month_ordinal(m) for m in month_series),
+            dtype=np.int64,
+            count=len(month_series),
+        )
+        self.positions = np.argsort(ordinals, kind="stable")
+        self.ordinals = ordinals[self.positions]
+        self.is_sorted = bool(
+            np.array_equal(self.positions, np.arange(len(self.positions)))
+        )
+
+    @property
+    def months(self) -> list:
+        """
+        Returns the 'MM/YY' labels of the index in chronological order.
+        """
+        return [ordinal_to_month(o) for o in self.ordinals]
+
+    def range_positions(self, start: str, end: str) -> tuple[int, int]:
+        """
+        Returns the half-open range of sorted positions covering [start, end].
+
+        Parameters:
+        start (str): First month of the window in 'MM/YY' format.
+        end (str): Last month of the window in 'MM/YY' format.
+
+        Returns:
+        tuple[int, int]: The bounds (lo, hi) into the sorted month axis.
+
+        Complexity:
+        Time: O(log n), two binary searches.
+        Space: O(1), constant space usage.
+        """
+        lo = bisect_left(self.ordinals, month_ordinal(start))
+        hi = bisect_right(self.ordinals, month_ordinal(end))
+        return lo, hi
+
+    def select(self, df, start: str, end: str):
+        """
+        Returns the rows of `df` whose month falls inside [start, end].
+
+        Parameters:
+        df (pd.DataFrame): The frame this index was built from.
+        start (str): First month of the window in 'MM/YY' format.
+        end (str): Last month of the window in 'MM/YY' format.
+
+        Returns:
+        pd.DataFrame: A copy of the rows inside the window, in chronological order.
+
+        Complexity:
+        Time: O(log n + k), where k is the number of rows inside the window.
+        Space: O(k), for the copied window.
+        """
+        lo, hi = self.range_positions(start, end)
+        if self.is_sorted:
+            return df.iloc[lo:hi].copy()
+        return df.iloc[self.positions[lo:hi]].copy()
+
+
+def month_index(df) -> MonthIndex:
+    """
+    Returns the MonthIndex of a frame, building it only the first time the frame is seen.
+
+    Upserts that add a month return a new frame, while in-place updates never change
+    the month column, so the index is cached per frame object.
+
+    Parameters:
+    df (pd.DataFrame): A frame containing a "Mês/Ano" column.
+
+    Returns:
+    MonthIndex: The sorted month index of the frame.
+
+    Complexity:
+    Time: O(n log n) on first use, O(1) afterwards.
+    Space: O(n), for the cached index.
+    """
+    key = id(df)
+    cached = _INDEX_CACHE.get(key)
+    if cached is not None and cached[0]() is df and len(cached[1].ordinals) == len(df):
+        return cached[1]
+
+    index = MonthIndex(df["Mês/Ano"])
+    ref = weakref.ref(df, lambda _: _INDEX_CACHE.pop(key, None))
+    _INDEX_CACHE[key] = (ref, index)
+    return index
+
+
+def select_window(df, start: str, end: str):
+    """
+    Returns the rows of `df` whose month falls inside [start, end].
+
+    Parameters:
+    df (pd.DataFrame or None): A frame containing a "Mês/Ano" column.
+    start (str): First month of the window in 'MM/YY' format.
+    end (str): Last month of the window in 'MM/YY' format.
+
+    Returns:
+    pd.DataFrame or None: The rows inside the window, or None if `df` is None.
+
+    Complexity:
+    Time: O(log n + k), where k is the number of rows inside the window.
+    Space: O(k), for the copied window.
+    """
+    if df is None:
+        return None
+    return month_index(df).select(df, start, end)
+
+
+def window_frames(df_tp, df_tasks, df_tamanho, start: str, end: str):
+    """
+    Restricts the three datasets to the same month window.
+
+    Parameters:
+    df_tp (pd.DataFrame): Productivity data
+    df_tasks (pd.DataFrame): Tasks data
+    df_tamanho (pd.DataFrame): Size data
+    start (str): First month of the window in 'MM/YY' format.
+    end (str): Last month of the window in 'MM/YY' format.
+
+    Returns:
+    tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]: The windowed frames.
+
+    Complexity:
+    Time: O(log n + k), where k is the number of rows inside the window.
+    Space: O(k), for the copied windows.
+    """
+    return (
+        select_window(df_tp, start, end),
+        select_window(df_tasks, start, end),
+        select_window(df_tamanho, start, end),
+    )
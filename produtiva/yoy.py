@@ -0,0 +1,90 @@
+"""
+Year-over-year comparison of the monthly metrics.
+
+`compute_yoy` reshapes the metric cube into a year × calendar month pivot once, and
+the tables and figures of every metric are slices of it: row y of the pivot is the
+year, column m the calendar month, and the deltas compare each cell with the same
+month of the previous year.
+"""
+
+import numpy as np
+import pandas as pd
+
+YOY_METRICS = (
+    "TP Adaptado (22 Dias Úteis)",
+    "TP Ajustado (Dias Úteis Reais)",
+    "TP Tasks Revisadas",
+    "TP Adaptado Tasks Revisadas",
+    "Task P",
+    "Task M",
+    "Task G",
+)
+MONTH_NAMES = (
+    "Jan",
+    "Fev",
+    "Mar",
+    "Abr",
+    "Mai",
+    "Jun",
+    "Jul",
+    "Ago",
+    "Set",
+    "Out",
+    "Nov",
+    "Dez",
+)
+
+
+def compute_yoy(cube, person=None, metrics=YOY_METRICS) -> dict:
+    """
+    Builds the year × calendar month pivot of some metrics and its yearly deltas.
+
+    Parameters:
+    cube (MetricCube): The month × metric × person cube.
+    person (str, optional): Person label for the cube's person axis.
+    metrics (tuple): Names among CUBE_METRICS.
+
+    Returns:
+    dict: "years", "metrics", "pivot" (shape (years, 12, metrics)), "delta" (pivot
+    minus the previous year's, NaN for the first year) and "delta_pct" (delta over
+    the previous year's value).
+
+    Complexity:
+    Time: O(y * 12 * k), for y years and k metrics.
+    Space: O(y * 12 * k), for the pivot and deltas.
+    """
+    pivot = cube.yearly_pivot(metrics, person)
+    previous = np.concatenate([np.full((1, *pivot.shape[1:]), np.nan), pivot[:-1]])
+    delta = pivot - previous
+    with np.errstate(invalid="ignore", divide="ignore"):
+        delta_pct = np.where(previous != 0, delta / np.abs(previous), np.nan)
+    return {
+        "years": list(cube.years),
+        "metrics": list(metrics),
+        "pivot": pivot,
+        "delta": delta,
+        "delta_pct": delta_pct,
+    }
+
+
+def yoy_frame(yoy: dict, metric: str, values: str = "pivot") -> pd.DataFrame:
+    """
+    Returns one metric of a YoY result as a years × months table.
+
+    Parameters:
+    yoy (dict): Output of `compute_yoy`.
+    metric (str): One of the result's metrics.
+    values (str): "pivot", "delta" or "delta_pct".
+
+    Returns:
+    pd.DataFrame: Indexed by year, with one column per calendar month (MONTH_NAMES).
+
+    Complexity:
+    Time: O(y), the table wraps a slice of the pivot.
+    Space: O(y), for the table.
+    """
+    return pd.DataFrame(
+        yoy[values][:, :, yoy["metrics"].index(metric)],
+        index=pd.Index(yoy["years"], name="Ano"),
+        columns=list(MONTH_NAMES),
+    )
@@ -0,0 +1,32 @@
+import os
+import shutil
+import sys
+import tempfile
+
+# Every module reads the 'bin' directory at import, so it is redirected first.
+os.environ["PRODUTIVA_BIN_DIR"] = tempfile.mkdtemp(prefix="produtiva-tests-")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from produtiva.paths import BIN_DIR
+from produtiva.synthetic import generate_team
+
+
+@pytest.fixture
+def bin_dir():
+    """
+    An empty 'bin' directory, removed again after the test.
+    """
+    shutil.rmtree(BIN_DIR, ignore_errors=True)
+    os.makedirs(BIN_DIR)
+    yield BIN_DIR
+    shutil.rmtree(BIN_DIR, ignore_errors=True)
+
+
+@pytest.fixture
+def person():
+    """
+    Five years of synthetic df_tp, df_tasks and df_tamanho for one person.
+    """
+    return next(iter(generate_team(1, 60).values()))
@@ -0,0 +1,50 @@
+import numpy as np
+
+from produtiva.alerts import FIRED, RESOLVED, AlertEngine, load_rules
+from produtiva.schema import MONTH_COLUMN
+from produtiva.synthetic import generate_rules
+
+
+def active(engine, person):
+    return sorted(
+        (a[MONTH_COLUMN], a["Regra"], round(a["Valor"], 4), round(a["Referência"], 4))
+        for a in engine.active(person)
+    )
+
+
+def test_incremental_updates_match_a_full_evaluation(person):
+    rules = generate_rules(200, seed=2)
+    df_tp, df_tasks = person["df_tp"].copy(), person["df_tasks"].copy()
+    engine = AlertEngine(rules)
+    engine.load_frames(df_tp.iloc[:30], df_tasks.iloc[:30], person="a")
+
+    rng = np.random.default_rng(4)
+    writes = [(df, i) for i in range(30, 60) for df in (df_tp, df_tasks)]
+    for _ in range(80):  # then rewrite random months with new values
+        df = (df_tp, df_tasks)[rng.integers(2)]
+        i = int(rng.integers(60))
+        column = df.columns[1 + rng.integers(len(df.columns) - 1)]
+        df.loc[i, column] = df[column].dtype.type(rng.integers(0, 25))
+        writes.append((df, i))
+    for df, i in writes:
+        engine.update_from_frame(df, str(df.loc[i, MONTH_COLUMN]), person="a")
+
+    full = AlertEngine(rules)
+    full.load_frames(df_tp, df_tasks, person="a")
+    assert active(engine, "a") == active(full, "a")
+    assert active(full, "a")
+
+
+def test_events_report_alerts_that_start_and_stop():
+    engine = AlertEngine(load_rules())
+    rule = "tp_abaixo_do_ideal"  # TP Ajustado below its ideal for 2 months
+    low = {"TP Ajustado (Dias Úteis Reais)": 5, "TP Ideal Ajustado (Dias Úteis Reais)": 10}
+    high = {"TP Ajustado (Dias Úteis Reais)": 15, "TP Ideal Ajustado (Dias Úteis Reais)": 10}
+    assert engine.update("01/25", low) == []
+    events = engine.update("02/25", low)
+    assert [(e["status"], e["rule"], e["month"]) for e in events] == [(FIRED, rule, "02/25")]
+    events = engine.update("01/25", high)
+    assert [(e["status"], e["rule"], e["month"]) for e in events] == [
+        (RESOLVED, rule, "02/25")
+    ]
+    assert engine.active() == []
@@ -0,0 +1,55 @@
+import numpy as np
+
+from produtiva.frames import backfill_months
+from produtiva.integrity import check_integrity
+from produtiva.schema import MONTH_COLUMN
+
+
+def months(df):
+    return df[MONTH_COLUMN].astype(str).tolist()
+
+
+def test_backfill_fills_each_frame_from_where_it_stops(person):
+    df_tp = person["df_tp"].iloc[:57].reset_index(drop=True)  # up to 09/04
+    df_tasks = person["df_tasks"].iloc[:54].reset_index(drop=True)  # 06/04
+    df_tamanho = person["df_tamanho"].iloc[:52].reset_index(drop=True)  # 04/04
+    work_days = {}
+    df_tp, df_tasks, df_tamanho, added = backfill_months(
+        df_tp, df_tasks, df_tamanho, work_days, "01/04", "12/04",
+        {"TP Tasks Revisadas": 4},
+    )
+    assert added == {
+        "df_tp": ["10/04", "11/04", "12/04"],
+        "df_tasks": ["07/04", "08/04", "09/04", "10/04", "11/04", "12/04"],
+        "df_tamanho": [
+            "05/04", "06/04", "07/04", "08/04", "09/04", "10/04", "11/04", "12/04"
+        ],
+    }
+    expected = months(person["df_tp"])
+    assert months(df_tp) == months(df_tasks) == months(df_tamanho) == expected
+    assert sorted(work_days) == added["df_tp"]
+
+    # Months whose tasks were added get their revision columns from the new rows.
+    refreshed = df_tp.iloc[54:]
+    np.testing.assert_allclose(
+        refreshed["TP Adaptado (22 Dias Úteis) + Revisão Task"],
+        refreshed["TP Adaptado (22 Dias Úteis)"] + 4,
+    )
+    np.testing.assert_allclose(
+        refreshed["TP Ajustado (Dias Úteis Reais) + Revisão Task"],
+        refreshed["TP Ajustado (Dias Úteis Reais)"] + 4,
+        rtol=1e-6,
+    )
+    untouched = df_tp.iloc[:54]
+    np.testing.assert_array_equal(
+        untouched["TP Adaptado (22 Dias Úteis) + Revisão Task"],
+        person["df_tp"]["TP Adaptado (22 Dias Úteis) + Revisão Task"].iloc[:54],
+    )
+    frames = {"df_tp": df_tp, "df_tasks": df_tasks, "df_tamanho": df_tamanho}
+    assert check_integrity(frames) == []
+
+
+def test_backfill_of_registered_months_adds_nothing(person):
+    frames = [person[name].copy() for name in ("df_tp", "df_tasks", "df_tamanho")]
+    *_, added = backfill_months(*frames, {}, "01/01", "12/01")
+    assert added == {"df_tp": [], "df_tasks": [], "df_tamanho": []}
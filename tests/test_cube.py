@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from produtiva.cube import CUBE_METRICS, MetricCube
+from produtiva.frames import (
+    add_or_update_month_df_tamanho_task,
+    add_or_update_month_df_tp,
+)
+from produtiva.sketches import TeamSketches
+
+
+def assert_rollups_match(cube, person=None):
+    months = np.nan_to_num(cube.block(CUBE_METRICS)[:, :, cube.persons.index(person)])
+    padded = np.zeros((len(cube.years) * 12, len(CUBE_METRICS)))
+    padded[: len(months)] = months
+    np.testing.assert_allclose(
+        cube.year_totals(person), padded.reshape(-1, 12, len(CUBE_METRICS)).sum(axis=1)
+    )
+    quarters = padded.reshape(-1, 3, len(CUBE_METRICS)).sum(axis=1)
+    np.testing.assert_allclose(cube.quarter_totals(person), quarters[: len(cube.quarters)])
+
+
+def test_rollups_equal_month_sums_after_mixed_upserts(person):
+    cube = MetricCube()
+    cube.update_month("05/07", {"Task P": 4}, person="a")
+    # Loading from 01/00 moves the origin back, past the existing month.
+    cube.load_frames(person["df_tp"], person["df_tasks"], person["df_tamanho"], "a")
+    rng = np.random.default_rng(1)
+    for month in rng.choice(cube.months, 20):
+        cube.update_month(month, {"Task P": int(rng.integers(10)), "Dias Úteis": 20}, "a")
+    cube.update_month("06/10", {"TP Ideal (22 Dias Úteis)": 7.0}, person="a")  # grows
+    cube.update_month("03/01", {"Task G": 2}, person="b")
+    assert_rollups_match(cube, "a")
+    assert_rollups_match(cube, "b")
+
+
+def test_repeated_month_in_block_counts_once():
+    df = pd.DataFrame({"Mês/Ano": ["01/24", "02/24", "01/24"], "Task P": [5, 1, 2]})
+    cube = MetricCube()
+    cube.load_frames(df)
+    p = CUBE_METRICS.index("Task P")
+    assert cube.block(["Task P"])[0, 0, 0] == 2
+    assert cube.quarter_totals()[0, p] == 3
+    assert cube.year_totals()[0, p] == 3
+    assert_rollups_match(cube)
+
+
+def test_person_year_outside_cube_raises():
+    cube = MetricCube()
+    cube.update_month("05/24", {"Task P": 1})
+    assert cube.person_year(2024)[4, CUBE_METRICS.index("Task P")] == 1
+    with pytest.raises(KeyError):
+        cube.person_year(2023)
+    with pytest.raises(KeyError):
+        cube.person_year(2025)
+
+
+def test_upserts_write_the_given_person(person):
+    df_tp, df_tasks, df_tamanho = (
+        person[name].copy() for name in ("df_tp", "df_tasks", "df_tamanho")
+    )
+    cube = MetricCube.from_frames(df_tp, df_tasks, df_tamanho, person="ana")
+    sketches = TeamSketches()
+    sketches.load_frame(df_tp, person="ana")
+    work_days = dict(zip(df_tp["Mês/Ano"].astype(str), df_tp["Dias Úteis"]))
+    month = df_tp["Mês/Ano"].iloc[0]
+
+    add_or_update_month_df_tp(
+        df_tp, df_tasks, work_days, month, 99, 15, 21, cube, sketches, person="ana"
+    )
+    add_or_update_month_df_tamanho_task(df_tamanho, month, 7, 0, 0, cube, person="ana")
+    assert cube.persons == ["ana"]
+    p = [CUBE_METRICS.index(m) for m in ("TP Adaptado (22 Dias Úteis)", "Task P")]
+    assert cube.block(CUBE_METRICS)[0, p, 0].tolist() == [99, 7]
+    assert sketches.percentiles("TP Adaptado (22 Dias Úteis)").loc[month, "n"] == 1
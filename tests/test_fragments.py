@@ -0,0 +1,27 @@
+from module_functions import create_fig_tamanho_task
+from produtiva.memory import LRUCache
+
+
+def test_overlapping_window_reuses_fragments(person):
+    df_tamanho = person["df_tamanho"]
+    cache = LRUCache(maxsize=24)
+    create_fig_tamanho_task(df_tamanho.iloc[:12], fragment_cache=cache)
+    first = {key: bars for key, bars in cache.items()}
+    assert len(first) == 12
+
+    fig = create_fig_tamanho_task(df_tamanho.iloc[6:18], fragment_cache=cache)
+    assert len(cache) == 18
+    for key in list(first)[6:]:
+        assert cache[key] is first[key]
+    assert len(fig.data) == 3 + 12 * 3
+
+
+def test_fragment_cache_is_bounded(person):
+    df_tamanho = person["df_tamanho"]
+    cache = LRUCache(maxsize=10)
+    create_fig_tamanho_task(df_tamanho.iloc[:30], fragment_cache=cache)
+    assert len(cache) == 10
+    assert list(cache) == [
+        (row["Mês/Ano"], row["Task P"], row["Task M"], row["Task G"])
+        for _, row in df_tamanho.iloc[20:30].iterrows()
+    ]
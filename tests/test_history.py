@@ -0,0 +1,85 @@
+import pandas as pd
+import pytest
+
+from produtiva import history
+from produtiva.schema import MONTH_COLUMN
+
+
+@pytest.fixture
+def frames(bin_dir, person):
+    tp = person["df_tp"].iloc[:6].reset_index(drop=True)
+    tamanho = person["df_tamanho"].iloc[:6].reset_index(drop=True)
+    history.get_history("df_tp", baseline=tp)
+    history.get_history("df_tamanho", baseline=tamanho)
+    return tp, tamanho
+
+
+def row(df, month):
+    values = df.loc[df[MONTH_COLUMN] == month].iloc[-1].to_dict()
+    values.pop(MONTH_COLUMN)
+    return {k: v.item() if hasattr(v, "item") else v for k, v in values.items()}
+
+
+def assert_same(df, expected):
+    pd.testing.assert_frame_equal(
+        df.astype({MONTH_COLUMN: str}),
+        expected.astype({MONTH_COLUMN: str}),
+        check_dtype=False,
+    )
+
+
+def test_as_of_reads_every_version(frames):
+    tp, tamanho = frames
+    edited = dict(row(tamanho, "03/00"), **{"Task P": 99})
+    history.commit_row("df_tamanho", "03/00", edited, origin="a")
+    history.commit_row("df_tamanho", "07/00", edited, origin="a")
+    log = history.get_history("df_tamanho")
+    assert_same(log.as_of(0), tamanho)
+    assert log.as_of(1).loc[2, "Task P"] == 99
+    assert len(log.as_of(1)) == 6 and len(log.as_of()) == 7
+    assert log.version_at(log.commits[1]["ts"]) >= 1
+
+
+def test_undo_reverts_the_whole_group(frames):
+    tp, tamanho = frames
+    group = history.new_group()
+    history.commit_rows(
+        "df_tp",
+        {"07/00": row(tp, "06/00"), "08/00": row(tp, "06/00")},
+        origin="a",
+        group=group,
+    )
+    history.commit_rows(
+        "df_tamanho",
+        {"07/00": row(tamanho, "06/00"), "08/00": row(tamanho, "06/00")},
+        origin="a",
+        group=group,
+    )
+    assert len(history.get_history("df_tp").as_of()) == 8
+
+    _, restored = history.undo(["df_tp", "df_tamanho"], origin="a")
+    assert sorted((d, m) for d, m, v in restored if v is None) == [
+        ("df_tamanho", "07/00"),
+        ("df_tamanho", "08/00"),
+        ("df_tp", "07/00"),
+        ("df_tp", "08/00"),
+    ]
+    assert_same(history.get_history("df_tp").as_of(), tp)
+    assert_same(history.get_history("df_tamanho").as_of(), tamanho)
+    assert history.undo(["df_tp", "df_tamanho"], origin="a") is None
+
+
+def test_undo_only_reverts_the_origin_edits(frames):
+    tp, tamanho = frames
+    mine = dict(row(tamanho, "02/00"), **{"Task G": 7})
+    theirs = dict(row(tamanho, "04/00"), **{"Task G": 8})
+    history.commit_row("df_tamanho", "02/00", mine, origin="a")
+    history.commit_row("df_tamanho", "04/00", theirs, origin="b")
+
+    _, restored = history.undo(["df_tamanho"], origin="a")
+    assert restored == [("df_tamanho", "02/00", row(tamanho, "02/00"))]
+    latest = history.get_history("df_tamanho").as_of()
+    assert latest.loc[1, "Task G"] == tamanho.loc[1, "Task G"]
+    assert latest.loc[3, "Task G"] == 8
+    log = history.get_history("df_tamanho")
+    assert log.commits[-1]["origin"] == "a" and log.commits[-1]["undoes"] == [1]
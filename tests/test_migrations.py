@@ -0,0 +1,37 @@
+import numpy as np
+
+from produtiva.integrity import check_integrity
+from produtiva.migrations import frame_version, migrate
+from produtiva.schema import MONTH_COLUMN, SCHEMA_VERSION, SCHEMAS
+
+REVISAO = "TP Adaptado (22 Dias Úteis) + Revisão Task"
+
+
+def test_migrate_v0_to_latest(person):
+    df_tp = person["df_tp"].drop(
+        columns=[REVISAO, "TP Ajustado (Dias Úteis Reais) + Revisão Task"]
+    )
+    df_tp = df_tp.astype({MONTH_COLUMN: object, "TP Adaptado (22 Dias Úteis)": "int64"})
+    # Unsorted, with 05/00 written twice; the later row must win.
+    df_tp = df_tp.iloc[[2, 0, 1, *range(3, 60), 4]].reset_index(drop=True)
+    df_tp.loc[len(df_tp) - 1, "TP Adaptado (22 Dias Úteis)"] = 30
+    df_tasks = person["df_tasks"].astype({MONTH_COLUMN: object})
+    frames = {"df_tp": df_tp, "df_tasks": df_tasks, "df_tamanho": None}
+    assert frame_version(df_tp) == 0
+
+    assert migrate(frames) == ["df_tp", "df_tasks"]
+    migrated = frames["df_tp"]
+    assert frame_version(migrated) == SCHEMA_VERSION
+    months = person["df_tp"][MONTH_COLUMN].astype(str).tolist()
+    assert migrated[MONTH_COLUMN].astype(str).tolist() == months
+    for column, dtype in SCHEMAS["df_tp"].items():
+        assert migrated[column].dtype == dtype
+    assert migrated.loc[4, "TP Adaptado (22 Dias Úteis)"] == 30
+    np.testing.assert_array_equal(
+        migrated[REVISAO],
+        migrated["TP Adaptado (22 Dias Úteis)"].to_numpy()
+        + person["df_tasks"]["TP Tasks Revisadas"].to_numpy(),
+    )
+    frames["df_tamanho"] = person["df_tamanho"]
+    assert check_integrity(frames) == []
+    assert not {"df_tp", "df_tasks"} & set(migrate(frames))  # migrations run once
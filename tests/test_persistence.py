@@ -0,0 +1,49 @@
+import time
+
+import pandas as pd
+
+from produtiva.persistence import WriteBehindPersister
+
+
+def slow_writer(delay, written):
+    def write(filename, data, durable=False):
+        time.sleep(delay)
+        written.append((filename, data))
+
+    return write
+
+
+def test_flush_waits_for_the_write_in_progress():
+    written = []
+    persister = WriteBehindPersister(writer=slow_writer(0.3, written))
+    ticket = persister.submit("a.pkl", {"v": 1})
+    time.sleep(0.05)  # the worker has taken the save off the pending map
+    assert persister.pending() == []
+    assert persister.flush()
+    assert ticket.done and written == [("a.pkl", {"v": 1})]
+
+
+def test_flush_timeout_is_a_total_deadline():
+    persister = WriteBehindPersister(writer=slow_writer(0.2, []))
+    for name in ("a.pkl", "b.pkl", "c.pkl"):
+        persister.submit(name, name)
+    start = time.monotonic()
+    assert not persister.flush(timeout=0.25)
+    assert time.monotonic() - start < 0.35
+    assert persister.flush()
+
+
+def test_waiting_saves_are_coalesced():
+    written = []
+    persister = WriteBehindPersister(writer=slow_writer(0.1, written))
+    persister.submit("a.pkl", pd.DataFrame({"x": [0]}))
+    time.sleep(0.02)
+    df = pd.DataFrame({"x": [1]})
+    first = persister.submit("b.pkl", df)
+    df.loc[0, "x"] = 2  # the submitted snapshot is not affected
+    second = persister.submit("b.pkl", df)
+    assert persister.flush()
+    assert first.wait(0) and second.wait(0)
+    assert [name for name, _ in written] == ["a.pkl", "b.pkl"]
+    assert written[1][1]["x"].tolist() == [2]
+    assert persister.coalesced == 1
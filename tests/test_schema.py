@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+from produtiva.frames import (
+    add_or_update_month_df_tamanho_task,
+    add_or_update_month_df_tasks,
+    add_or_update_month_df_tp,
+)
+from produtiva.schema import MONTH_COLUMN, SCHEMAS, empty_frame, enforce_schema
+
+
+def test_enforce_schema_uses_compact_types(person):
+    df = person["df_tp"].astype({MONTH_COLUMN: object}).astype(
+        {column: "float64" for column in SCHEMAS["df_tp"]}
+    )
+    enforce_schema(df, "df_tp")
+    for column, dtype in SCHEMAS["df_tp"].items():
+        assert df[column].dtype == dtype
+    assert df[MONTH_COLUMN].cat.ordered
+    assert list(df[MONTH_COLUMN].cat.categories) == list(person["df_tp"][MONTH_COLUMN])
+    np.testing.assert_allclose(
+        df["TP Ajustado (Dias Úteis Reais)"],
+        person["df_tp"]["TP Ajustado (Dias Úteis Reais)"],
+        rtol=1e-6,
+    )
+
+
+def test_months_sort_chronologically():
+    df = pd.DataFrame({MONTH_COLUMN: ["02/25", "12/24", "01/25"], "Task P": [1, 2, 3]})
+    enforce_schema(df, "df_tamanho")
+    assert df.sort_values(MONTH_COLUMN)[MONTH_COLUMN].tolist() == ["12/24", "01/25", "02/25"]
+
+
+def test_lossy_integer_columns_fall_back_to_float32():
+    df = pd.DataFrame(
+        {MONTH_COLUMN: ["01/25", "02/25"], "Task P": [1.5, 2.0], "Task M": [np.nan, 1]}
+    )
+    enforce_schema(df, "df_tamanho")
+    assert df["Task P"].dtype == "float32" and df["Task P"].iloc[0] == 1.5
+    assert df["Task M"].dtype == "float32" and np.isnan(df["Task M"].iloc[0])
+
+
+def test_empty_frame_follows_schema():
+    df = empty_frame("df_tasks")
+    assert df.empty
+    assert dict(df.dtypes.astype(str).drop(MONTH_COLUMN)) == SCHEMAS["df_tasks"]
+
+
+def test_upserts_widen_columns_for_values_that_do_not_fit(person):
+    df_tp, df_tasks, df_tamanho = (
+        person[name].copy() for name in ("df_tp", "df_tasks", "df_tamanho")
+    )
+    month = df_tp[MONTH_COLUMN].iloc[5]
+    work_days = dict(zip(df_tp[MONTH_COLUMN].astype(str), df_tp["Dias Úteis"]))
+
+    df_tp = add_or_update_month_df_tp(df_tp, df_tasks, work_days, month, 40000, 10.5, 21)
+    row = df_tp.loc[df_tp[MONTH_COLUMN] == month].iloc[0]
+    assert row["TP Adaptado (22 Dias Úteis)"] == 40000
+    assert row["TP Ideal (22 Dias Úteis)"] == 10.5
+    assert df_tp["TP Adaptado (22 Dias Úteis)"].dtype == np.float32
+
+    df_tasks = add_or_update_month_df_tasks(df_tasks, month, 2.5, 40000)
+    row = df_tasks.loc[df_tasks[MONTH_COLUMN] == month].iloc[0]
+    assert (row["TP Tasks Revisadas"], row["TP Adaptado Tasks Revisadas"]) == (2.5, 40000)
+
+    df_tamanho = add_or_update_month_df_tamanho_task(df_tamanho, month, 40000, 0.5, 3)
+    row = df_tamanho.loc[df_tamanho[MONTH_COLUMN] == month].iloc[0]
+    assert (row["Task P"], row["Task M"], row["Task G"]) == (40000, 0.5, 3)
+    assert df_tamanho["Task G"].dtype == np.int16
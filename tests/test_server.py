@@ -0,0 +1,38 @@
+import asyncio
+import json
+
+import pytest
+
+from produtiva import server
+from produtiva.schema import SCHEMAS
+from produtiva.storage import DATASET_FILES, save_to_binary
+
+
+@pytest.fixture
+def get(bin_dir, person):
+    for name in SCHEMAS:
+        save_to_binary(DATASET_FILES[name], person[name], durable=True)
+    api = server.MetricsAPI()
+
+    def get(target):
+        return asyncio.run(server._dispatch(api, "GET", target, {}))
+
+    return get
+
+
+def test_rows_and_not_found(get):
+    status, _, body = get("/tp?start=01/04&end=03/04")
+    assert status == 200
+    assert [row["Mês/Ano"] for row in json.loads(body)] == ["01/04", "02/04", "03/04"]
+    assert get("/unknown")[0] == 404
+    assert get("/metrics?start=01/90&end=12/90")[0] == 404
+    assert get("/tp?start=13/04")[0] == 400
+
+
+def test_internal_errors_answer_500(get, monkeypatch):
+    def broken(*args):
+        raise KeyError("TP Ajustado (Dias Úteis Reais)")
+
+    monkeypatch.setattr(server, "derived_metrics", broken)
+    assert get("/metrics")[0] == 500
+    assert get("/tp")[0] == 200
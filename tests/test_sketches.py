@@ -0,0 +1,73 @@
+import numpy as np
+
+from produtiva.sketches import KLLSketch, TeamSketches, rank_error
+from produtiva.synthetic import generate_team
+
+QS = (0.01, 0.1, 0.5, 0.9, 0.99)
+
+
+def normalized_rank(values, value) -> float:
+    return np.searchsorted(np.sort(values), value, side="right") / len(values)
+
+
+def test_quantiles_stay_within_the_rank_error():
+    values = np.random.default_rng(0).lognormal(size=50_000)
+    sketch = KLLSketch(seed=0)
+    for value in values:
+        sketch.update(value)
+    assert sketch.n == len(values)
+    for q, estimate in zip(QS, sketch.quantiles(QS)):
+        assert abs(normalized_rank(values, estimate) - q) <= 1.5 * rank_error()
+
+
+def test_merged_sketch_summarizes_the_union():
+    rng = np.random.default_rng(1)
+    parts = [rng.normal(loc, size=10_000) for loc in (0, 3, 6)]
+    merged = KLLSketch(seed=1)
+    for i, part in enumerate(parts):
+        sketch = KLLSketch(seed=i)
+        for value in part:
+            sketch.update(value)
+        merged.merge(sketch)
+    values = np.concatenate(parts)
+    assert merged.n == len(values)
+    for q, estimate in zip(QS, merged.quantiles(QS)):
+        assert abs(normalized_rank(values, estimate) - q) <= 1.5 * rank_error()
+
+
+def test_team_percentiles_follow_upserts():
+    metric = "TP Adaptado (22 Dias Úteis)"
+    team = generate_team(300, 3)
+    sketches = TeamSketches(seed=0)
+    for person, data in team.items():
+        sketches.load_frame(data["df_tp"], person=person)
+    person, data = next(iter(team.items()))
+    df_tp = data["df_tp"].copy()
+    df_tp.loc[0, metric] = 1000
+    sketches.update_from_frame(df_tp, "01/00", person=person)
+
+    table = sketches.percentiles(metric, bounds=True)
+    assert table.index.tolist() == ["01/00", "02/00", "03/00"]
+    assert (table["n"] == len(team)).all()
+    values = np.array([d["df_tp"].loc[0, metric] for d in team.values()], dtype=float)
+    values[0] = 1000
+    low, high = table.loc["01/00", ["p50_low", "p50_high"]]
+    assert low <= np.median(values) <= high
+
+
+def test_only_grouped_partitions_keep_values():
+    metric = "TP Adaptado (22 Dias Úteis)"
+    sketches = TeamSketches(seed=0)
+    for person, value in (("a", 1), ("b", 2), ("c", 3)):
+        sketches.update("01/24", metric, person, value)
+    sketches.update("01/24", metric, "a", 10)
+    assert sketches._values == {}
+    assert sketches.team_sketch("01/24", metric).n == 3
+    assert sketches.team_sketch("01/24", metric).quantile(1) == 10
+
+    for person, value in (("d", 4), ("e", 5)):
+        sketches.update("01/24", metric, person, value, partition="squad")
+    sketches.update("01/24", metric, "d", 40, partition="squad")
+    assert sketches._values == {("01/24", metric): {"squad": {"d": 40.0, "e": 5.0}}}
+    assert sketches.team_sketch("01/24", metric).n == 5
+    assert sketches.team_sketch("01/24", metric).quantile(1) == 40
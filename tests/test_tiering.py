@@ -0,0 +1,90 @@
+import pandas as pd
+import pytest
+
+from produtiva import tiering
+from produtiva.frames import backfill_months
+from produtiva.schema import MONTH_COLUMN, SCHEMAS
+from produtiva.storage import DATASET_FILES, load_datasets, save_to_binary
+
+TP = "TP Adaptado (22 Dias Úteis)"
+
+
+def as_str(df):
+    return df.astype({MONTH_COLUMN: str}).reset_index(drop=True)
+
+
+@pytest.fixture
+def loaded(bin_dir, person):
+    for name in SCHEMAS:
+        save_to_binary(DATASET_FILES[name], person[name], durable=True)
+    return load_datasets(SCHEMAS, archive_cold=True)
+
+
+def test_load_archives_old_years_and_round_trips(loaded, person):
+    # 60 months from 01/00: 2000-2003 are archived, 2004 stays hot.
+    assert tiering.cold_years("df_tp") == [2000, 2001, 2002, 2003]
+    assert len(loaded["df_tp"]) == 12 and loaded["issues"] == []
+    assert tiering.cold_months("df_tp") == person["df_tp"][MONTH_COLUMN].tolist()[:48]
+
+    frames = tiering.full_frames({name: loaded[name] for name in SCHEMAS})
+    for name in SCHEMAS:
+        pd.testing.assert_frame_equal(
+            as_str(frames[name]), as_str(person[name]), check_dtype=False
+        )
+
+    again = load_datasets(SCHEMAS, archive_cold=True)  # nothing left to archive
+    assert len(again["df_tp"]) == 12
+
+
+def test_select_range_reads_only_what_it_needs(loaded, person):
+    window = tiering.select_range("df_tp", loaded["df_tp"], "06/01", "03/04")
+    expected = person["df_tp"].iloc[17:51]
+    pd.testing.assert_frame_equal(as_str(window), as_str(expected), check_dtype=False)
+    hot = tiering.select_range("df_tp", loaded["df_tp"], "02/04", "05/04")
+    assert hot[MONTH_COLUMN].astype(str).tolist() == ["02/04", "03/04", "04/04", "05/04"]
+    assert len(tiering.select_range("df_tp", loaded["df_tp"])) == 60
+
+
+def test_segments_detect_corruption(loaded):
+    path = tiering.segment_path("df_tp", 2001)
+    with open(path, "rb") as file:
+        data = bytearray(file.read())
+    data[-5] ^= 0xFF
+    with open(path, "wb") as file:
+        file.write(data)
+    with pytest.raises(tiering.SegmentError):
+        tiering.read_segment("df_tp", 2001)
+
+
+def test_archived_months_cannot_be_overwritten(loaded, person):
+    archived = tiering.read_segment("df_tp", 2002)
+    original = archived.loc[archived[MONTH_COLUMN] == "06/02", TP].item()
+
+    # A backfill over archived months adds nothing to them.
+    frames = [loaded[name] for name in SCHEMAS]
+    *frames, added = backfill_months(
+        *frames, {}, "05/02", "07/02", skip=tiering.cold_months("df_tp")
+    )
+    assert added == {"df_tp": [], "df_tasks": [], "df_tamanho": []}
+
+    # A row for an archived month reaching the frames anyway (a stale write) does not
+    # replace the archived one on the next load.
+    stale = pd.concat(
+        [person["df_tp"].iloc[[29]].assign(**{TP: original + 7}), loaded["df_tp"]],
+        ignore_index=True,
+    )
+    save_to_binary(DATASET_FILES["df_tp"], stale, durable=True)
+    reloaded = load_datasets(SCHEMAS, archive_cold=True)
+    assert len(reloaded["df_tp"]) == 12
+    archived = tiering.read_segment("df_tp", 2002)
+    assert archived.loc[archived[MONTH_COLUMN] == "06/02", TP].item() == original
+    assert len(archived) == 12
+
+
+def test_plain_loads_do_not_archive(bin_dir, person):
+    for name in SCHEMAS:
+        save_to_binary(DATASET_FILES[name], person[name], durable=True)
+    frames = load_datasets()
+    assert tiering.cold_years("df_tp") == []
+    assert len(frames["df_tp"]) == 60
+    assert len(load_datasets(SCHEMAS)["df_tp"]) == 60
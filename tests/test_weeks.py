@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+from produtiva.business_days import calculate_business_days
+from produtiva.months import parse_month_year
+from produtiva.schema import MONTH_COLUMN, SCHEMAS, enforce_schema
+from produtiva.weeks import WEEK_COLUMN, create_df_weeks, resample, set_week_tp
+
+
+def monthly_df_tp(tp_by_month: dict, ideal_22: int = 15) -> pd.DataFrame:
+    """
+    Builds df_tp the way the app does for a month, from its total TP.
+    """
+    months = list(tp_by_month)
+    days = np.array([calculate_business_days(*parse_month_year(m)) for m in months])
+    tp = np.array(list(tp_by_month.values()))
+    df = pd.DataFrame(
+        {
+            MONTH_COLUMN: months,
+            "TP Adaptado (22 Dias Úteis)": tp,
+            "TP Ideal (22 Dias Úteis)": ideal_22,
+            "Dias Úteis": days,
+            "TP Ajustado (Dias Úteis Reais)": tp * (22 / days),
+            "TP Ideal Ajustado (Dias Úteis Reais)": ideal_22 * (days / 22),
+        }
+    )
+    return enforce_schema(df, "df_tp")
+
+
+def test_weeks_resampled_to_months_reproduce_df_tp():
+    df_weeks = create_df_weeks("01/24", "12/24")
+    rng = np.random.default_rng(3)
+    for week in pd.unique(df_weeks[WEEK_COLUMN]):
+        set_week_tp(df_weeks, week, int(rng.integers(0, 12)))
+    tp_by_month = (
+        df_weeks.groupby(df_weeks[MONTH_COLUMN].astype(str), sort=False)[
+            "TP Adaptado (22 Dias Úteis)"
+        ].sum()
+    ).to_dict()
+
+    monthly = resample(df_weeks, "month")
+    expected = monthly_df_tp(tp_by_month)
+    columns = [MONTH_COLUMN, *expected.columns.drop(MONTH_COLUMN)]
+    pd.testing.assert_frame_equal(
+        monthly[columns].astype({MONTH_COLUMN: str}),
+        expected[columns].astype({MONTH_COLUMN: str}),
+        check_exact=True,
+    )
+    for column, dtype in SCHEMAS["df_tp"].items():
+        if column in monthly.columns:
+            assert monthly[column].dtype == dtype
+
+
+def test_split_week_counts_once_per_month():
+    df_weeks = create_df_weeks("01/24", "02/24")
+    # 2024-W05 runs from Monday 29/01 to Sunday 04/02.
+    set_week_tp(df_weeks, "2024-W05", 7)
+    segments = df_weeks.loc[df_weeks[WEEK_COLUMN] == "2024-W05"]
+    assert segments[MONTH_COLUMN].astype(str).tolist() == ["01/24", "02/24"]
+    assert segments["TP Adaptado (22 Dias Úteis)"].sum() == 7
+    weekly = resample(df_weeks, "week")
+    week = weekly.loc[weekly[WEEK_COLUMN] == "2024-W05"]
+    assert week["TP Adaptado (22 Dias Úteis)"].item() == 7
+    quarterly = resample(resample(df_weeks, "month"), "quarter")
+    assert quarterly["TP Adaptado (22 Dias Úteis)"].sum() == 7
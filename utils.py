@@ -1,4 +1,10 @@
+import pandas as pd
 import streamlit as st
+import os
+from produtiva import profiling
+from produtiva.memory import ARTIFACTS
+
+MEMORY_PANEL_ENABLED = os.environ.get("PRODUTIVA_MEMORY_PANEL") == "1"
 
 
 def load_custom_styles_and_info():
@@ -199,3 +205,99 @@ def load_chart_tabs_styles():
     </style>
     """
     st.markdown(content, unsafe_allow_html=True)
+
+
+def render_profiling_panel():
+    """
+    Shows the stage timings of the last reruns in the sidebar when profiling is enabled.
+
+    Each row is one rerun (most recent first) with its total wall and CPU time and the
+    wall time of every top-level stage; the stage breakdown of the last rerun, including
+    nested stages and allocations, is shown below it.
+    """
+    history = st.session_state.get("profiling_history")
+    if not profiling.PROFILING_ENABLED or not history:
+        return
+
+    with st.sidebar.expander("⏱️ Perfil das Execuções", expanded=False):
+        df_reruns = pd.DataFrame(profiling.summarize(history)[::-1]).fillna(0)
+        st.dataframe(df_reruns, hide_index=True)
+
+        last = history[-1]
+        st.markdown(f"**Última execução:** {last.page} — {last.wall_ms:.1f} ms")
+        if not last.stages:
+            return
+        df_stages = pd.DataFrame(last.stages)
+        df_stages["stage"] = [
+            "· " * depth + name
+            for depth, name in zip(df_stages["depth"], df_stages["stage"])
+        ]
+        st.dataframe(df_stages.drop(columns="depth"), hide_index=True)
+
+
+def render_memory_panel():
+    """
+    Shows memory per session and key, and the process aggregate, when PRODUTIVA_MEMORY_PANEL=1.
+
+    Session state sizes are the ones last reported by each session; artifact sizes come
+    from the shared, budgeted artifact store.
+    """
+    if not MEMORY_PANEL_ENABLED:
+        return
+
+    report = ARTIFACTS.report()
+    mib = 2**20
+    with st.sidebar.expander("🧠 Memória por Sessão", expanded=False):
+        st.markdown(
+            f"**Artefatos:** {report['artifact_bytes'] / mib:.2f} MiB de "
+            f"{report['budget_bytes'] / mib:.0f} MiB · "
+            f"**Estado das sessões:** {report['state_bytes'] / mib:.2f} MiB · "
+            f"**Pico do processo:** {report['process_peak_rss_bytes'] / mib:.0f} MiB · "
+            f"**Evicções:** {report['evictions']}"
+        )
+        rows = [
+            {
+                "Sessão": session[:8],
+                "Tipo": kind,
+                "Chave": key,
+                "MiB": size / mib,
+            }
+            for session, usage in report["sessions"].items()
+            for kind in ("state", "artifacts")
+            for key, size in usage[kind].items()
+        ]
+        if rows:
+            st.dataframe(
+                pd.DataFrame(rows).style.format({"MiB": "{:.3f}"}), hide_index=True
+            )
+
+
+INTEGRITY_MESSAGES = {
+    "duplicate_months": "meses repetidos",
+    "unsorted_months": "meses fora da ordem cronológica",
+    "month_gaps": "meses faltando",
+    "misaligned": "meses diferentes dos de df_tp",
+    "negative_counts": "valores negativos",
+    "invalid_work_days": "dias úteis inválidos",
+}
+
+
+def render_integrity_warnings():
+    """
+    Shows the integrity problems found when the session's datasets were loaded.
+
+    The checks themselves run once per load (see `produtiva.integrity`); this only
+    renders the stored result.
+    """
+    issues = st.session_state.get("integrity_issues")
+    if not issues:
+        return
+
+    lines = []
+    for issue in issues:
+        detail = ", ".join(issue.get("months") or issue.get("columns") or [])
+        message = INTEGRITY_MESSAGES.get(issue["check"], issue["check"])
+        lines.append(
+            f"- **{issue['dataset']}**: {message}" + (f" ({detail})" if detail else "")
+        )
+    st.warning("Inconsistências nos dados carregados:\n" + "\n".join(lines))